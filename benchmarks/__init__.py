@@ -0,0 +1,15 @@
+"""
+Performance benchmarks for the sensitivity package. These are not run as part of the test suite.
+
+Each module can be run directly for a quick table of results, e.g. ``python -m benchmarks.sweep``.
+
+The modules are also an airspeed velocity (asv) suite covering the sweep, aggregation, styling and plotting,
+timing them and measuring their peak memory over grids of 1 to 8 arguments and 10 to 1,000,000 cases.
+Install asv with ``pip install asv``, then from the repo root:
+
+- ``asv run`` benchmarks the latest commit and stores the results in .asv/results
+- ``asv run --python=same --quick`` checks the benchmarks against the current environment
+- ``asv continuous master HEAD`` compares the current commit to master and reports changes
+- ``asv compare <commit1> <commit2>`` compares stored results
+- ``asv publish`` and ``asv preview`` show the history of stored results in a browser
+"""
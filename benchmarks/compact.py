@@ -0,0 +1,68 @@
+"""
+Compares the memory used by the results of :func:`sensitivity.df.sensitivity_df` and the time to build the
+styled tables with the default nullable dtypes and with compact=True.
+
+Run with ``python -m benchmarks.compact``
+"""
+import time
+from typing import Sequence
+
+from benchmarks.sweep import sensitivity_values_for
+from benchmarks.vectorized import numpy_func
+from sensitivity import SensitivityAnalyzer
+
+CASE_COUNTS = (100_000, 1_000_000)
+
+
+def create_analyzer(num_cases: int, compact: bool) -> SensitivityAnalyzer:
+    return SensitivityAnalyzer(sensitivity_values_for(num_cases), numpy_func, vectorized=True, compact=compact)
+
+
+def df_megabytes(sa: SensitivityAnalyzer) -> float:
+    return sa.df.memory_usage(deep=True).sum() / 1e6
+
+
+class Compact:
+    """
+    Running the analyzer and styling its results with and without compact output
+    """
+    params = (CASE_COUNTS, [False, True])
+    param_names = ('cases', 'compact')
+    timeout = 300
+
+    def setup(self, num_cases: int, compact: bool):
+        self.sa = create_analyzer(num_cases, compact)
+
+    def time_run(self, num_cases: int, compact: bool):
+        self.sa.run()
+
+    def peakmem_run(self, num_cases: int, compact: bool):
+        self.sa.run()
+
+    def time_styled_dfs(self, num_cases: int, compact: bool):
+        # Aggregate again rather than reusing the tables from the previous repeat
+        self.sa._clear_derived_results()
+        self.sa.styled_dfs(disp=False)
+
+    def track_df_megabytes(self, num_cases: int, compact: bool) -> float:
+        return df_megabytes(self.sa)
+
+    track_df_megabytes.unit = 'MB'  # type: ignore
+
+
+def run(case_counts: Sequence[int] = CASE_COUNTS):
+    print(f'{"cases":>12} {"compact":>8} {"MB":>8} {"run s":>8} {"styled s":>10}')
+    for num_cases in case_counts:
+        for compact in (False, True):
+            start = time.perf_counter()
+            sa = create_analyzer(num_cases, compact)
+            run_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            sa.styled_dfs(disp=False)
+            styled_seconds = time.perf_counter() - start
+            print(f'{num_cases:>12,} {str(compact):>8} {df_megabytes(sa):>8.1f} {run_seconds:>8.2f} '
+                  f'{styled_seconds:>10.2f}')
+
+
+if __name__ == '__main__':
+    run()
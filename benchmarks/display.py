@@ -0,0 +1,93 @@
+"""
+Times rendering the styled tables and hex-bin plots of sensitivity analysis results, from the aggregated results
+to HTML and drawn figures.
+
+Run with ``python -m benchmarks.display``
+"""
+import timeit
+from typing import Optional, Sequence
+
+import matplotlib
+import matplotlib.pyplot as plt
+import pandas as pd
+
+from benchmarks.pivot import results_df
+from sensitivity.df import _style_sensitivity_df, _two_variable_sensitivity_display_df
+from sensitivity.hexbin import _hex_figure_from_sensitivity_df
+
+VALUES_PER_AXIS = (10, 100, 300)
+PLOT_DIMENSIONS = (2, 4, 8)
+PLOT_CASE_COUNTS = (1_000, 100_000, 1_000_000)
+NUM_FMTS = (None, '{:,.2f}')
+
+
+def pair_table(num_values: int) -> pd.DataFrame:
+    return _two_variable_sensitivity_display_df(results_df(2, num_values ** 2), 'value0', 'value1')
+
+
+def render_styled_table(table: pd.DataFrame, num_fmt: Optional[str] = None) -> str:
+    # Styler is lazy, rendering to HTML applies the gradient and the number format
+    return _style_sensitivity_df(table, 'value0', col2='value1', num_fmt=num_fmt).to_html()
+
+
+def draw_hex_figure(df: pd.DataFrame, sensitivity_cols: Sequence[str]):
+    fig = _hex_figure_from_sensitivity_df(df, sensitivity_cols)
+    fig.canvas.draw()
+    plt.close(fig)
+
+
+class StyledTable:
+    """
+    Styling and rendering the table of results for a pair of arguments with num_values values each
+    """
+    params = (VALUES_PER_AXIS, NUM_FMTS)
+    param_names = ('values', 'num_fmt')
+    timeout = 300
+
+    def setup(self, num_values: int, num_fmt: Optional[str]):
+        self.table = pair_table(num_values)
+
+    def time_style(self, num_values: int, num_fmt: Optional[str]):
+        render_styled_table(self.table, num_fmt)
+
+    def peakmem_style(self, num_values: int, num_fmt: Optional[str]):
+        render_styled_table(self.table, num_fmt)
+
+
+class HexPlot:
+    """
+    Creating and drawing the hex-bin plots for every pair of arguments
+    """
+    params = (PLOT_DIMENSIONS, PLOT_CASE_COUNTS)
+    param_names = ('dimensions', 'cases')
+    timeout = 300
+
+    def setup(self, num_dimensions: int, num_cases: int):
+        matplotlib.use('Agg')
+        self.df = results_df(num_dimensions, num_cases)
+        self.sensitivity_cols = [col for col in self.df.columns if col != 'Result']
+
+    def time_hex_figure(self, num_dimensions: int, num_cases: int):
+        draw_hex_figure(self.df, self.sensitivity_cols)
+
+    def peakmem_hex_figure(self, num_dimensions: int, num_cases: int):
+        draw_hex_figure(self.df, self.sensitivity_cols)
+
+
+def run(values_per_axis: Sequence[int] = VALUES_PER_AXIS, plot_case_counts: Sequence[int] = PLOT_CASE_COUNTS):
+    matplotlib.use('Agg')
+    print(f'{"values":>8} {"cells":>10} {"style s":>10}')
+    for num_values in values_per_axis:
+        table = pair_table(num_values)
+        seconds = min(timeit.repeat(lambda: render_styled_table(table), number=1, repeat=3))
+        print(f'{num_values:>8} {num_values ** 2:>10,} {seconds:>10.3f}')
+    print(f'{"cases":>12} {"plot s":>10}')
+    for num_cases in plot_case_counts:
+        df = results_df(3, num_cases)
+        cols = [col for col in df.columns if col != 'Result']
+        seconds = min(timeit.repeat(lambda: draw_hex_figure(df, cols), number=1, repeat=1))
+        print(f'{num_cases:>12,} {seconds:>10.3f}')
+
+
+if __name__ == '__main__':
+    run()
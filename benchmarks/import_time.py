@@ -0,0 +1,58 @@
+"""
+Measures how long ``import sensitivity`` takes in a fresh interpreter, compared to importing only its required
+compute dependencies, and checks that plotting and display libraries are not imported with it.
+
+Run with ``python -m benchmarks.import_time``. Exits with an error if the package takes more than
+MAX_OVERHEAD_SECONDS longer to import than its dependencies, or if it imports a deferred library. The asv
+benchmarks track the import time and the number of deferred libraries imported.
+"""
+import subprocess
+import sys
+from typing import List
+
+# Only imported when plotting or styling
+DEFERRED_MODULES = ('matplotlib', 'IPython', 'pandas.io.formats.style', 'jinja2')
+MAX_OVERHEAD_SECONDS = 0.25
+REPEAT = 5
+
+
+def import_seconds(statement: str) -> float:
+    """
+    Best time to run the import statement in a fresh interpreter
+    """
+    code = f'import time; start = time.perf_counter(); {statement}; print(time.perf_counter() - start)'
+    return min(
+        float(subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout)
+        for _ in range(REPEAT)
+    )
+
+
+def imported_deferred_modules() -> List[str]:
+    code = f'import sys, sensitivity; print(",".join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))'
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout.strip()
+    return [module for module in output.split(',') if module]
+
+
+def timeraw_import_sensitivity() -> str:
+    # asv runs the returned code in a fresh interpreter
+    return 'import sensitivity'
+
+
+def track_deferred_modules_imported() -> int:
+    return len(imported_deferred_modules())
+
+
+def run() -> bool:
+    dependencies_seconds = import_seconds('import numpy, pandas, tqdm')
+    package_seconds = import_seconds('import sensitivity')
+    overhead = package_seconds - dependencies_seconds
+    deferred = imported_deferred_modules()
+    print(f'{"dependencies s":>15} {"sensitivity s":>15} {"overhead s":>12}')
+    print(f'{dependencies_seconds:>15.3f} {package_seconds:>15.3f} {overhead:>12.3f}')
+    if deferred:
+        print(f'imported deferred modules: {deferred}')
+    return overhead <= MAX_OVERHEAD_SECONDS and not deferred
+
+
+if __name__ == '__main__':
+    sys.exit(0 if run() else 1)
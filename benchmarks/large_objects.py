@@ -0,0 +1,73 @@
+"""
+Shows the overhead per case of :func:`sensitivity.df.sensitivity_df` when the parameter values are large
+objects such as DataFrames and arrays.
+
+Run with ``python -m benchmarks.large_objects``. By default the values are passed to func by reference, so the
+time per case should be about the same for every object size. With ``isolate=True`` each case deep copies its
+values, so the time per case grows with the size of the objects. The asv benchmarks cover the same sweeps,
+along with their peak memory.
+"""
+import timeit
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from sensitivity.df import sensitivity_df
+
+NUM_ROWS = (1_000, 10_000, 100_000)
+NUM_CASES = 1_000
+
+
+def mean_of_scaled(data: pd.DataFrame, weights: np.ndarray, scale: float) -> float:
+    # Reads the objects without modifying them, about as cheap as func can be
+    return scale * len(data) + weights.shape[0]
+
+
+def sensitivity_values_for(num_rows: int) -> Dict[str, List]:
+    """
+    NUM_CASES cases over two DataFrames and two arrays of num_rows rows each
+    """
+    rng = np.random.default_rng(0)
+    return {
+        'data': [pd.DataFrame(rng.random((num_rows, 4)), columns=list('abcd')) for _ in range(2)],
+        'weights': [rng.random(num_rows) for _ in range(2)],
+        'scale': list(np.linspace(0, 1, NUM_CASES // 4)),
+    }
+
+
+def sweep_seconds(num_rows: int, isolate: bool) -> float:
+    sensitivity_values = sensitivity_values_for(num_rows)
+    return min(timeit.repeat(
+        lambda: sensitivity_df(sensitivity_values, mean_of_scaled, isolate=isolate), number=1, repeat=3
+    ))
+
+
+class LargeObjects:
+    """
+    Sweeps of NUM_CASES cases whose parameter values are DataFrames and arrays of num_rows rows
+    """
+    params = (NUM_ROWS, [False, True])
+    param_names = ('rows', 'isolate')
+    timeout = 300
+
+    def setup(self, num_rows: int, isolate: bool):
+        self.sensitivity_values = sensitivity_values_for(num_rows)
+
+    def time_sensitivity_df(self, num_rows: int, isolate: bool):
+        sensitivity_df(self.sensitivity_values, mean_of_scaled, isolate=isolate)
+
+    def peakmem_sensitivity_df(self, num_rows: int, isolate: bool):
+        sensitivity_df(self.sensitivity_values, mean_of_scaled, isolate=isolate)
+
+
+def run(num_rows: Sequence[int] = NUM_ROWS):
+    print(f'{"rows":>10} {"isolate":>8} {"seconds":>10} {"us/case":>10}')
+    for rows in num_rows:
+        for isolate in (False, True):
+            seconds = sweep_seconds(rows, isolate)
+            print(f'{rows:>10,} {str(isolate):>8} {seconds:>10.3f} {seconds / NUM_CASES * 1e6:>10.2f}')
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,107 @@
+"""
+Compares building the pairwise tables shown by :meth:`sensitivity.SensitivityAnalyzer.styled_dfs` using the
+cythonized groupby aggregations for recognized reducers, reducing the axes of the analyzer's dense
+result tensor, and applying an arbitrary function to each group.
+
+Run with ``python -m benchmarks.pivot``
+
+The asv benchmarks time aggregating every pair of arguments of grids of 2 to 8 arguments, from 1,000 to
+1,000,000 cases, with :func:`sensitivity.df._two_variable_sensitivity_display_df` and through the analyzer.
+"""
+import itertools
+import timeit
+from typing import Sequence, Callable, Dict
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.sweep import grid_values
+from sensitivity import SensitivityAnalyzer
+from sensitivity.df import _two_variable_sensitivity_display_df
+
+NUM_VARIABLES = (6, 7, 8)
+VALUES_PER_VARIABLE = 5
+TABLE_DIMENSIONS = (2, 4, 8)
+TABLE_CASE_COUNTS = (1_000, 100_000, 1_000_000)
+# Wrapping np.mean hides it from the fast path so that it is applied to each group
+AGG_FUNCS: Dict[str, Callable] = {'mean': np.mean, 'apply': lambda values: np.mean(values)}
+
+
+def grid_df(num_variables: int) -> pd.DataFrame:
+    cols = [f'value{i}' for i in range(num_variables)]
+    values = np.arange(VALUES_PER_VARIABLE)
+    grids = np.meshgrid(*[values] * num_variables, indexing='ij')
+    df = pd.DataFrame({col: grid.ravel() for col, grid in zip(cols, grids)})
+    df['Result'] = np.random.default_rng(0).normal(size=len(df))
+    return df
+
+
+def results_df(num_dimensions: int, num_cases: int) -> pd.DataFrame:
+    """
+    Grid of close to num_cases cases over num_dimensions arguments, with random results
+    """
+    values = grid_values(num_dimensions, num_cases)
+    grids = np.meshgrid(*[np.asarray(arg_values) for arg_values in values.values()], indexing='ij')
+    df = pd.DataFrame({col: grid.ravel() for col, grid in zip(values, grids)})
+    df['Result'] = np.random.default_rng(0).normal(size=len(df))
+    return df
+
+
+def build_pairwise_tables(df: pd.DataFrame, agg_func: Callable):
+    cols = [col for col in df.columns if col != 'Result']
+    for col1, col2 in itertools.combinations(cols, 2):
+        _two_variable_sensitivity_display_df(df, col1, col2, agg_func=agg_func)
+
+
+def pairwise_tables_seconds(df: pd.DataFrame, agg_func: Callable) -> float:
+    return min(timeit.repeat(lambda: build_pairwise_tables(df, agg_func), number=1, repeat=3))
+
+
+def build_analyzer_tables(sa: SensitivityAnalyzer, agg_func: Callable):
+    # Includes arranging the results in the tensor, which happens once
+    sa._clear_derived_results()
+    for col1, col2 in itertools.combinations(sa.sensitivity_cols, 2):
+        sa._pairwise_display_df(col1, col2, 'Result', agg_func)
+
+
+def tensor_tables_seconds(df: pd.DataFrame) -> float:
+    sa = SensitivityAnalyzer.from_df(df)
+    return min(timeit.repeat(lambda: build_analyzer_tables(sa, np.mean), number=1, repeat=3))
+
+
+class PairwiseTables:
+    """
+    Aggregating the results for each pair of arguments
+    """
+    params = (TABLE_DIMENSIONS, TABLE_CASE_COUNTS, list(AGG_FUNCS))
+    param_names = ('dimensions', 'cases', 'agg_func')
+    timeout = 300
+
+    def setup(self, num_dimensions: int, num_cases: int, agg_name: str):
+        self.df = results_df(num_dimensions, num_cases)
+        self.sa = SensitivityAnalyzer.from_df(self.df)
+        self.agg_func = AGG_FUNCS[agg_name]
+
+    def time_display_df(self, num_dimensions: int, num_cases: int, agg_name: str):
+        build_pairwise_tables(self.df, self.agg_func)
+
+    def time_analyzer_tables(self, num_dimensions: int, num_cases: int, agg_name: str):
+        build_analyzer_tables(self.sa, self.agg_func)
+
+    def peakmem_display_df(self, num_dimensions: int, num_cases: int, agg_name: str):
+        build_pairwise_tables(self.df, self.agg_func)
+
+
+def run(num_variables: Sequence[int] = NUM_VARIABLES):
+    print(f'{"variables":>10} {"cases":>10} {"apply s":>10} {"groupby s":>10} {"tensor s":>10} {"speedup":>10}')
+    for num in num_variables:
+        df = grid_df(num)
+        apply_seconds = pairwise_tables_seconds(df, AGG_FUNCS['apply'])
+        groupby_seconds = pairwise_tables_seconds(df, np.mean)
+        tensor_seconds = tensor_tables_seconds(df)
+        print(f'{num:>10} {len(df):>10,} {apply_seconds:>10.3f} {groupby_seconds:>10.3f} {tensor_seconds:>10.3f} '
+              f'{apply_seconds / tensor_seconds:>9.0f}x')
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,98 @@
+"""
+Shows how :func:`sensitivity.df.sensitivity_df` scales with the number of cases.
+
+Run with ``python -m benchmarks.sweep``. The time per case should stay roughly
+constant as the number of cases grows, i.e. the sweep scales linearly.
+
+The asv benchmarks time and measure the peak memory of sweeps over grids of 1 to 8 arguments, from 10 to
+1,000,000 cases, with a cheap func and an expensive one.
+"""
+import math
+import timeit
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from sensitivity.df import sensitivity_df
+
+CASE_COUNTS = (1_000, 10_000, 100_000, 1_000_000)
+GRID_DIMENSIONS = (1, 2, 4, 8)
+GRID_CASE_COUNTS = (10, 1_000, 100_000, 1_000_000)
+# Running the expensive func for every case takes minutes beyond this
+MAX_EXPENSIVE_CASES = 10_000
+
+
+def cheap_func(value1, value2, value3):
+    return value1 + value2 * value3
+
+
+def sum_func(**kwargs):
+    return sum(kwargs.values())
+
+
+def expensive_func(**kwargs):
+    # Pure Python work of about 20 microseconds, standing in for a model
+    total = sum(kwargs.values())
+    return sum(math.sin(total * i) for i in range(200))
+
+
+SWEEP_FUNCS = {'cheap': sum_func, 'expensive': expensive_func}
+
+
+def sensitivity_values_for(num_cases: int) -> Dict[str, List[int]]:
+    """
+    Three parameters whose cartesian product has num_cases cases, num_cases must be a multiple of 100
+    """
+    return {
+        'value1': list(range(10)),
+        'value2': list(range(10)),
+        'value3': list(range(num_cases // 100)),
+    }
+
+
+def grid_values(num_dimensions: int, num_cases: int) -> Dict[str, List[int]]:
+    """
+    num_dimensions parameters whose cartesian product has close to num_cases cases, with values spread as
+    evenly as possible over the parameters
+    """
+    values_per_dimension = max(int(round(num_cases ** (1 / num_dimensions))), 1)
+    lengths = [values_per_dimension] * (num_dimensions - 1)
+    lengths.append(max(num_cases // max(int(np.prod(lengths)), 1), 1))
+    return {f'value{i}': list(range(length)) for i, length in enumerate(lengths)}
+
+
+def sweep_seconds(num_cases: int) -> float:
+    sensitivity_values = sensitivity_values_for(num_cases)
+    return min(timeit.repeat(lambda: sensitivity_df(sensitivity_values, cheap_func), number=1, repeat=1))
+
+
+class Sweep:
+    """
+    Calling func once per case
+    """
+    params = (GRID_DIMENSIONS, GRID_CASE_COUNTS, list(SWEEP_FUNCS))
+    param_names = ('dimensions', 'cases', 'func')
+    timeout = 300
+
+    def setup(self, num_dimensions: int, num_cases: int, func_name: str):
+        if func_name == 'expensive' and num_cases > MAX_EXPENSIVE_CASES:
+            raise NotImplementedError('too slow to run every case')
+        self.sensitivity_values = grid_values(num_dimensions, num_cases)
+        self.func = SWEEP_FUNCS[func_name]
+
+    def time_sensitivity_df(self, num_dimensions: int, num_cases: int, func_name: str):
+        sensitivity_df(self.sensitivity_values, self.func)
+
+    def peakmem_sensitivity_df(self, num_dimensions: int, num_cases: int, func_name: str):
+        sensitivity_df(self.sensitivity_values, self.func)
+
+
+def run(case_counts: Sequence[int] = CASE_COUNTS):
+    print(f'{"cases":>12} {"seconds":>10} {"us/case":>10}')
+    for num_cases in case_counts:
+        seconds = sweep_seconds(num_cases)
+        print(f'{num_cases:>12,} {seconds:>10.3f} {seconds / num_cases * 1e6:>10.2f}')
+
+
+if __name__ == '__main__':
+    run()
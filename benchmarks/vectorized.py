@@ -0,0 +1,61 @@
+"""
+Compares calling func once per case with the vectorized mode of :func:`sensitivity.df.sensitivity_df`
+for a model written as a NumPy expression.
+
+Run with ``python -m benchmarks.vectorized``
+
+The asv benchmarks time and measure the peak memory of vectorized sweeps over grids of 1 to 8 arguments, from 10
+to 1,000,000 cases, with the default and compact output.
+"""
+import timeit
+from typing import Sequence
+
+import numpy as np
+
+from benchmarks.sweep import sensitivity_values_for, grid_values, GRID_DIMENSIONS, GRID_CASE_COUNTS
+from sensitivity.df import sensitivity_df
+
+CASE_COUNTS = (10_000, 100_000, 1_000_000)
+
+
+def numpy_func(value1, value2, value3):
+    return np.sqrt(value1 + 1) * np.exp(-value2 / 10) + value3
+
+
+def vectorized_sum_func(**kwargs):
+    return np.sum(list(kwargs.values()), axis=0)
+
+
+def sweep_seconds(num_cases: int, **kwargs) -> float:
+    sensitivity_values = sensitivity_values_for(num_cases)
+    return min(timeit.repeat(lambda: sensitivity_df(sensitivity_values, numpy_func, **kwargs), number=1, repeat=1))
+
+
+class VectorizedSweep:
+    """
+    Calling a vectorized func once for every case
+    """
+    params = (GRID_DIMENSIONS, GRID_CASE_COUNTS, [False, True])
+    param_names = ('dimensions', 'cases', 'compact')
+    timeout = 300
+
+    def setup(self, num_dimensions: int, num_cases: int, compact: bool):
+        self.sensitivity_values = grid_values(num_dimensions, num_cases)
+
+    def time_sensitivity_df(self, num_dimensions: int, num_cases: int, compact: bool):
+        sensitivity_df(self.sensitivity_values, vectorized_sum_func, vectorized=True, compact=compact)
+
+    def peakmem_sensitivity_df(self, num_dimensions: int, num_cases: int, compact: bool):
+        sensitivity_df(self.sensitivity_values, vectorized_sum_func, vectorized=True, compact=compact)
+
+
+def run(case_counts: Sequence[int] = CASE_COUNTS):
+    print(f'{"cases":>12} {"per case s":>12} {"vectorized s":>14} {"speedup":>10}')
+    for num_cases in case_counts:
+        per_case = sweep_seconds(num_cases)
+        vectorized = sweep_seconds(num_cases, vectorized=True)
+        print(f'{num_cases:>12,} {per_case:>12.3f} {vectorized:>14.3f} {per_case / vectorized:>9.0f}x')
+
+
+if __name__ == '__main__':
+    run()
@@ -3,6 +3,15 @@ Python sensitivity analysis - run models with varying inputs to produce
 visualizations including gradient DataFrames and hex-bin plots
 """
 from sensitivity.main import SensitivityAnalyzer
+from sensitivity.exc import CaseEvaluationError
+from sensitivity.cache import ResultCache
+from sensitivity.estimate import SweepEstimate
+from sensitivity.sampling import ValueRange
+from sensitivity.indices import sobol_indices
+from sensitivity.oat import one_at_a_time, OneAtATimeResult
+from sensitivity.surrogate import SurrogateValidation
+from sensitivity.profiling import SweepProfile, slowest_regions
+from sensitivity.stream import iter_sensitivity_df, sensitivity_to_file, read_sensitivity_file
 from sensitivity import _ignore_warn
 
 _ignore_warn.ignore_nested_library_warnings()
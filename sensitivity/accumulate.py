@@ -0,0 +1,123 @@
+from typing import Sequence, Any, List, Optional, Dict
+
+import numpy as np
+import pandas as pd
+
+
+class ColumnAccumulator:
+    """
+    Collects sensitivity analysis rows into preallocated per-column arrays, then builds
+    the DataFrame once at the end rather than concatenating as each case is added.
+
+    Rows added one at a time are stored in object arrays, while batches of rows added as
+    arrays keep their NumPy dtype where possible.
+
+    :param columns: Names of the output columns, in order
+    :param num_rows: Number of rows which will be added, used to size the arrays
+    """
+
+    def __init__(self, columns: Sequence[str], num_rows: int):
+        self.columns: List[str] = list(columns)
+        self.num_rows = num_rows
+        self.arrays: List[Optional[np.ndarray]] = [None for _ in self.columns]
+        self.position = 0
+
+    def add_row(self, row: Sequence[Any]):
+        """
+        Add the values for the next row, one value for each column
+        """
+        self._check_space(1)
+        for i, value in enumerate(row):
+            arr = self.arrays[i]
+            if arr is None or arr.dtype != object:
+                # Only check the dtype until the column holds objects, which is after the first row
+                arr = self._array_for(i, np.dtype(object))
+            arr[self.position] = value
+        self.position += 1
+
+    def add_columns(self, columns: Sequence[np.ndarray]):
+        """
+        Add the values for the next several rows, one array of values for each column
+        """
+        num_rows = len(columns[0])
+        self._check_space(num_rows)
+        for i, values in enumerate(columns):
+            arr = self._array_for(i, values.dtype)
+            arr[self.position:self.position + num_rows] = values
+        self.position += num_rows
+
+    def column_values(self, column: str) -> np.ndarray:
+        """
+        Values added so far for column
+        """
+        return _empty_if_none(self.arrays[self.columns.index(column)])[:self.position]
+
+    def split_column(self, column: str, arrays: Dict[str, np.ndarray]):
+        """
+        Replace column with a column for each of arrays, which have a value for each row added so far
+        """
+        i = self.columns.index(column)
+        self.columns[i:i + 1] = list(arrays)
+        self.arrays[i:i + 1] = list(arrays.values())
+
+    def to_df(self) -> pd.DataFrame:
+        """
+        Build the DataFrame from the rows added so far, inferring the best nullable dtypes
+        """
+        df = pd.DataFrame(
+            {i: _empty_if_none(arr)[:self.position] for i, arr in enumerate(self.arrays)},
+        )
+        df.columns = self.columns
+        return df.convert_dtypes()
+
+    def to_compact_df(self, categories: Dict[str, Sequence[Any]]) -> pd.DataFrame:
+        """
+        Build the DataFrame from the rows added so far, storing the columns in categories as Categorical
+        columns with those categories and the other columns as float64, rather than inferring dtypes
+
+        :param categories: Dictionary where keys are column names and values are all the possible values
+            in that column
+        """
+        data: Dict[str, Any] = {}
+        for col, arr in zip(self.columns, self.arrays):
+            values = _empty_if_none(arr)[:self.position]
+            if col in categories:
+                data[col] = pd.Categorical(values, categories=categories[col])
+                continue
+            try:
+                data[col] = pd.to_numeric(values).astype(np.float64, copy=False)
+            except (TypeError, ValueError) as e:
+                raise ValueError(f'compact output requires numeric values for {col}') from e
+        return pd.DataFrame(data, columns=self.columns)
+
+    def _array_for(self, i: int, dtype: np.dtype) -> np.ndarray:
+        """
+        Get the array for the column at position i, allocating it or widening its dtype so that it can hold dtype
+        """
+        arr = self.arrays[i]
+        if arr is None:
+            arr = np.empty(self.num_rows, dtype=dtype)
+        elif not np.can_cast(dtype, arr.dtype, casting='safe'):
+            arr = arr.astype(_widened_dtype(arr.dtype, dtype))
+        self.arrays[i] = arr
+        return arr
+
+    def _check_space(self, num_rows: int):
+        if self.position + num_rows > self.num_rows:
+            raise ValueError(f'accumulator was sized for {self.num_rows} rows, cannot add more')
+
+
+def _widened_dtype(dtype1: np.dtype, dtype2: np.dtype) -> np.dtype:
+    if dtype1.kind != dtype2.kind and (dtype1.kind in 'OUS' or dtype2.kind in 'OUS'):
+        # NumPy would convert numbers to strings, keep the original values instead
+        return np.dtype(object)
+    try:
+        return np.result_type(dtype1, dtype2)
+    except TypeError:
+        return np.dtype(object)
+
+
+def _empty_if_none(arr: Optional[np.ndarray]) -> np.ndarray:
+    if arr is None:
+        return np.empty(0, dtype=object)
+    return arr
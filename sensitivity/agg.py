@@ -0,0 +1,72 @@
+import functools
+import numbers
+from typing import Dict, Any, Callable, Optional, Tuple
+
+import numpy as np
+
+# Aggregation names which have equivalents both as cythonized groupby methods and as NumPy
+# reducers which skip missing values
+REDUCER_NAMES = ('mean', 'median', 'min', 'max', 'sum', 'std', 'var', 'quantile')
+# Reducers which give a result of the same type as the values
+DTYPE_PRESERVING_REDUCERS = ('min', 'max', 'sum')
+# Reducers where reducing the results of reducing equal sized groups gives the same result as reducing
+# all the values at once
+DECOMPOSABLE_REDUCERS = ('mean', 'min', 'max', 'sum')
+
+_NUMPY_REDUCER_NAMES: Dict[Callable, str] = {
+    np.mean: 'mean',
+    np.nanmean: 'mean',
+    np.median: 'median',
+    np.nanmedian: 'median',
+    np.min: 'min',
+    np.nanmin: 'min',
+    np.max: 'max',
+    np.nanmax: 'max',
+    np.sum: 'sum',
+    np.nansum: 'sum',
+    np.std: 'std',
+    np.nanstd: 'std',
+    np.var: 'var',
+    np.nanvar: 'var',
+}
+# Quantile functions and the scale of their q argument
+_NUMPY_QUANTILES: Dict[Callable, float] = {
+    np.quantile: 1,
+    np.nanquantile: 1,
+    np.percentile: 100,
+    np.nanpercentile: 100,
+}
+
+
+def _recognized_reducer(agg_func: Any) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    Identifies common reducers so they can be computed in bulk rather than by calling agg_func on each group
+
+    Recognizes the NumPy reducers and their nan variants, pandas aggregation names, and partials of
+    the NumPy quantile and percentile functions with a scalar q. Like NumPy, std and var are the
+    population statistics.
+
+    :return: Name of the reducer, one of REDUCER_NAMES, and its keyword arguments, or None if agg_func
+        is not recognized
+    """
+    if isinstance(agg_func, str):
+        if agg_func in REDUCER_NAMES and agg_func != 'quantile':
+            return agg_func, {}
+        return None
+    if isinstance(agg_func, functools.partial):
+        quantile_scale = _NUMPY_QUANTILES.get(agg_func.func)
+        if quantile_scale is None or agg_func.args or set(agg_func.keywords) != {'q'}:
+            return None
+        q = agg_func.keywords['q']
+        if not isinstance(q, numbers.Real):
+            # e.g. an array of quantiles, which must be applied to each group
+            return None
+        return 'quantile', {'q': float(q) / quantile_scale}
+    try:
+        name = _NUMPY_REDUCER_NAMES.get(agg_func)
+    except TypeError:
+        # Unhashable callable, can't be one of the NumPy functions
+        return None
+    if name is None:
+        return None
+    return name, {}
@@ -0,0 +1,318 @@
+import functools
+import hashlib
+import inspect
+import pickle
+import sqlite3
+import time
+import types
+import warnings
+from pathlib import Path
+from typing import Union, Optional, Callable, Dict, Any, Sequence, Iterable, Iterator, Tuple, List, Awaitable, Set
+
+from sensitivity.exc import CaseEvaluationError
+from sensitivity.execution import Case, _chunked
+from sensitivity.profiling import _untimed
+
+_CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    func TEXT NOT NULL,
+    value BLOB NOT NULL,
+    last_access INTEGER NOT NULL
+)
+"""
+_CREATE_INDEX_SQL = 'CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access)'
+# SQLite limits the number of parameters in a single statement
+_MAX_SQL_PARAMS = 900
+# Number of new results to evaluate before writing them to the cache
+_WRITE_EVERY = 1000
+
+
+class ResultCache:
+    """
+    Persistent store of func results, keyed by the function and the parameters passed to it, so that
+    rerunning a sensitivity analysis only evaluates cases which have not been run before.
+
+    Results are stored in a SQLite database. Keys are a hash of the function's module, name and version
+    along with all the arguments passed to it, including func_kwargs. Arguments and results must be picklable.
+
+    :param path: Path of the SQLite database file, created if it does not exist. Pass ':memory:' for
+        a cache which only lasts as long as this object
+    :param max_entries: Maximum number of results to keep. When exceeded, the least recently used
+        results are evicted. Default is no limit
+    :param func_version: Version of func to include in the keys, so that changing it invalidates the cached
+        results. Use when results depend on more than func itself, such as globals or files it reads. Default is a
+        hash of the source and compiled code of func, along with its defaults and the values it closes over. For a
+        partial this includes its arguments, and for a callable instance its class's __call__ and its attributes
+
+    Examples:
+        >>> from sensitivity import SensitivityAnalyzer, ResultCache
+        >>>
+        >>> cache = ResultCache('results.sqlite', max_entries=100_000)
+        >>> sa = SensitivityAnalyzer(sensitivity_values, my_model, cache=cache)
+        >>> sa.cache_hits, sa.cache_misses
+    """
+
+    def __init__(self, path: Union[str, Path] = ':memory:', max_entries: Optional[int] = None,
+                 func_version: Optional[str] = None):
+        self.path = str(path)
+        self.max_entries = max_entries
+        self.func_version = func_version
+        self.hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(self.path)
+        with self._conn:
+            self._conn.execute(_CREATE_TABLE_SQL)
+            self._conn.execute(_CREATE_INDEX_SQL)
+
+    def key(self, func: Callable, param_dict: Dict[str, Any]) -> str:
+        """
+        Stable key for the result of calling func with param_dict
+        """
+        return self._key(_func_name(func), self._version(func), param_dict)
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Any]:
+        """
+        Look up the cached results for keys, updating the hit and miss counts
+
+        :return: Dictionary of key to result containing only the keys which were found
+        """
+        found: Dict[str, Any] = {}
+        unique_keys = list(dict.fromkeys(keys))
+        for key_batch in _chunked(unique_keys, _MAX_SQL_PARAMS):
+            placeholders = ', '.join('?' * len(key_batch))
+            rows = self._conn.execute(
+                f'SELECT key, value FROM results WHERE key IN ({placeholders})', key_batch
+            ).fetchall()
+            found.update({key: pickle.loads(value) for key, value in rows})
+        self._touch(list(found))
+        num_found = sum(1 for key in keys if key in found)
+        self.hits += num_found
+        self.misses += len(keys) - num_found
+        return found
+
+    def set_many(self, func: Callable, results: Dict[str, Any]):
+        """
+        Store results of func, a dictionary of key to result, evicting the least recently used
+        results if the cache is over max_entries
+        """
+        now = time.time_ns()
+        func_name = _func_name(func)
+        with self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO results (key, func, value, last_access) VALUES (?, ?, ?, ?)',
+                [(key, func_name, pickle.dumps(value, protocol=4), now) for key, value in results.items()]
+            )
+        self._evict()
+
+    def invalidate(self, func: Optional[Callable] = None):
+        """
+        Remove cached results
+
+        :param func: Only remove the results of this function, across all its versions. Default removes everything
+        """
+        with self._conn:
+            if func is None:
+                self._conn.execute('DELETE FROM results')
+            else:
+                self._conn.execute('DELETE FROM results WHERE func = ?', (_func_name(func),))
+
+    def clear(self):
+        """
+        Remove all cached results and reset the hit and miss counts
+        """
+        self.invalidate()
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        self._conn.close()
+
+    def __len__(self) -> int:
+        return self._conn.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def _key(self, func_name: str, version: str, param_dict: Dict[str, Any]) -> str:
+        identity = (func_name, version, sorted(param_dict.items()))
+        return hashlib.sha256(pickle.dumps(identity, protocol=4)).hexdigest()
+
+    def _version(self, func: Callable) -> str:
+        if self.func_version is not None:
+            return self.func_version
+        return _func_fingerprint(func)
+
+    def _touch(self, keys: Sequence[str]):
+        now = time.time_ns()
+        with self._conn:
+            for key_batch in _chunked(keys, _MAX_SQL_PARAMS):
+                placeholders = ', '.join('?' * len(key_batch))
+                self._conn.execute(
+                    f'UPDATE results SET last_access = ? WHERE key IN ({placeholders})', [now, *key_batch]
+                )
+
+    def _evict(self):
+        if self.max_entries is None:
+            return
+        num_over = len(self) - self.max_entries
+        if num_over <= 0:
+            return
+        with self._conn:
+            self._conn.execute(
+                'DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY last_access LIMIT ?)',
+                (num_over,)
+            )
+
+
+def _evaluate_with_cache(cache: ResultCache, func: Callable, sensitivity_cols: Sequence[str], cases: Iterable[Case],
+                         func_kwargs: Dict[str, Any],
+                         evaluate: Callable[[List[Case], int], Iterable[Tuple[Case, Any]]]
+                         ) -> Iterator[Tuple[Case, Any]]:
+    """
+    Looks up each case in the cache and only passes the missing cases to evaluate, storing
+    their results as they come in. Yields cases and results in the same order as cases.
+    """
+    cases = list(cases)
+    keys, results, missing = _cache_lookup(cache, func, sensitivity_cols, cases, func_kwargs)
+    missing_cases = [case for case, _ in missing]
+    _store_results(cache, func, [key for _, key in missing], evaluate(missing_cases, len(missing_cases)), results)
+
+    for case, key in zip(cases, keys):
+        yield case, results[key]
+
+
+async def _aevaluate_with_cache(cache: ResultCache, func: Callable, sensitivity_cols: Sequence[str],
+                                cases: Iterable[Case], func_kwargs: Dict[str, Any],
+                                evaluate: Callable[[List[Case], int], Awaitable[List[Tuple[Case, Any]]]]
+                                ) -> List[Tuple[Case, Any]]:
+    """
+    Async counterpart of :func:`_evaluate_with_cache`, awaiting evaluate for the cases missing from the cache
+    """
+    cases = list(cases)
+    keys, results, missing = _cache_lookup(cache, func, sensitivity_cols, cases, func_kwargs)
+    missing_cases = [case for case, _ in missing]
+    evaluated = await evaluate(missing_cases, len(missing_cases))
+    _store_results(cache, func, [key for _, key in missing], evaluated, results)
+    return [(case, results[key]) for case, key in zip(cases, keys)]
+
+
+def _cache_lookup(cache: ResultCache, func: Callable, sensitivity_cols: Sequence[str], cases: List[Case],
+                  func_kwargs: Dict[str, Any]) -> Tuple[List[str], Dict[str, Any], List[Tuple[Case, str]]]:
+    """
+    Keys for each case, the results found in the cache by key, and the cases missing from it along with their keys
+    """
+    # Fingerprint func once rather than for every case
+    func_name = _func_name(func)
+    version = cache._version(func)
+    keys = [cache._key(func_name, version, {**dict(zip(sensitivity_cols, case)), **func_kwargs}) for case in cases]
+    results = cache.get_many(keys)
+    missing = [(case, key) for case, key in zip(cases, keys) if key not in results]
+    return keys, results, missing
+
+
+def _store_results(cache: ResultCache, func: Callable, keys: Sequence[str], evaluated: Iterable[Tuple[Case, Any]],
+                   results: Dict[str, Any]):
+    """
+    Adds the evaluated result for each of keys to results, writing them to the cache as they come in
+    """
+    new_results: Dict[str, Any] = {}
+    for key, (_, result) in zip(keys, evaluated):
+        results[key] = result
+        if isinstance(result, CaseEvaluationError):
+            # Recorded failure, try again next time rather than caching it
+            continue
+        new_results[key] = _untimed(result)
+        if len(new_results) >= _WRITE_EVERY:
+            cache.set_many(func, new_results)
+            new_results = {}
+    cache.set_many(func, new_results)
+
+
+def _func_name(func: Callable) -> str:
+    if isinstance(func, functools.partial):
+        # File partials under the function they wrap, their arguments are part of the version
+        return _func_name(func.func)
+    module = getattr(func, '__module__', None)
+    name = getattr(func, '__qualname__', None) or getattr(func, '__name__', None) or type(func).__qualname__
+    return f'{module}.{name}'
+
+
+def _func_fingerprint(func: Callable) -> str:
+    return hashlib.sha256(b''.join(_fingerprint_parts(func, set()))).hexdigest()
+
+
+def _fingerprint_parts(func: Callable, seen: Set[int]) -> Iterator[bytes]:
+    """
+    Bytes which change when the results of func may change. seen holds the ids of the functions already
+    fingerprinted, for functions which refer to themselves
+    """
+    if id(func) in seen:
+        return
+    seen.add(id(func))
+    if isinstance(func, functools.partial):
+        yield from _fingerprint_parts(func.func, seen)
+        yield _value_bytes((func.args, sorted(func.keywords.items())), func, seen)
+        return
+    if isinstance(func, types.MethodType):
+        yield from _fingerprint_parts(func.__func__, seen)
+        yield _pickled_bytes(func.__self__, func)
+        return
+    if not isinstance(func, (types.FunctionType, types.BuiltinFunctionType, type)) and \
+            isinstance(getattr(type(func), '__call__', None), types.FunctionType):
+        # Callable instance, its results depend on the __call__ method of its class and its attributes
+        yield from _fingerprint_parts(type(func).__call__, seen)
+        yield _pickled_bytes(func, func)
+        return
+    code = getattr(func, '__code__', None)
+    try:
+        yield inspect.getsource(func).encode()
+    except (OSError, TypeError):
+        if code is None:
+            # Builtins and ufuncs have no source or code, their repr names them
+            yield _repr_bytes(func, func, warn=' at 0x' in repr(func))
+    if code is not None:
+        # Lambdas on the same line share their source
+        yield _code_bytes(code)
+        kwdefaults = sorted((getattr(func, '__kwdefaults__', None) or {}).items())
+        yield _value_bytes((getattr(func, '__defaults__', None), kwdefaults), func, seen)
+        for cell in getattr(func, '__closure__', None) or ():
+            try:
+                contents = cell.cell_contents
+            except ValueError:
+                # Variable not assigned yet
+                continue
+            yield _value_bytes(contents, func, seen)
+
+
+def _code_bytes(code: types.CodeType) -> bytes:
+    """
+    Bytecode and constants of code and the functions defined in it, without line numbers so that moving func
+    within its file keeps its fingerprint
+    """
+    parts = [code.co_code, repr(code.co_names).encode()]
+    for const in code.co_consts:
+        parts.append(_code_bytes(const) if isinstance(const, types.CodeType) else repr(const).encode())
+    return b''.join(parts)
+
+
+def _value_bytes(value: Any, func: Callable, seen: Set[int]) -> bytes:
+    if callable(value) and not isinstance(value, type):
+        return b''.join(_fingerprint_parts(value, seen))
+    if isinstance(value, (tuple, list)):
+        # May hold functions, such as the arguments of a partial
+        return b''.join([repr(type(value)).encode(), *(_value_bytes(item, func, seen) for item in value)])
+    return _pickled_bytes(value, func)
+
+
+def _pickled_bytes(value: Any, func: Callable) -> bytes:
+    try:
+        return pickle.dumps(value, protocol=4)
+    except Exception:
+        return _repr_bytes(value, func, warn=True)
+
+
+def _repr_bytes(value: Any, func: Callable, warn: bool) -> bytes:
+    text = repr(value)
+    if warn:
+        warnings.warn(f'ResultCache cannot reliably fingerprint {text} used by {_func_name(func)}, so its cached '
+                      f'results may be reused after it changes or not reused at all. Pass func_version to '
+                      f'ResultCache to set when they are reused')
+    return text.encode()
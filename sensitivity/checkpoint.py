@@ -0,0 +1,114 @@
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import Union, Callable, Sequence, Iterable, Iterator, Tuple, Any, Dict, List
+
+from tqdm import tqdm
+
+from sensitivity.cache import _func_name
+from sensitivity.execution import Case, _chunked
+from sensitivity.profiling import _untimed
+
+_CHECKPOINT_FORMAT = 2
+
+
+def _evaluate_with_checkpoint(path: Union[str, Path], func: Callable, sensitivity_cols: Sequence[str],
+                              cases: Iterable[Case], num_cases: int, func_kwargs: Dict[str, Any],
+                              evaluate: Callable[..., Iterable[Tuple[Case, Any]]],
+                              resume: bool = False, checkpoint_every: int = 1000) -> Iterator[Tuple[Case, Any]]:
+    """
+    Evaluates the cases in chunks of checkpoint_every cases, appending the results of each chunk to the
+    checkpoint file at path. With resume, the results already in the checkpoint file are used for the first
+    cases and only the remaining cases are evaluated. Yields cases and results in the same order as cases.
+
+    The checkpoint file holds a header identifying the run followed by pickled lists of results, so the
+    position in the grid is the number of results stored. The header includes a hash of the cases and
+    func_kwargs, so that results are not resumed for different values.
+    """
+    path = Path(path)
+    # Hashing needs every case before any are evaluated
+    cases = list(cases)
+    header = {
+        'format': _CHECKPOINT_FORMAT,
+        'func': _func_name(func),
+        'columns': list(sensitivity_cols),
+        'num_cases': num_cases,
+        'inputs': _inputs_hash(cases, func_kwargs),
+    }
+    done: List[Any] = []
+    if resume and path.exists():
+        done = _load_checkpoint(path, header)
+    # Start the file over with everything done so far, which also drops a partially written last record
+    _write_checkpoint(path, header, done)
+
+    cases_iter = iter(cases)
+    for result in done:
+        yield next(cases_iter), result
+
+    with tqdm(total=num_cases, initial=len(done)) as progress, open(path, 'ab') as f:
+        for chunk in _chunked(cases_iter, checkpoint_every):
+            new_results: List[Any] = []
+            try:
+                for case, result in evaluate(chunk, len(chunk), progress=False):
+                    new_results.append(_untimed(result))
+                    progress.update(1)
+                    yield case, result
+            finally:
+                # Save whatever finished even if the run is stopping
+                _append_results(f, new_results)
+
+
+def _extend_checkpoint_path(path: Union[str, Path], param: str, new_values: Sequence[Any]) -> Path:
+    """
+    Checkpoint file next to path for the cases added by extending param with new_values, named after a hash
+    of them so that each extension can be resumed separately
+    """
+    path = Path(path)
+    digest = hashlib.sha256(pickle.dumps((param, list(new_values)), protocol=4)).hexdigest()
+    return path.with_name(f'{path.stem}.extend-{digest[:12]}{path.suffix}')
+
+
+def _load_checkpoint(path: Path, header: Dict[str, Any]) -> List[Any]:
+    results: List[Any] = []
+    with open(path, 'rb') as f:
+        stored_header = pickle.load(f)
+        if stored_header != header:
+            raise ValueError(
+                f'checkpoint at {path} is for a different sensitivity analysis, got {stored_header} '
+                f'but expected {header}. Remove it or pass resume=False to start over'
+            )
+        while True:
+            try:
+                results.extend(pickle.load(f))
+            except (EOFError, pickle.UnpicklingError):
+                # End of file, or a record which was cut off when the run stopped
+                break
+    return results
+
+
+def _inputs_hash(cases: Sequence[Case], func_kwargs: Dict[str, Any]) -> str:
+    """
+    Stable hash of the values of every case and func_kwargs
+    """
+    digest = hashlib.sha256(pickle.dumps(sorted(func_kwargs.items()), protocol=4))
+    for chunk in _chunked(cases, 10_000):
+        digest.update(pickle.dumps(chunk, protocol=4))
+    return digest.hexdigest()
+
+
+def _write_checkpoint(path: Path, header: Dict[str, Any], results: List[Any]):
+    temp_path = path.with_name(path.name + '.tmp')
+    with open(temp_path, 'wb') as f:
+        pickle.dump(header, f)
+        for chunk in _chunked(results, 10_000):
+            pickle.dump(chunk, f)
+    os.replace(temp_path, path)
+
+
+def _append_results(f, results: List[Any]):
+    if not results:
+        return
+    pickle.dump(results, f)
+    f.flush()
+    os.fsync(f.fileno())
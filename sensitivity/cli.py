@@ -0,0 +1,269 @@
+"""
+Command line interface to run sensitivity analyses from a config file, without a notebook, e.g. in cron jobs
+and containers. Run ``python -m sensitivity run config.yaml``.
+
+The config is a YAML (requires pyyaml) or JSON file such as::
+
+    func: mypackage.models:npv
+    sensitivity_values:
+      rate: [0.05, 0.1, 0.15]
+      years: [5, 10, 20]
+    func_kwargs:
+      initial_investment: 1000
+    backend: processes
+    n_jobs: 4
+    chunk_size: 100
+    output_dir: results
+
+func, constraint, on_case_start and on_case_end are import paths, ``module:name`` or ``module.name``. Values of
+an argument may be ``{low: 0, high: 1}`` for a :class:`.ValueRange` when sampling, and agg_func may be the name of
+a NumPy function such as median. Any other options are passed to :py:class:`.SensitivityAnalyzer`.
+"""
+import argparse
+import importlib
+import json
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Sequence, Union, Callable
+
+import numpy as np
+
+from sensitivity.main import SensitivityAnalyzer
+from sensitivity.profiling import SweepProfile
+from sensitivity.sampling import ValueRange
+from sensitivity.stream import _import_pyarrow, _table_writer
+
+BACKENDS = ('serial', 'processes', 'threads', 'async', 'vectorized')
+RESULTS_FORMATS = ('csv', 'parquet', 'arrow')
+# Options in the config which are handled by the CLI rather than passed to the analyzer
+_CLI_OPTIONS = ('func', 'sensitivity_values', 'func_kwargs', 'backend', 'output_dir', 'results_format', 'tables',
+                'plots')
+# Analyzer options which can't be written in a config file
+_NOT_CONFIGURABLE = ('func_kwargs_dict', 'executor', 'cache', 'lazy')
+
+
+@dataclass
+class RunSummary:
+    """
+    Outcome of running a sensitivity analysis from a config
+
+    :param num_cases: Number of cases in the results
+    :param seconds: Time taken to run the cases
+    :param files: Paths of the files written
+    :param profile: Time taken by each stage when the config sets profile
+    """
+    num_cases: int
+    seconds: float
+    files: List[Path] = field(default_factory=list)
+    profile: Optional[SweepProfile] = None
+
+    @property
+    def cases_per_second(self) -> float:
+        return self.num_cases / self.seconds if self.seconds > 0 else float('inf')
+
+    def __str__(self) -> str:
+        summary = (f'Ran {self.num_cases:,} cases in {self.seconds:.2f}s ({self.cases_per_second:,.1f} cases/sec), '
+                   f'wrote {len(self.files)} files')
+        if self.profile is not None:
+            summary += f'\nStages: {self.profile}'
+        return summary
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m sensitivity',
+        description='Run sensitivity analyses without a notebook',
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    run_parser = subparsers.add_parser('run', help='Run the sensitivity analysis described by a config file')
+    run_parser.add_argument('config', help='YAML or JSON config file')
+    run_parser.add_argument('--output-dir', help='Directory to write the outputs to, overrides the config')
+    run_parser.add_argument('--backend', choices=BACKENDS, help='How to run func, overrides the config')
+    run_parser.add_argument('--chunk-size', type=int,
+                            help='Number of cases to send to a worker at once, overrides the config')
+    args = parser.parse_args(argv)
+
+    config_path = Path(args.config)
+    config = load_config(config_path)
+    overrides = {'output_dir': args.output_dir, 'backend': args.backend, 'chunk_size': args.chunk_size}
+    config.update({key: value for key, value in overrides.items() if value is not None})
+    # Resolve paths in the config relative to it, and import func from modules next to it
+    sys.path.insert(0, str(config_path.parent.resolve()))
+    config.setdefault('output_dir', str(config_path.parent / f'{config_path.stem}-results'))
+    summary = run_config(config)
+    print(summary)
+    return 0
+
+
+def load_config(path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Reads a config from a YAML or JSON file
+    """
+    path = Path(path)
+    text = path.read_text()
+    if path.suffix.lower() == '.json':
+        config = json.loads(text)
+    else:
+        yaml = _import_yaml()
+        config = yaml.safe_load(text)
+    if not isinstance(config, dict):
+        raise ValueError(f'config must be a mapping of options, got {type(config).__name__} from {path}')
+    return config
+
+
+def run_config(config: Dict[str, Any]) -> RunSummary:
+    """
+    Runs the sensitivity analysis described by config and writes the results, styled tables and plots
+    to its output_dir
+
+    :param config: Options as read from a config file, see :mod:`sensitivity.cli`
+    :return: Number of cases, time taken and files written
+    """
+    missing = [key for key in ('func', 'sensitivity_values') if key not in config]
+    if missing:
+        raise ValueError(f'config must include {missing}')
+    backend = config.get('backend', 'serial')
+    if backend not in BACKENDS:
+        raise ValueError(f'backend must be one of {BACKENDS}, got {backend}')
+    results_format = config.get('results_format', 'csv')
+    if results_format not in RESULTS_FORMATS:
+        raise ValueError(f'results_format must be one of {RESULTS_FORMATS}, got {results_format}')
+
+    analyzer_kwargs = _analyzer_kwargs(config)
+    sensitivity_values = {
+        col: ValueRange(**values) if isinstance(values, dict) else values
+        for col, values in config['sensitivity_values'].items()
+    }
+    with ExitStack() as stack:
+        if backend == 'processes':
+            analyzer_kwargs.setdefault('n_jobs', -1)
+        elif backend == 'threads':
+            max_workers = analyzer_kwargs.pop('n_jobs', None)
+            analyzer_kwargs['executor'] = stack.enter_context(ThreadPoolExecutor(max_workers=max_workers))
+        elif backend == 'async':
+            analyzer_kwargs['async_mode'] = True
+        elif backend == 'vectorized':
+            analyzer_kwargs['vectorized'] = True
+        sa = SensitivityAnalyzer(
+            sensitivity_values,
+            _import_object(config['func']),
+            func_kwargs_dict=config.get('func_kwargs') or {},
+            lazy=True,
+            **analyzer_kwargs
+        )
+        start = time.perf_counter()
+        sa.run()
+        seconds = time.perf_counter() - start
+
+    output_dir = Path(config.get('output_dir', '.'))
+    output_dir.mkdir(parents=True, exist_ok=True)
+    files = [_write_results(sa, output_dir, results_format)]
+    if config.get('tables', True):
+        files.extend(_write_tables(sa, output_dir))
+    if config.get('plots', True):
+        files.extend(_write_plots(sa, output_dir))
+    if sa.time_cases:
+        path = output_dir / 'slowest_regions.csv'
+        sa.slowest_regions().to_csv(path, index=False)
+        files.append(path)
+    return RunSummary(num_cases=len(sa.df), seconds=seconds, files=files, profile=sa.sweep_profile)
+
+
+def _analyzer_kwargs(config: Dict[str, Any]) -> Dict[str, Any]:
+    configurable = {
+        analyzer_field.name for analyzer_field in fields(SensitivityAnalyzer)
+        if analyzer_field.name not in _NOT_CONFIGURABLE
+    } - set(_CLI_OPTIONS)
+    unknown = set(config) - configurable - set(_CLI_OPTIONS)
+    if unknown:
+        raise ValueError(f'unknown options {sorted(unknown)} in config')
+    kwargs = {key: value for key, value in config.items() if key in configurable}
+    if isinstance(kwargs.get('agg_func'), str):
+        kwargs['agg_func'] = getattr(np, kwargs['agg_func'])
+    for key in ('constraint', 'on_case_start', 'on_case_end'):
+        if isinstance(kwargs.get(key), str):
+            kwargs[key] = _import_object(kwargs[key])
+    return kwargs
+
+
+def _write_results(sa: SensitivityAnalyzer, output_dir: Path, results_format: str) -> Path:
+    if results_format == 'csv':
+        path = output_dir / 'results.csv'
+        sa.df.to_csv(path, index=False)
+        return path
+    pa = _import_pyarrow()
+    path = output_dir / f'results.{results_format}'
+    table = pa.Table.from_pandas(sa.df, preserve_index=False)
+    writer = _table_writer(path, table.schema, results_format)
+    try:
+        writer.write_table(table)
+    finally:
+        writer.close()
+    return path
+
+
+def _write_tables(sa: SensitivityAnalyzer, output_dir: Path) -> List[Path]:
+    paths: List[Path] = []
+    for result_col in sa.result_cols:
+        styled = sa.styled_dfs(disp=False, result=result_col)
+        if not isinstance(styled, dict):
+            styled = {tuple(sa.sensitivity_cols): styled}
+        for cols, styler in styled.items():
+            path = output_dir / _file_name(f'{result_col} by {" vs ".join(cols)}', '.html')
+            path.write_text(styler.to_html())
+            paths.append(path)
+    return paths
+
+
+def _write_plots(sa: SensitivityAnalyzer, output_dir: Path) -> List[Path]:
+    if len(sa.sensitivity_cols) < 2:
+        # Hex-bin plots need a pair of arguments
+        return []
+    import matplotlib
+    import matplotlib.pyplot as plt
+
+    # No display to show plots on, only save them
+    matplotlib.use('Agg')
+
+    paths: List[Path] = []
+    for result_col in sa.result_cols:
+        fig = sa.plot(result=result_col)
+        path = output_dir / _file_name(result_col, '.png')
+        fig.savefig(path)
+        plt.close(fig)
+        paths.append(path)
+    return paths
+
+
+def _import_object(import_path: str) -> Callable:
+    """
+    Imports an object from a path such as ``package.module:name`` or ``package.module.name``
+    """
+    if ':' in import_path:
+        module_name, name = import_path.split(':', 1)
+    else:
+        module_name, _, name = import_path.rpartition('.')
+    if not module_name or not name:
+        raise ValueError(f'import path must be module:name or module.name, got {import_path}')
+    obj: Any = importlib.import_module(module_name)
+    for attr in name.split('.'):
+        obj = getattr(obj, attr)
+    return obj
+
+
+def _file_name(name: str, suffix: str) -> str:
+    return re.sub(r'[^\w\-. ]', '_', name) + suffix
+
+
+def _import_yaml():
+    try:
+        import yaml
+    except ImportError as e:
+        raise ImportError('pyyaml is required to read YAML config files, install it with pip install pyyaml, '
+                          'or write the config as JSON') from e
+    return yaml
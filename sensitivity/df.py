@@ -1,68 +1,577 @@
 import operator
+import time
 from functools import reduce
-from typing import Dict, Any, Callable, Sequence, Optional
+from typing import Dict, Any, Callable, Sequence, Optional, Iterable, Tuple, List, Union, TYPE_CHECKING
+import functools
 import itertools
-from copy import deepcopy
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import ExitStack
+from pathlib import Path
 
 import pandas as pd
-from pandas.io.formats.style import Styler
+from pandas.core.groupby import SeriesGroupBy
 import numpy as np
-from tqdm import tqdm
 
+from sensitivity.accumulate import ColumnAccumulator
+from sensitivity.agg import _recognized_reducer
+from sensitivity.cache import ResultCache, _evaluate_with_cache, _aevaluate_with_cache
+from sensitivity.checkpoint import _evaluate_with_checkpoint
 from sensitivity.colors import _get_color_map
+from sensitivity.execution import _evaluate_cases, _evaluate_vectorized, _evaluate_cases_async, _is_async_func, \
+    _run_in_new_event_loop, _grid_batches, _max_workers, Case
+from sensitivity.exc import CaseEvaluationError
+from sensitivity.grid import _needs_reduced_grid, _reduced_grid, _constraint_mask, _unique_codes
+from sensitivity.outputs import OutputKey, _split_outputs, _output_names
+from sensitivity.profiling import SweepProfile, CaseStartHook, CaseEndHook, CASE_SECONDS_COL, _TimedFunc, \
+    _TimedResult, _profile_stage
+from sensitivity.sampling import ValueRange, _sample_params, _sample_batches, _sampled_cases, _has_ranges
+
+if TYPE_CHECKING:
+    # Styler imports jinja2, only import it when styling
+    from pandas.io.formats.style import Styler
+
+ERRORS_OPTIONS = ('raise', 'record')
 
 
 def sensitivity_df(sensitivity_values: Dict[str, Any], func: Callable,
                    result_name: str = 'Result',
                    labels: Optional[Dict[str, str]] = None,
+                   n_jobs: Optional[int] = None,
+                   executor: Optional[Executor] = None,
+                   chunk_size: Optional[int] = None,
+                   vectorized: bool = False,
+                   batch_size: Optional[int] = None,
+                   async_mode: bool = False,
+                   max_concurrency: Optional[int] = 10,
+                   cache: Optional[ResultCache] = None,
+                   errors: str = 'raise',
+                   checkpoint_path: Optional[Union[str, Path]] = None,
+                   checkpoint_every: int = 1000,
+                   resume: bool = False,
+                   compact: bool = False,
+                   sampling: str = 'grid',
+                   num_samples: Optional[int] = None,
+                   seed: Optional[int] = None,
+                   constraint: Optional[Callable] = None,
+                   result_names: Optional[Sequence[str]] = None,
+                   isolate: bool = False,
+                   time_cases: bool = False,
+                   on_case_start: Optional[CaseStartHook] = None,
+                   on_case_end: Optional[CaseEndHook] = None,
+                   profile: Optional[SweepProfile] = None,
                    **func_kwargs) -> pd.DataFrame:
     """
     Creates a DataFrame containing the results of sensitivity analysis.
 
     Runs func with the cartesian product of the possible values for each argument, passed
-    in sensitivity_values.
+    in sensitivity_values, or with num_samples cases drawn from them when sampling. Each distinct combination of
+    values is only run once, so repeated values in sensitivity_values get the results of their first appearance.
 
     :param sensitivity_values: Dictionary where keys are func's argument names and values are lists of possible
-        values to use for that argument.
+        values to use for that argument. When sampling, values may also be a :class:`.ValueRange`
     :param func: Function that accepts arguments with names matching the keys of sensitivity_values, and outputs a
-        scalar value.
+        scalar value. It may instead return multiple outputs as a dict, tuple or 1-D NumPy array, which are each
+        stored in their own result column from the same run. When vectorized, return a dict or tuple of arrays, or a
+        2-D array with a column for each output
+    :param result_name: Name for result shown in graph color bar label
+    :param labels: Optional dictionary where keys are arguments of the function and values are the displayed names
+        for these arguments in the styled DataFrames and plots
+    :param n_jobs: Number of worker processes to run func in. Default is to run in the current process,
+        -1 uses all the CPUs. func and its arguments must be picklable to use multiple processes
+    :param executor: Optional :class:`concurrent.futures.Executor` to run func on, takes precedence over n_jobs.
+        The executor is not shut down after use
+    :param chunk_size: Number of cases to send to a worker at once when using n_jobs or executor. Default
+        splits the cases into several chunks per worker
+    :param vectorized: Set to True if func accepts arrays of values for each argument and returns an array of
+        results, one for each case. func is then called once per batch rather than once per case, with
+        one-dimensional arrays covering the cartesian product in the same order as the output rows
+    :param batch_size: Maximum number of cases to pass to func at once when vectorized, to bound peak memory.
+        Default is to pass all the cases at once
+    :param async_mode: Set to True if func returns awaitables, to run the cases concurrently on an event loop.
+        This is automatically enabled when func is an ``async def`` function. Use :func:`asensitivity_df`
+        when already inside a running event loop
+    :param max_concurrency: Maximum number of cases awaited at once in async mode, None for no limit
+    :param cache: Optional :class:`.ResultCache` to look up results from previous runs, so that func is only
+        called for cases which are not already cached. Not used when vectorized
+    :param errors: 'raise' to stop when func raises, or 'record' to leave the result missing for that case and
+        continue. Recorded errors are :class:`.CaseEvaluationError` instances in ``df.attrs['errors']``.
+        Must be 'raise' when vectorized
+    :param checkpoint_path: Optional file to save the completed cases to every checkpoint_every cases, so that
+        an interrupted run can be continued by passing resume=True. Not used when vectorized
+    :param checkpoint_every: Number of cases to run between saving checkpoints
+    :param resume: Set to True to continue from the cases already completed in the file at checkpoint_path,
+        only running the remaining cases
+    :param compact: Set to True to store the parameter columns as Categorical columns with the sensitivity values
+        as categories and the result column as float64, which uses much less memory for large analyses.
+        func must return numbers. Default infers nullable dtypes for every column
+    :param sampling: 'grid' to run the full cartesian product of the values. Otherwise how to draw num_samples
+        cases, covering many arguments at a small fraction of the cost of the grid: 'random' for uniform random
+        sampling, 'lhs' for a Latin hypercube, 'halton' for the Halton sequence, or 'sobol' for a scrambled Sobol
+        sequence, which requires scipy. Lists of values are sampled with equal probability for each value
+    :param num_samples: Number of cases to run when sampling
+    :param seed: Seed for drawing the samples. Pass it to get the same cases again, e.g. to resume from a
+        checkpoint
+    :param constraint: Optional function that accepts arrays of values for each argument, with names matching the
+        keys of sensitivity_values, and returns an array of bools, True for the cases which are valid. It is called
+        with many cases at once. Cases which are not valid are skipped without running func and left out of the
+        output, so there may be fewer than num_samples rows when sampling
+    :param result_names: Names for the outputs when func returns a tuple or 1-D array of them, to store each output
+        in its own column. Without result_names, such results are kept whole in the result_name column, unless
+        vectorized, when the columns default to result_name followed by the number of the output. When func
+        returns a dict, its keys are used as the column names
+    :param isolate: Set to True if func mutates its arguments, to pass it deep copies of the values and func_kwargs
+        for each case. Default passes the same objects to every case without copying, which is much faster for
+        large values such as DataFrames, so func must not modify them. Not used when vectorized
+    :param time_cases: Set to True to add a Case Seconds column with the wall time func took for each case, see
+        :func:`.slowest_regions`. When vectorized, each case gets the time for its batch divided by the number of
+        cases in the batch. Cases with results from the cache or a checkpoint are missing a time
+    :param on_case_start: Optional function called with a dict of the sensitivity values for each case just before
+        running func, e.g. to start a profiler. It is called in the process running func. Not used when vectorized
+    :param on_case_end: Optional function called with a dict of the sensitivity values, the result and the seconds
+        taken after running func for each case, including when func raises, in which case the result is None.
+        It is called in the process running func. Not used when vectorized
+    :param profile: Optional :class:`.SweepProfile` to add the time taken by each stage of the analysis to
+    :param func_kwargs: Additional arguments to pass to func, regardless of the sensitivity values picked
+    :return: a DataFrame containing the results from sensitivity analysis on func
+    :raises CaseEvaluationError: if func raises in a worker when using n_jobs or executor, with the
+        parameters of the failing case
+    """
+    sensitivity_cols = list(sensitivity_values.keys())
+    categories = _compact_categories(sensitivity_values) if compact else None
+    if resume and sampling != 'grid' and seed is None:
+        raise ValueError('must pass the seed used for the checkpointed run to resume a sampled analysis')
+    with _profile_stage(profile, 'grid'):
+        param_arrays, row_cases = _sweep_param_arrays(
+            sensitivity_values, sampling=sampling, num_samples=num_samples, seed=seed, constraint=constraint,
+            batch_size=batch_size,
+        )
+
+    if param_arrays is not None:
+        num_cases = len(param_arrays[0]) if param_arrays else 0
+        param_batches: Iterable[List[np.ndarray]] = _sample_batches(param_arrays, batch_size)
+        cases: Iterable[Case] = _sampled_cases(param_arrays) if not vectorized else []
+    else:
+        num_cases = reduce(operator.mul, [len(values) for values in sensitivity_values.values()], 1)
+        param_batches = _grid_batches(sensitivity_values, batch_size)
+        cases = itertools.product(*sensitivity_values.values())
+
+    if vectorized:
+        df = _vectorized_df(
+            func,
+            sensitivity_cols,
+            param_batches,
+            num_cases,
+            func_kwargs,
+            result_name=result_name,
+            labels=labels,
+            categories=categories,
+            result_names=result_names,
+            time_cases=time_cases,
+            profile=profile,
+            errors=errors,
+        )
+    else:
+        df = _cases_df(
+            func,
+            sensitivity_cols,
+            cases,
+            num_cases,
+            func_kwargs,
+            result_name=result_name,
+            labels=labels,
+            n_jobs=n_jobs,
+            executor=executor,
+            chunk_size=chunk_size,
+            async_mode=async_mode,
+            max_concurrency=max_concurrency,
+            cache=cache,
+            errors=errors,
+            checkpoint_path=checkpoint_path,
+            checkpoint_every=checkpoint_every,
+            resume=resume,
+            categories=categories,
+            result_names=result_names,
+            isolate=isolate,
+            time_cases=time_cases,
+            on_case_start=on_case_start,
+            on_case_end=on_case_end,
+            profile=profile,
+        )
+    if row_cases is not None:
+        with _profile_stage(profile, 'assemble'):
+            df = _broadcast_rows(df, row_cases)
+    return df
+
+
+def _sweep_param_arrays(sensitivity_values: Dict[str, Any], sampling: str = 'grid',
+                        num_samples: Optional[int] = None, seed: Optional[int] = None,
+                        constraint: Optional[Callable] = None,
+                        batch_size: Optional[int] = None) -> Tuple[Optional[List[np.ndarray]], Optional[np.ndarray]]:
+    """
+    Works out which cases to run. Returns an array of values for each argument with the cases to evaluate, or None
+    to evaluate the full grid of values, and the position of the evaluated case for each output row, or None when
+    every evaluated case is its own row
+    """
+    if sampling != 'grid':
+        param_arrays = _sample_params(sensitivity_values, sampling, num_samples, seed=seed)  # type: ignore
+        if constraint is not None:
+            valid = _constraint_mask(
+                list(sensitivity_values), _sample_batches(param_arrays, batch_size), num_samples,  # type: ignore
+                constraint
+            )
+            param_arrays = [arr[valid] for arr in param_arrays]
+        return param_arrays, None
+    if _has_ranges(sensitivity_values):
+        raise ValueError('ValueRange can only be used when sampling, pass sampling and num_samples')
+    if _needs_reduced_grid(sensitivity_values, constraint):
+        return _reduced_grid(sensitivity_values, constraint, batch_size=batch_size)
+    return None, None
+
+
+async def asensitivity_df(sensitivity_values: Dict[str, Any], func: Callable,
+                          result_name: str = 'Result',
+                          labels: Optional[Dict[str, str]] = None,
+                          max_concurrency: Optional[int] = 10,
+                          cache: Optional[ResultCache] = None,
+                          errors: str = 'raise',
+                          compact: bool = False,
+                          sampling: str = 'grid',
+                          num_samples: Optional[int] = None,
+                          seed: Optional[int] = None,
+                          constraint: Optional[Callable] = None,
+                          result_names: Optional[Sequence[str]] = None,
+                          isolate: bool = False,
+                          time_cases: bool = False,
+                          on_case_start: Optional[CaseStartHook] = None,
+                          on_case_end: Optional[CaseEndHook] = None,
+                          profile: Optional[SweepProfile] = None,
+                          **func_kwargs) -> pd.DataFrame:
+    """
+    Creates a DataFrame containing the results of sensitivity analysis, awaiting func for each case
+    on the running event loop.
+
+    Async counterpart of :func:`sensitivity_df` for use when already inside an event loop. The cases run
+    concurrently but the rows are in the same order as the cartesian product.
+
+    :param sensitivity_values: Dictionary where keys are func's argument names and values are lists of possible
+        values to use for that argument. When sampling, values may also be a :class:`.ValueRange`
+    :param func: ``async def`` function, or function returning an awaitable, that accepts arguments with names
+        matching the keys of sensitivity_values, and outputs a scalar value.
     :param result_name: Name for result shown in graph color bar label
     :param labels: Optional dictionary where keys are arguments of the function and values are the displayed names
         for these arguments in the styled DataFrames and plots
+    :param max_concurrency: Maximum number of cases awaited at once, None for no limit
+    :param cache: Optional :class:`.ResultCache` to look up results from previous runs, so that func is only
+        awaited for cases which are not already cached
+    :param errors: 'raise' to stop when func raises, or 'record' to leave the result missing for that case and
+        continue, see :func:`sensitivity_df`
+    :param compact: Set to True for Categorical parameter columns and a float64 result column, see
+        :func:`sensitivity_df`
+    :param sampling: 'grid' to run the full cartesian product of the values, or how to draw num_samples cases,
+        see :func:`sensitivity_df`
+    :param num_samples: Number of cases to run when sampling
+    :param seed: Seed for drawing the samples
+    :param constraint: Optional function which accepts arrays of values for each argument and returns an array
+        of bools, False for cases to skip, see :func:`sensitivity_df`
+    :param result_names: Names for the outputs when func returns a tuple or array of them, see
+        :func:`sensitivity_df`
+    :param isolate: Set to True if func mutates its arguments, to pass it deep copies of them for each case, see
+        :func:`sensitivity_df`
+    :param time_cases: Set to True to add a Case Seconds column with the wall time from starting each case until
+        its result was ready, see :func:`sensitivity_df`
+    :param on_case_start: Optional function called with a dict of the sensitivity values before each case, see
+        :func:`sensitivity_df`
+    :param on_case_end: Optional function called with a dict of the sensitivity values, the result and the seconds
+        taken after each case, see :func:`sensitivity_df`
+    :param profile: Optional :class:`.SweepProfile` to add the time taken by each stage of the analysis to
     :param func_kwargs: Additional arguments to pass to func, regardless of the sensitivity values picked
     :return: a DataFrame containing the results from sensitivity analysis on func
     """
+    if errors not in ERRORS_OPTIONS:
+        raise ValueError(f'errors must be one of {ERRORS_OPTIONS}, got {errors}')
+    record_errors = errors == 'record'
     sensitivity_cols = list(sensitivity_values.keys())
-    df = pd.DataFrame(columns=sensitivity_cols + [result_name])
-    num_cases = reduce(operator.mul, [len(values) for values in sensitivity_values.values()], 1)
-    for i in tqdm(itertools.product(*sensitivity_values.values()), total=num_cases):
-        base_param_dict = dict(zip(sensitivity_cols, i))
-        param_dict = deepcopy(base_param_dict)
-        param_dict.update(func_kwargs)
-        result = func(**param_dict)
-        base_param_dict.update({result_name: result})
-        df = pd.concat([df,pd.DataFrame(pd.Series(base_param_dict)).T])
-    df.reset_index(drop=True, inplace=True)
-    df = df.convert_dtypes()
+    with _profile_stage(profile, 'grid'):
+        param_arrays, row_cases = _sweep_param_arrays(
+            sensitivity_values, sampling=sampling, num_samples=num_samples, seed=seed, constraint=constraint
+        )
+    if param_arrays is not None:
+        num_cases = len(param_arrays[0]) if param_arrays else 0
+        cases: Iterable[Case] = _sampled_cases(param_arrays)
+    else:
+        num_cases = reduce(operator.mul, [len(values) for values in sensitivity_values.values()], 1)
+        cases = itertools.product(*sensitivity_values.values())
+    # The cache is keyed by func itself, only the evaluated func is timed
+    evaluated_func = func
+    if time_cases or on_case_start is not None or on_case_end is not None:
+        evaluated_func = _TimedFunc(func, sensitivity_cols, on_case_start=on_case_start, on_case_end=on_case_end)
+
+    async def evaluate(cases: Iterable[Case], num_cases: int) -> List[Tuple[Case, Any]]:
+        return await _evaluate_cases_async(
+            evaluated_func,
+            sensitivity_cols,
+            cases,
+            num_cases,
+            func_kwargs,
+            max_concurrency=max_concurrency,
+            record_errors=record_errors,
+            isolate=isolate,
+        )
+
+    columns = sensitivity_cols + [result_name] + ([CASE_SECONDS_COL] if time_cases else [])
+    accumulator = ColumnAccumulator(columns, num_cases)
+    case_errors: List[CaseEvaluationError] = []
+    with _profile_stage(profile, 'evaluate'):
+        if cache is None:
+            evaluated = await evaluate(cases, num_cases)
+        else:
+            evaluated = await _aevaluate_with_cache(cache, func, sensitivity_cols, cases, func_kwargs, evaluate)
+        _add_results(accumulator, evaluated, case_errors, time_cases=time_cases)
+    with _profile_stage(profile, 'assemble'):
+        _split_result_column(accumulator, sensitivity_cols, result_name, result_names)
+        categories = _compact_categories(sensitivity_values) if compact else None
+        df = _finalize_df(accumulator, labels, categories=categories)
+        if record_errors:
+            df.attrs['errors'] = case_errors
+        if row_cases is not None:
+            df = _broadcast_rows(df, row_cases)
+    return df
+
+
+def _cases_df(func: Callable, sensitivity_cols: Sequence[str], cases: Iterable[Case], num_cases: int,
+              func_kwargs: Dict[str, Any], result_name: str = 'Result', labels: Optional[Dict[str, str]] = None,
+              n_jobs: Optional[int] = None, executor: Optional[Executor] = None, chunk_size: Optional[int] = None,
+              async_mode: bool = False, max_concurrency: Optional[int] = 10,
+              cache: Optional[ResultCache] = None, errors: str = 'raise',
+              checkpoint_path: Optional[Union[str, Path]] = None, checkpoint_every: int = 1000,
+              resume: bool = False, categories: Optional[Dict[str, Sequence[Any]]] = None,
+              result_names: Optional[Sequence[str]] = None, isolate: bool = False, time_cases: bool = False,
+              on_case_start: Optional[CaseStartHook] = None, on_case_end: Optional[CaseEndHook] = None,
+              profile: Optional[SweepProfile] = None) -> pd.DataFrame:
+    """
+    Runs func for each of the passed cases, which are tuples of values in the order of sensitivity_cols,
+    and collects the results in a DataFrame, with a column for each output of func, in compact form if
+    categories are passed, and the seconds taken by each case if time_cases
+    """
+    if errors not in ERRORS_OPTIONS:
+        raise ValueError(f'errors must be one of {ERRORS_OPTIONS}, got {errors}')
+    record_errors = errors == 'record'
+    is_async = async_mode or _is_async_func(func)
+    # The cache and checkpoint are keyed by func itself, only the evaluated func is timed
+    evaluated_func = func
+    if time_cases or on_case_start is not None or on_case_end is not None:
+        evaluated_func = _TimedFunc(func, sensitivity_cols, on_case_start=on_case_start, on_case_end=on_case_end)
+
+    def evaluate(cases: Iterable[Case], num_cases: int, progress: bool = True) -> Iterable[Tuple[Case, Any]]:
+        if is_async:
+            return _run_in_new_event_loop(_evaluate_cases_async(
+                evaluated_func,
+                sensitivity_cols,
+                cases,
+                num_cases,
+                func_kwargs,
+                max_concurrency=max_concurrency,
+                record_errors=record_errors,
+                progress=progress,
+                isolate=isolate,
+            ))
+        return _evaluate_cases(
+            evaluated_func,
+            sensitivity_cols,
+            cases,
+            num_cases,
+            func_kwargs,
+            n_jobs=n_jobs,
+            executor=executor,
+            chunk_size=chunk_size,
+            record_errors=record_errors,
+            progress=progress,
+            isolate=isolate,
+        )
+
+    def evaluate_cached(cases: Iterable[Case], num_cases: int, progress: bool = True) -> Iterable[Tuple[Case, Any]]:
+        if cache is None:
+            return evaluate(cases, num_cases, progress=progress)
+        return _evaluate_with_cache(
+            cache, func, sensitivity_cols, cases, func_kwargs, functools.partial(evaluate, progress=progress)
+        )
+
+    columns = list(sensitivity_cols) + [result_name] + ([CASE_SECONDS_COL] if time_cases else [])
+    accumulator = ColumnAccumulator(columns, num_cases)
+    case_errors: List[CaseEvaluationError] = []
+    evaluated: Iterable[Tuple[Case, Any]]
+    with ExitStack() as stack:
+        stack.enter_context(_profile_stage(profile, 'evaluate'))
+        if checkpoint_path is not None:
+            if executor is None and n_jobs is not None and n_jobs != 1:
+                # Share one pool across the checkpointed chunks rather than starting new processes for each
+                executor = stack.enter_context(ProcessPoolExecutor(max_workers=_max_workers(n_jobs)))
+            evaluated = _evaluate_with_checkpoint(
+                checkpoint_path, func, sensitivity_cols, cases, num_cases, func_kwargs, evaluate_cached,
+                resume=resume, checkpoint_every=checkpoint_every,
+            )
+        else:
+            evaluated = evaluate_cached(cases, num_cases)
+        _add_results(accumulator, evaluated, case_errors, time_cases=time_cases)
+    with _profile_stage(profile, 'assemble'):
+        _split_result_column(accumulator, sensitivity_cols, result_name, result_names)
+        df = _finalize_df(accumulator, labels, categories=categories)
+    if record_errors:
+        df.attrs['errors'] = case_errors
+    return df
+
+
+def _add_results(accumulator: ColumnAccumulator, evaluated: Iterable[Tuple[Case, Any]],
+                 case_errors: List[CaseEvaluationError], time_cases: bool = False):
+    """
+    Adds a row to accumulator for each evaluated case, with a missing result for recorded errors, which are
+    collected in case_errors, and the seconds taken by each case if time_cases
+    """
+    for case, result in evaluated:
+        seconds = None
+        if isinstance(result, _TimedResult):
+            result, seconds = result
+        if isinstance(result, CaseEvaluationError):
+            case_errors.append(result)
+            result = None
+        accumulator.add_row(case + ((result, seconds) if time_cases else (result,)))
+
+
+def _vectorized_df(func: Callable, sensitivity_cols: Sequence[str], param_batches: Iterable[List[np.ndarray]],
+                   num_cases: int, func_kwargs: Dict[str, Any], result_name: str = 'Result',
+                   labels: Optional[Dict[str, str]] = None,
+                   categories: Optional[Dict[str, Sequence[Any]]] = None,
+                   result_names: Optional[Sequence[str]] = None, time_cases: bool = False,
+                   profile: Optional[SweepProfile] = None, errors: str = 'raise',
+                   progress: bool = True) -> pd.DataFrame:
+    """
+    Runs vectorized func once for each batch of parameter arrays and collects the results in a DataFrame,
+    with a column for each output of func, in compact form if categories are passed, and the seconds taken
+    per case in each batch if time_cases
+    """
+    if errors != 'raise':
+        # One call of func covers a whole batch, so there is no single case to record the error for
+        raise ValueError(f"errors must be 'raise' when vectorized, got {errors}")
+    time_columns = [CASE_SECONDS_COL] if time_cases else []
+    accumulator: Optional[ColumnAccumulator] = None
+    output_keys: List[OutputKey] = []
+    with _profile_stage(profile, 'evaluate'):
+        batch_start = time.perf_counter()
+        batches = _evaluate_vectorized(func, sensitivity_cols, param_batches, num_cases, func_kwargs,
+                                       progress=progress)
+        for param_arrays, outputs in batches:
+            num_batch_cases = len(param_arrays[0]) if param_arrays else 0
+            batch_seconds = time.perf_counter() - batch_start
+            if accumulator is None:
+                # The outputs of func are only known once it has run
+                output_keys = list(outputs)
+                output_names = _output_names(output_keys, result_name, result_names)
+                accumulator = ColumnAccumulator(list(sensitivity_cols) + output_names + time_columns, num_cases)
+            elif list(outputs) != output_keys:
+                raise ValueError(f'vectorized func must return the same outputs for every batch, got {output_keys} '
+                                 f'and {list(outputs)}')
+            times = [np.full(num_batch_cases, batch_seconds / max(num_batch_cases, 1))] if time_cases else []
+            accumulator.add_columns(param_arrays + list(outputs.values()) + times)
+            batch_start = time.perf_counter()
+    with _profile_stage(profile, 'assemble'):
+        if accumulator is None:
+            accumulator = ColumnAccumulator(list(sensitivity_cols) + [result_name] + time_columns, num_cases)
+        return _finalize_df(accumulator, labels, categories=categories)
+
+
+def _param_arrays_df(func: Callable, sensitivity_cols: Sequence[str], param_arrays: List[np.ndarray],
+                     func_kwargs: Dict[str, Any], vectorized: bool = False, batch_size: Optional[int] = None,
+                     **kwargs) -> pd.DataFrame:
+    """
+    Runs func for the cases given by the values at each position of param_arrays, which has an array for each
+    of sensitivity_cols, rather than for the grid of values
+
+    :param kwargs: Options for :func:`_cases_df`, or result_name, labels, categories and errors when vectorized
+    """
+    num_cases = len(param_arrays[0]) if param_arrays else 0
+    if vectorized:
+        return _vectorized_df(func, sensitivity_cols, _sample_batches(param_arrays, batch_size), num_cases,
+                              func_kwargs, **kwargs)
+    return _cases_df(func, sensitivity_cols, _sampled_cases(param_arrays), num_cases, func_kwargs, **kwargs)
+
+
+def _split_result_column(accumulator: ColumnAccumulator, sensitivity_cols: Sequence[str], result_name: str = 'Result',
+                         result_names: Optional[Sequence[str]] = None):
+    """
+    Splits the results of func into a column for each output when func returns a dict of outputs, or a tuple or
+    array of them when result_names are passed
+    """
+    def describe_case(i: int) -> str:
+        return 'case ' + ', '.join(f'{col}={accumulator.column_values(col)[i]!r}' for col in sensitivity_cols)
+
+    outputs = _split_outputs(accumulator.column_values(result_name), split_sequences=result_names is not None,
+                             describe_case=describe_case)
+    if outputs is None:
+        return
+    output_names = _output_names(list(outputs), result_name, result_names)
+    accumulator.split_column(result_name, dict(zip(output_names, outputs.values())))
+
+
+def _finalize_df(accumulator: ColumnAccumulator, labels: Optional[Dict[str, str]] = None,
+                 categories: Optional[Dict[str, Sequence[Any]]] = None) -> pd.DataFrame:
+    if categories is not None:
+        df = accumulator.to_compact_df(categories)
+    else:
+        df = accumulator.to_df()
     if labels:
         df.rename(columns=labels, inplace=True)
 
     return df
 
 
+def _broadcast_rows(df: pd.DataFrame, row_cases: np.ndarray) -> pd.DataFrame:
+    """
+    Expands the results of the evaluated cases in df to the output rows, taking the row of df at each of row_cases
+    """
+    if len(row_cases) == len(df) and (row_cases == np.arange(len(df))).all():
+        # Every case is its own row
+        return df
+    broadcast_df = df.take(row_cases).reset_index(drop=True)
+    broadcast_df.attrs = df.attrs
+    return broadcast_df
+
+
+def _compact_categories(sensitivity_values: Dict[str, Any]) -> Dict[str, Sequence[Any]]:
+    categories: Dict[str, Sequence[Any]] = {}
+    for col, values in sensitivity_values.items():
+        if isinstance(values, ValueRange):
+            # Sampled ranges are continuous, leave them as float columns
+            continue
+        _, uniques = _unique_codes(values)
+        if not pd.Index(uniques).is_unique:
+            raise ValueError(f'compact cannot store the values of {col} as categories, pandas treats some of them '
+                             f'as equal, e.g. 1 and True')
+        categories[col] = uniques.tolist()
+    return categories
+
+
 def _two_variable_sensitivity_display_df(df: pd.DataFrame, col1: str, col2: str,
                                          result_col: str = 'Result', agg_func: Callable = np.mean) -> pd.DataFrame:
-    df_or_series = df[[col1, col2, result_col]].groupby([col1, col2]).apply(agg_func)
-    if isinstance(df_or_series, pd.DataFrame):
-        series = df_or_series[result_col]
-    elif isinstance(df_or_series, pd.Series):
-        series = df_or_series
+    # Only include combinations which have results when the columns are Categorical
+    groupby = df[[col1, col2, result_col]].groupby([col1, col2], observed=True)
+    fast_agg = _fast_groupby_agg(agg_func)
+    if fast_agg is not None:
+        series = fast_agg(groupby[result_col])
     else:
-        raise ValueError(f'expected Series or DataFrame, got {df_or_series} of type {type(df_or_series)}')
+        df_or_series = groupby.apply(agg_func)
+        if isinstance(df_or_series, pd.DataFrame):
+            series = df_or_series[result_col]
+        elif isinstance(df_or_series, pd.Series):
+            series = df_or_series
+        else:
+            raise ValueError(f'expected Series or DataFrame, got {df_or_series} of type {type(df_or_series)}')
     selected_df = series.reset_index()
 
     wide_df = selected_df.pivot(index=col1, columns=col2, values=result_col)
     wide_df.columns.name = None
+    if wide_df.isna().to_numpy().any() and all(pd.api.types.is_numeric_dtype(dtype) for dtype in wide_df.dtypes):
+        # Combinations without results are NA in nullable columns, which the gradient styling can't handle
+        wide_df = wide_df.astype(float)
 
     # Fix for an odd Pandas bug introduced in 1.5
     # Even though this is effectively a no-op, without this was getting the following error
@@ -73,10 +582,25 @@ def _two_variable_sensitivity_display_df(df: pd.DataFrame, col1: str, col2: str,
     return wide_df
 
 
+def _fast_groupby_agg(agg_func: Callable) -> Optional[Callable[[SeriesGroupBy], pd.Series]]:
+    """
+    Gets a cythonized groupby aggregation which gives the same results as applying agg_func to each group,
+    or None if agg_func is not a recognized reducer and so must be applied to each group
+    """
+    reducer = _recognized_reducer(agg_func)
+    if reducer is None:
+        return None
+    name, kwargs = reducer
+    if name in ('std', 'var'):
+        # NumPy defaults to the population standard deviation and variance
+        kwargs = {**kwargs, 'ddof': 0}
+    return operator.methodcaller(name, **kwargs)
+
+
 def _style_sensitivity_df(df: pd.DataFrame, col1: str, col2: Optional[str] = None, result_col: str = 'Result',
                           reverse_colors: bool = False,
                           col_subset: Optional[Sequence[str]] = None,
-                          num_fmt: Optional[str] = None, color_map: str = 'RdYlGn') -> Styler:
+                          num_fmt: Optional[str] = None, color_map: str = 'RdYlGn') -> 'Styler':
     if col2 is not None:
         caption = f'{result_col} - {col1} vs. {col2}'
     else:
@@ -0,0 +1,87 @@
+import datetime
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, Callable, Optional
+
+import numpy as np
+
+from sensitivity.execution import _evaluate_cases, _evaluate_cases_async, _is_async_func, _run_in_new_event_loop, \
+    _values_array
+from sensitivity.sampling import _sample_params, _sampled_cases
+
+
+@dataclass
+class SweepEstimate:
+    """
+    Estimate of how long a sensitivity analysis will take, from timing func on a sample of the cases
+
+    :param num_cases: Total number of cases in the cartesian product of the sensitivity values, or the
+        number of samples when sampling
+    :param num_sampled: Number of cases which were run to time func
+    :param seconds_per_case: Average time taken by func for the sampled cases
+    """
+    num_cases: int
+    num_sampled: int
+    seconds_per_case: float
+
+    @property
+    def expected_seconds(self) -> float:
+        """
+        Expected time to run every case in a single process
+        """
+        return self.seconds_per_case * self.num_cases
+
+    def __str__(self) -> str:
+        expected = datetime.timedelta(seconds=round(self.expected_seconds))
+        return (
+            f'{self.num_cases:,} cases, about {self.seconds_per_case:.4g} seconds per case '
+            f'from {self.num_sampled} sampled, expected to take {expected}'
+        )
+
+
+def _pilot_estimate(sensitivity_values: Dict[str, Any], func: Callable, func_kwargs: Dict[str, Any],
+                    sample_size: int = 10, seed: Optional[int] = None, vectorized: bool = False,
+                    async_mode: bool = False, max_concurrency: Optional[int] = 10, sampling: str = 'grid',
+                    num_samples: Optional[int] = None, isolate: bool = False) -> SweepEstimate:
+    """
+    Times func on a random sample of the cases, without running the full cartesian product
+    or the full number of samples
+    """
+    sensitivity_cols = list(sensitivity_values.keys())
+    if sampling != 'grid':
+        if num_samples is None:
+            raise ValueError('must pass num_samples when sampling')
+        num_cases = num_samples
+        num_sampled = min(sample_size, num_cases)
+        if num_sampled == 0:
+            return SweepEstimate(num_cases=num_cases, num_sampled=0, seconds_per_case=0)
+        # Draw the pilot cases the same way as the analysis will
+        param_arrays = _sample_params(sensitivity_values, sampling, num_sampled, seed=seed)
+    else:
+        value_arrays = [_values_array(values) for values in sensitivity_values.values()]
+        shape = tuple(len(values) for values in value_arrays)
+        num_cases = int(np.prod(shape, dtype=np.int64))
+        num_sampled = min(sample_size, num_cases)
+        if num_sampled == 0:
+            return SweepEstimate(num_cases=num_cases, num_sampled=0, seconds_per_case=0)
+        rng = np.random.default_rng(seed)
+        positions = np.unravel_index(rng.choice(num_cases, size=num_sampled, replace=False), shape)
+        param_arrays = [values[position] for values, position in zip(value_arrays, positions)]
+
+    start = time.perf_counter()
+    if vectorized:
+        func(**dict(zip(sensitivity_cols, param_arrays)), **func_kwargs)
+    else:
+        cases = _sampled_cases(param_arrays)
+        if async_mode or _is_async_func(func):
+            _run_in_new_event_loop(_evaluate_cases_async(
+                func, sensitivity_cols, cases, num_sampled, func_kwargs, max_concurrency=max_concurrency,
+                isolate=isolate,
+            ))
+        else:
+            # Consume the generator so that every case is run
+            for _ in _evaluate_cases(func, sensitivity_cols, cases, num_sampled, func_kwargs, isolate=isolate):
+                pass
+    elapsed = time.perf_counter() - start
+
+    return SweepEstimate(num_cases=num_cases, num_sampled=num_sampled, seconds_per_case=elapsed / num_sampled)
@@ -0,0 +1,19 @@
+from typing import Dict, Any
+
+
+class CaseEvaluationError(Exception):
+    """
+    Raised when func fails for one case of the sensitivity analysis, carrying the parameters of that case
+
+    :param param_dict: The sensitivity values passed to func for the failing case
+    :param message: Description of the original error
+    """
+
+    def __init__(self, param_dict: Dict[str, Any], message: str):
+        self.param_dict = param_dict
+        self.message = message
+        # Pass both through to Exception so that the error can be pickled back from worker processes
+        super().__init__(param_dict, message)
+
+    def __str__(self) -> str:
+        return f'{self.message} with parameters {self.param_dict}'
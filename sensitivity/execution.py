@@ -0,0 +1,259 @@
+import asyncio
+import inspect
+import itertools
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from copy import deepcopy
+from typing import Callable, Sequence, Dict, Any, Iterable, Iterator, Tuple, Optional, List, TypeVar
+
+import numpy as np
+from tqdm import tqdm
+
+from sensitivity.exc import CaseEvaluationError
+from sensitivity.outputs import OutputKey, _vectorized_outputs
+
+Case = Tuple[Any, ...]
+T = TypeVar('T')
+
+
+def _evaluate_cases(func: Callable, sensitivity_cols: Sequence[str], cases: Iterable[Case], num_cases: int,
+                    func_kwargs: Dict[str, Any], n_jobs: Optional[int] = None, executor: Optional[Executor] = None,
+                    chunk_size: Optional[int] = None, record_errors: bool = False,
+                    progress: bool = True, isolate: bool = False) -> Iterator[Tuple[Case, Any]]:
+    """
+    Runs func on each case, yielding the case along with its result in the same order as cases.
+
+    Runs in the current process unless n_jobs or executor is passed, in which case the cases are
+    split into chunks and the chunks are run on the executor.
+
+    With record_errors, a case where func raises gets a :class:`.CaseEvaluationError` as its
+    result rather than stopping the run. With isolate, each call gets deep copies of its arguments.
+    """
+    if executor is not None:
+        yield from _evaluate_cases_on_executor(
+            func, sensitivity_cols, cases, num_cases, func_kwargs, executor, chunk_size=chunk_size,
+            record_errors=record_errors, progress=progress, isolate=isolate
+        )
+        return
+
+    if n_jobs is not None and n_jobs != 1:
+        max_workers = _max_workers(n_jobs)
+        with ProcessPoolExecutor(max_workers=max_workers) as process_executor:
+            yield from _evaluate_cases_on_executor(
+                func, sensitivity_cols, cases, num_cases, func_kwargs, process_executor,
+                chunk_size=chunk_size, max_workers=max_workers, record_errors=record_errors, progress=progress,
+                isolate=isolate
+            )
+        return
+
+    for case in tqdm(cases, total=num_cases, disable=not progress):
+        yield case, _call_func(func, sensitivity_cols, case, func_kwargs, record_errors=record_errors, isolate=isolate)
+
+
+def _evaluate_cases_on_executor(func: Callable, sensitivity_cols: Sequence[str], cases: Iterable[Case],
+                                num_cases: int, func_kwargs: Dict[str, Any], executor: Executor,
+                                chunk_size: Optional[int] = None, max_workers: Optional[int] = None,
+                                record_errors: bool = False, progress: bool = True,
+                                isolate: bool = False) -> Iterator[Tuple[Case, Any]]:
+    """
+    Runs chunks of cases on the executor, yielding each chunk's results, in order, as soon as it and
+    all the chunks before it have finished
+    """
+    if chunk_size is None:
+        chunk_size = _default_chunk_size(num_cases, max_workers or os.cpu_count() or 1)
+    chunks = list(_chunked(cases, chunk_size))
+    chunk_results: Dict[int, List[Any]] = {}
+    next_chunk = 0
+    with tqdm(total=num_cases, disable=not progress) as progress_bar:
+        futures = {
+            executor.submit(_evaluate_chunk, func, sensitivity_cols, chunk, func_kwargs, record_errors, isolate): i
+            for i, chunk in enumerate(chunks)
+        }
+        try:
+            for future in as_completed(futures):
+                i = futures[future]
+                chunk_results[i] = future.result()
+                progress_bar.update(len(chunks[i]))
+                while next_chunk in chunk_results:
+                    yield from zip(chunks[next_chunk], chunk_results.pop(next_chunk))
+                    next_chunk += 1
+        except BaseException:
+            # Don't leave the rest of the sweep running on the executor after a failure
+            for future in futures:
+                future.cancel()
+            raise
+
+
+async def _evaluate_cases_async(func: Callable, sensitivity_cols: Sequence[str], cases: Iterable[Case],
+                                num_cases: int, func_kwargs: Dict[str, Any],
+                                max_concurrency: Optional[int] = None, record_errors: bool = False,
+                                progress: bool = True, isolate: bool = False) -> List[Tuple[Case, Any]]:
+    """
+    Awaits func for each case on the running event loop, with at most max_concurrency cases
+    in flight at once. Returns the cases along with their results in the same order as cases.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency is not None else None
+    cases = list(cases)
+
+    with tqdm(total=num_cases, disable=not progress) as progress_bar:
+        async def evaluate(case: Case) -> Any:
+            if semaphore is None:
+                result = await _call_func_async(func, sensitivity_cols, case, func_kwargs, record_errors, isolate)
+            else:
+                async with semaphore:
+                    result = await _call_func_async(func, sensitivity_cols, case, func_kwargs, record_errors, isolate)
+            progress_bar.update(1)
+            return result
+
+        results = await asyncio.gather(*[evaluate(case) for case in cases])
+
+    return list(zip(cases, results))
+
+
+async def _call_func_async(func: Callable, sensitivity_cols: Sequence[str], case: Case,
+                           func_kwargs: Dict[str, Any], record_errors: bool = False, isolate: bool = False) -> Any:
+    result = _call_func(func, sensitivity_cols, case, func_kwargs, record_errors=record_errors, isolate=isolate)
+    if inspect.isawaitable(result):
+        try:
+            result = await result
+        except Exception as e:
+            if not record_errors:
+                raise
+            return CaseEvaluationError(dict(zip(sensitivity_cols, case)), repr(e))
+    return result
+
+
+def _is_async_func(func: Callable) -> bool:
+    return inspect.iscoroutinefunction(func) or inspect.iscoroutinefunction(getattr(func, '__call__', None))
+
+
+def _run_in_new_event_loop(coro):
+    """
+    Runs the coroutine to completion from synchronous code, with a clearer error than asyncio.run
+    if there is already a running event loop
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        # No running loop, as expected
+        return asyncio.run(coro)
+    coro.close()
+    raise RuntimeError(
+        'cannot run an async func from synchronous code inside a running event loop, '
+        'use await asensitivity_df(...) or await SensitivityAnalyzer.arun(...) instead'
+    )
+
+
+def _evaluate_chunk(func: Callable, sensitivity_cols: Sequence[str], cases: Sequence[Case],
+                    func_kwargs: Dict[str, Any], record_errors: bool = False, isolate: bool = False) -> List[Any]:
+    """
+    Runs func on a chunk of cases. Module level so that it can be sent to worker processes.
+    """
+    results = []
+    for case in cases:
+        try:
+            results.append(
+                _call_func(func, sensitivity_cols, case, func_kwargs, record_errors=record_errors, isolate=isolate)
+            )
+        except Exception as e:
+            raise CaseEvaluationError(dict(zip(sensitivity_cols, case)), repr(e)) from e
+    return results
+
+
+def _call_func(func: Callable, sensitivity_cols: Sequence[str], case: Case, func_kwargs: Dict[str, Any],
+               record_errors: bool = False, isolate: bool = False) -> Any:
+    """
+    Runs func for one case. The values are passed by reference unless isolate, in which case func gets
+    its own deep copies of the case values and func_kwargs, so that it may mutate them
+    """
+    param_dict = dict(zip(sensitivity_cols, case))
+    param_dict.update(func_kwargs)
+    if isolate:
+        param_dict = deepcopy(param_dict)
+    if not record_errors:
+        return func(**param_dict)
+    try:
+        return func(**param_dict)
+    except Exception as e:
+        return CaseEvaluationError(dict(zip(sensitivity_cols, case)), repr(e))
+
+
+def _evaluate_vectorized(func: Callable, sensitivity_cols: Sequence[str], param_batches: Iterable[List[np.ndarray]],
+                         num_cases: int, func_kwargs: Dict[str, Any],
+                         progress: bool = True) -> Iterator[Tuple[List[np.ndarray], Dict[OutputKey, np.ndarray]]]:
+    """
+    Runs func once for each batch of parameter arrays, one array for each of sensitivity_cols.
+    Yields the parameter arrays along with an array of results for each output of func for each batch.
+    """
+    with tqdm(total=num_cases, disable=not progress) as progress_bar:
+        for param_arrays in param_batches:
+            num_batch_cases = len(param_arrays[0]) if param_arrays else 0
+            param_dict = dict(zip(sensitivity_cols, param_arrays))
+            param_dict.update(func_kwargs)
+            yield param_arrays, _vectorized_outputs(func(**param_dict), num_batch_cases)
+            progress_bar.update(num_batch_cases)
+
+
+def _grid_batches(sensitivity_values: Dict[str, Any], batch_size: Optional[int] = None, start: int = 0,
+                  stop: Optional[int] = None) -> Iterator[List[np.ndarray]]:
+    """
+    Arrays of parameter values covering the cartesian product of sensitivity_values, or the cases from
+    start to stop of it, in batches of at most batch_size cases. Yields a list of the parameter arrays,
+    in the order of sensitivity_values, for each batch. The cases are in the same order as itertools.product.
+    """
+    value_arrays = [_values_array(values) for values in sensitivity_values.values()]
+    shape = tuple(len(values) for values in value_arrays)
+    if stop is None:
+        stop = int(np.prod(shape, dtype=np.int64))
+    if batch_size is None:
+        batch_size = max(stop - start, 1)
+
+    for batch_start in range(start, stop, batch_size):
+        batch_stop = min(batch_start + batch_size, stop)
+        positions = np.unravel_index(np.arange(batch_start, batch_stop), shape)
+        yield [values[position] for values, position in zip(value_arrays, positions)]
+
+
+def _values_array(values: Sequence[Any]) -> np.ndarray:
+    """
+    Converts the possible values for one parameter into a 1-D array, falling back to an object
+    array when the values themselves are sequences
+    """
+    if isinstance(values, np.ndarray) and values.ndim == 1:
+        return values
+    if len(values) and _is_collection(next(iter(values))):
+        # Store references to the values rather than letting NumPy copy their contents, e.g. for DataFrames
+        arr = np.empty(len(values), dtype=object)
+        for i, value in enumerate(values):
+            arr[i] = value
+        return arr
+    arr = np.asarray(values)
+    if arr.ndim != 1:
+        arr = np.empty(len(values), dtype=object)
+        arr[:] = list(values)
+    return arr
+
+
+def _is_collection(value: Any) -> bool:
+    return hasattr(value, '__len__') and not isinstance(value, (str, bytes))
+
+
+def _chunked(items: Iterable[T], chunk_size: int) -> Iterator[List[T]]:
+    items_iter = iter(items)
+    while True:
+        chunk = list(itertools.islice(items_iter, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _max_workers(n_jobs: int) -> int:
+    if n_jobs < 0:
+        # Follow the joblib convention, -1 means all CPUs, -2 all but one, etc.
+        return max((os.cpu_count() or 1) + 1 + n_jobs, 1)
+    return n_jobs
+
+
+def _default_chunk_size(num_cases: int, num_workers: int) -> int:
+    # Several chunks per worker so that the load stays balanced and progress updates regularly
+    return max(num_cases // (num_workers * 4), 1)
@@ -0,0 +1,133 @@
+from typing import Dict, Any, Callable, Optional, List, Tuple, Iterable, Sequence
+
+import numpy as np
+
+from sensitivity.execution import _values_array, _grid_batches
+
+# Types of values which NumPy stores exactly and tolist converts back to the same type
+_NUMPY_ROUND_TRIP_TYPES = {int, float, bool, str}
+
+
+def _needs_reduced_grid(sensitivity_values: Dict[str, Any], constraint: Optional[Callable] = None) -> bool:
+    """
+    Whether some cases of the grid can be skipped, because an argument has repeated values or a
+    constraint rules some out
+    """
+    if constraint is not None:
+        return True
+    for values in sensitivity_values.values():
+        _, uniques = _unique_codes(values)
+        if len(uniques) < len(values):
+            return True
+    return False
+
+
+def _reduced_grid(sensitivity_values: Dict[str, Any],
+                  constraint: Optional[Callable] = None,
+                  batch_size: Optional[int] = None) -> Tuple[List[np.ndarray], np.ndarray]:
+    """
+    Cases to run for the cartesian product of sensitivity_values, with each distinct combination of values
+    only once and without the combinations which constraint rules out
+
+    :return: Arrays of values of the cases to run for each argument, in the order of sensitivity_values, and for
+        each row of the output, the position of the case to take its result from. Rows of the full cartesian
+        product which constraint rules out are not in the output.
+    """
+    codes: List[np.ndarray] = []
+    unique_values: Dict[str, np.ndarray] = {}
+    for col, values in sensitivity_values.items():
+        value_codes, uniques = _unique_codes(values)
+        codes.append(value_codes)
+        unique_values[col] = uniques
+    shape = tuple(len(uniques) for uniques in unique_values.values())
+    num_unique_cases = int(np.prod(shape, dtype=np.int64))
+
+    if constraint is not None:
+        valid = np.flatnonzero(_constraint_mask(
+            list(unique_values), _grid_batches(unique_values, batch_size), num_unique_cases, constraint
+        ))
+    else:
+        valid = np.arange(num_unique_cases)
+    param_arrays = [
+        uniques[positions] for uniques, positions in zip(unique_values.values(), np.unravel_index(valid, shape))
+    ]
+
+    # Position in the cases to run for each distinct combination, -1 where it is ruled out
+    case_positions = np.full(num_unique_cases, -1, dtype=np.intp)
+    case_positions[valid] = np.arange(len(valid))
+    row_cases = case_positions[_flat_positions(codes, shape)]
+    return param_arrays, row_cases[row_cases >= 0]
+
+
+def _constraint_mask(sensitivity_cols: Sequence[str], param_batches: Iterable[List[np.ndarray]], num_cases: int,
+                     constraint: Callable) -> np.ndarray:
+    """
+    Whether each case satisfies constraint, calling it once for each batch with an array of values for each
+    of sensitivity_cols
+    """
+    mask = np.empty(num_cases, dtype=bool)
+    position = 0
+    for param_arrays in param_batches:
+        num_batch_cases = len(param_arrays[0]) if param_arrays else num_cases
+        batch_mask = np.asarray(constraint(**dict(zip(sensitivity_cols, param_arrays))), dtype=bool)
+        try:
+            mask[position:position + num_batch_cases] = np.broadcast_to(batch_mask, (num_batch_cases,))
+        except ValueError as e:
+            raise ValueError(
+                f'constraint must return one bool for each case, got shape {batch_mask.shape} '
+                f'for {num_batch_cases} cases'
+            ) from e
+        position += num_batch_cases
+    return mask
+
+
+def _unique_codes(values: Sequence[Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Position of each of values in the distinct values, and the distinct values in order of first appearance.
+    Values are only the same when they are equal and of the same type, so 1, 1.0 and True are distinct, and the
+    distinct values are the original objects rather than NumPy conversions of them. Values which can't be hashed,
+    such as arrays, are all treated as distinct
+    """
+    codes = np.empty(len(values), dtype=np.intp)
+    first_positions: List[int] = []
+    seen: Dict[Tuple[type, Any], int] = {}
+    try:
+        for i, value in enumerate(values):
+            code = seen.setdefault((type(value), value), len(first_positions))
+            if code == len(first_positions):
+                first_positions.append(i)
+            codes[i] = code
+    except TypeError:
+        return np.arange(len(values)), _original_values_array(values)
+    if len(first_positions) == len(values):
+        return codes, _original_values_array(values)
+    if isinstance(values, np.ndarray):
+        return codes, values[first_positions]
+    return codes, _original_values_array([values[i] for i in first_positions])
+
+
+def _original_values_array(values: Sequence[Any]) -> np.ndarray:
+    """
+    1-D array of values which gives back equal objects of the same types from tolist, using an object array
+    when NumPy would convert the values to a common type, e.g. 1 and 'a' to strings
+    """
+    if isinstance(values, np.ndarray):
+        return values
+    value_types = {type(value) for value in values}
+    if len(value_types) <= 1 and value_types <= _NUMPY_ROUND_TRIP_TYPES:
+        return _values_array(values)
+    arr = np.empty(len(values), dtype=object)
+    for i, value in enumerate(values):
+        arr[i] = value
+    return arr
+
+
+def _flat_positions(codes: Iterable[np.ndarray], shape: Tuple[int, ...]) -> np.ndarray:
+    """
+    Flat position in an array of shape for each case of the cartesian product of codes, which are positions
+    along each axis, in the same order as itertools.product
+    """
+    flat = np.zeros(1, dtype=np.intp)
+    for axis_codes, length in zip(codes, shape):
+        flat = (flat[:, np.newaxis] * length + axis_codes[np.newaxis, :]).ravel()
+    return flat
@@ -1,20 +1,22 @@
-from typing import Dict, Any, Callable, Sequence
+from typing import Dict, Any, Callable, Sequence, Optional, Tuple, TYPE_CHECKING
 import itertools
 import math
 import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.gridspec import GridSpec
 import numpy as np
 
 from sensitivity.colors import _get_color_map
 from sensitivity.df import sensitivity_df
 
+if TYPE_CHECKING:
+    # matplotlib is only imported when plotting, to keep importing the package fast
+    import matplotlib.pyplot as plt
+
 
 def sensitivity_hex_plots(sensitivity_values: Dict[str, Any], func: Callable,
                           result_name: str = 'Result', agg_func: Callable = np.mean,
                           reverse_colors: bool = False, grid_size: int = 8,
                           color_map: str = 'RdYlGn',
-                          **func_kwargs) -> plt.Figure:
+                          **func_kwargs) -> 'plt.Figure':
     """
     Create hexbin plots showing how the func result varies with a passed dictionary of input values.
     Automatically creates a plot for each pair of input parameters passed.
@@ -55,7 +57,17 @@ def sensitivity_hex_plots(sensitivity_values: Dict[str, Any], func: Callable,
 def _hex_figure_from_sensitivity_df(df: pd.DataFrame, sensitivity_cols: Sequence[str],
                                     result_name: str = 'Result', agg_func: Callable = np.mean,
                                     reverse_colors: bool = False, grid_size: int = 8,
-                                    color_map: str = 'RdYlGn') -> plt.Figure:
+                                    color_map: str = 'RdYlGn',
+                                    pairwise_tables: Optional[Dict[Tuple[str, str], pd.DataFrame]] = None
+                                    ) -> 'plt.Figure':
+    """
+    :param pairwise_tables: Optional results already aggregated with agg_func for each pair of columns, with the
+        first column in the index and the second in the columns, to plot rather than every row of df. Only pass
+        when aggregating these aggregates within a hex gives the same result as aggregating all the results
+    """
+    import matplotlib.pyplot as plt
+    from matplotlib.gridspec import GridSpec
+
     color_str = _get_color_map(reverse_colors=reverse_colors, color_map=color_map)
     combos = list(itertools.combinations(sensitivity_cols, 2))
     num_columns = 3
@@ -64,9 +76,13 @@ def _hex_figure_from_sensitivity_df(df: pd.DataFrame, sensitivity_cols: Sequence
     fig = plt.figure(figsize=(15, 4 * num_rows))
     for i, (x, y) in enumerate(combos):
         ax = fig.add_subplot(gs[i])
-        hb = ax.hexbin(x=df[x],
-                       y=df[y],
-                       C=df[result_name],
+        if pairwise_tables is not None and (x, y) in pairwise_tables:
+            x_values, y_values, results = _table_points(pairwise_tables[(x, y)])
+        else:
+            x_values, y_values, results = df[x], df[y], df[result_name]
+        hb = ax.hexbin(x=x_values,
+                       y=y_values,
+                       C=results,
                        reduce_C_function=agg_func,
                        gridsize=grid_size,
                        cmap=color_str)
@@ -76,3 +92,12 @@ def _hex_figure_from_sensitivity_df(df: pd.DataFrame, sensitivity_cols: Sequence
         cb.set_label(result_name)
     fig.tight_layout()
     return fig
+
+
+def _table_points(table: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Coordinates and results for each cell of a table with one variable in the index and another in the columns
+    """
+    x_values = np.repeat(table.index.to_numpy(), len(table.columns))
+    y_values = np.tile(table.columns.to_numpy(), len(table.index))
+    return x_values, y_values, table.to_numpy(dtype=float, na_value=np.nan).ravel()
@@ -0,0 +1,171 @@
+from concurrent.futures import Executor
+from typing import Dict, Any, Callable, Optional, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from sensitivity.cache import ResultCache
+from sensitivity.df import _param_arrays_df
+from sensitivity.sampling import _unit_samples, _scale_unit_samples
+
+INDEX_COLUMNS = ('S1', 'S1 Low', 'S1 High', 'ST', 'ST Low', 'ST High')
+
+
+def sobol_indices(sensitivity_values: Dict[str, Any], func: Callable,
+                  num_samples: int = 1024,
+                  sampling: str = 'halton',
+                  seed: Optional[int] = None,
+                  num_resamples: int = 1000,
+                  confidence_level: float = 0.95,
+                  labels: Optional[Dict[str, str]] = None,
+                  n_jobs: Optional[int] = None,
+                  executor: Optional[Executor] = None,
+                  chunk_size: Optional[int] = None,
+                  vectorized: bool = False,
+                  batch_size: Optional[int] = None,
+                  async_mode: bool = False,
+                  max_concurrency: Optional[int] = 10,
+                  cache: Optional[ResultCache] = None,
+                  **func_kwargs) -> pd.DataFrame:
+    """
+    Computes variance-based global sensitivity indices, ranking how much of the variance of the result
+    is due to each argument.
+
+    The first order index S1 is the fraction of the variance due to the argument alone, and the total order index
+    ST is the fraction due to the argument including its interactions with the other arguments. Uses the Saltelli
+    design, which needs num_samples * (number of arguments + 2) evaluations of func for both indices, with
+    the Saltelli (2010) estimator for S1 and the Jansen estimator for ST. Confidence intervals are from
+    bootstrap resampling of the evaluations.
+
+    :param sensitivity_values: Dictionary where keys are func's argument names and values are lists of possible
+        values, which are treated as equally likely, or a :class:`.ValueRange` for uniformly distributed values
+    :param func: Function that accepts arguments with names matching the keys of sensitivity_values, and outputs a
+        scalar number.
+    :param num_samples: Number of base samples. More give more accurate indices
+    :param sampling: How to draw the base samples, 'halton', 'sobol' (requires scipy), 'lhs' or 'random'
+    :param seed: Seed for drawing the samples and the bootstrap resamples
+    :param num_resamples: Number of bootstrap resamples for the confidence intervals
+    :param confidence_level: Probability that the confidence interval contains the index
+    :param labels: Optional dictionary where keys are arguments of the function and values are the displayed names
+        for these arguments in the output
+    :param n_jobs: Number of worker processes to run func in, see :func:`.sensitivity_df`
+    :param executor: Optional :class:`concurrent.futures.Executor` to run func on, see :func:`.sensitivity_df`
+    :param chunk_size: Number of cases to send to a worker at once, see :func:`.sensitivity_df`
+    :param vectorized: Whether func accepts and returns arrays, see :func:`.sensitivity_df`
+    :param batch_size: Maximum number of cases to pass to func at once when vectorized
+    :param async_mode: Whether func returns awaitables, see :func:`.sensitivity_df`
+    :param max_concurrency: Maximum number of cases awaited at once in async mode
+    :param cache: Optional :class:`.ResultCache` to look up results from previous runs
+    :param func_kwargs: Additional arguments to pass to func, regardless of the sensitivity values picked
+    :return: DataFrame with a row for each argument and columns for S1 and ST along with the lower and
+        upper bounds of their confidence intervals
+
+    Examples:
+        >>> from sensitivity import sobol_indices, ValueRange
+        >>>
+        >>> sobol_indices({'rate': ValueRange(0.01, 0.1), 'years': [5, 10, 20]}, my_model, num_samples=2048)
+    """
+    if not 0 < confidence_level < 1:
+        raise ValueError(f'confidence_level must be between 0 and 1, got {confidence_level}')
+    sensitivity_cols = list(sensitivity_values.keys())
+    num_params = len(sensitivity_cols)
+    param_arrays = _saltelli_param_arrays(sensitivity_values, num_samples, sampling, seed=seed)
+
+    execution_kwargs: Dict[str, Any] = {} if vectorized else dict(
+        n_jobs=n_jobs,
+        executor=executor,
+        chunk_size=chunk_size,
+        async_mode=async_mode,
+        max_concurrency=max_concurrency,
+        cache=cache,
+    )
+    df = _param_arrays_df(
+        func, sensitivity_cols, param_arrays, func_kwargs, vectorized=vectorized, batch_size=batch_size,
+        **execution_kwargs
+    )
+    if 'Result' not in df:
+        raise ValueError('func must return a single number for each case to compute Sobol indices')
+    results = df['Result'].to_numpy(dtype=float, na_value=np.nan)
+    if np.isnan(results).any():
+        raise ValueError('func must return a number for every case to compute Sobol indices')
+
+    results_a, results_b, results_ab = _split_saltelli_results(results, num_samples, num_params)
+    first_order, total_order = _sobol_estimates(results_a, results_b, results_ab)
+    first_low, first_high, total_low, total_high = _bootstrap_intervals(
+        results_a, results_b, results_ab, num_resamples, confidence_level, seed=seed
+    )
+
+    index_labels = [(labels or {}).get(col, col) for col in sensitivity_cols]
+    return pd.DataFrame(
+        np.column_stack([first_order, first_low, first_high, total_order, total_low, total_high]),
+        index=pd.Index(index_labels, name='Parameter'),
+        columns=list(INDEX_COLUMNS),
+    )
+
+
+def _saltelli_param_arrays(sensitivity_values: Dict[str, Any], num_samples: int, sampling: str,
+                           seed: Optional[int] = None) -> List[np.ndarray]:
+    """
+    Values for the cases of the Saltelli design: the num_samples rows of matrix A, then the rows of matrix B,
+    then for each argument the rows of A with that argument's column taken from B
+    """
+    if num_samples < 2:
+        raise ValueError(f'must pass at least 2 samples, got {num_samples}')
+    num_params = len(sensitivity_values)
+    # A and B are the two halves of a sample in twice the dimensions, so that they are independent
+    unit = _unit_samples(sampling, num_samples, 2 * num_params, seed=seed)
+    unit_a = unit[:, :num_params]
+    unit_b = unit[:, num_params:]
+    unit_ab = np.repeat(unit_a[np.newaxis], num_params, axis=0)
+    param_positions = np.arange(num_params)
+    unit_ab[param_positions, :, param_positions] = unit_b.T
+    stacked = np.concatenate([unit_a, unit_b, unit_ab.reshape(-1, num_params)])
+    return _scale_unit_samples(sensitivity_values, stacked)
+
+
+def _split_saltelli_results(results: np.ndarray, num_samples: int,
+                            num_params: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    results_a = results[:num_samples]
+    results_b = results[num_samples:2 * num_samples]
+    results_ab = results[2 * num_samples:].reshape(num_params, num_samples)
+    return results_a, results_b, results_ab
+
+
+def _sobol_estimates(results_a: np.ndarray, results_b: np.ndarray,
+                     results_ab: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    First and total order indices for each argument. Works along the last axis, so leading axes of
+    results_a and results_b, and axes after the first of results_ab, are computed independently
+    """
+    variance = np.var(np.concatenate([results_a, results_b], axis=-1), axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Saltelli (2010)
+        first_order = np.mean(results_b * (results_ab - results_a), axis=-1) / variance
+        # Jansen (1999)
+        total_order = 0.5 * np.mean((results_a - results_ab) ** 2, axis=-1) / variance
+    return first_order, total_order
+
+
+def _bootstrap_intervals(results_a: np.ndarray, results_b: np.ndarray, results_ab: np.ndarray,
+                         num_resamples: int, confidence_level: float,
+                         seed: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Percentile bootstrap confidence intervals for the first and total order indices, resampling the rows
+    of the design with replacement
+    """
+    num_params, num_samples = results_ab.shape
+    rng = np.random.default_rng(seed)
+    resamples = rng.integers(0, num_samples, size=(num_resamples, num_samples))
+    alpha = (1 - confidence_level) / 2
+    quantiles = [alpha, 1 - alpha]
+
+    resampled_a = results_a[resamples]
+    resampled_b = results_b[resamples]
+    first_bounds = np.empty((2, num_params))
+    total_bounds = np.empty((2, num_params))
+    # One argument at a time to keep memory at num_resamples * num_samples
+    for i in range(num_params):
+        first_order, total_order = _sobol_estimates(resampled_a, resampled_b, results_ab[i][resamples])
+        first_bounds[:, i] = np.nanquantile(first_order, quantiles)
+        total_bounds[:, i] = np.nanquantile(total_order, quantiles)
+    return first_bounds[0], first_bounds[1], total_bounds[0], total_bounds[1]
@@ -1,15 +1,41 @@
 import itertools
+from concurrent.futures import Executor
 from dataclasses import dataclass
-from typing import Dict, Any, Callable, Optional, List, Union, Sequence
+from pathlib import Path
+from typing import Dict, Any, Callable, Optional, List, Union, Sequence, Tuple, ContextManager, TYPE_CHECKING
 
 import numpy as np
 import pandas as pd
-from pandas.io.formats.style import Styler
-import matplotlib.pyplot as plt
-from IPython.display import display, HTML
+from pandas.api.types import union_categoricals
 
-from sensitivity.df import sensitivity_df, _style_sensitivity_df, _two_variable_sensitivity_display_df
+from sensitivity.agg import _recognized_reducer, DECOMPOSABLE_REDUCERS
+from sensitivity.cache import ResultCache
+from sensitivity.checkpoint import _extend_checkpoint_path
+from sensitivity.df import sensitivity_df, _style_sensitivity_df, _two_variable_sensitivity_display_df, \
+    asensitivity_df, _param_arrays_df, _compact_categories
+from sensitivity.exc import CaseEvaluationError
+from sensitivity.estimate import SweepEstimate, _pilot_estimate
+from sensitivity.execution import _grid_batches
+from sensitivity.grid import _constraint_mask
 from sensitivity.hexbin import _hex_figure_from_sensitivity_df
+from sensitivity.indices import sobol_indices
+from sensitivity.oat import OneAtATimeResult, one_at_a_time
+from sensitivity.profiling import SweepProfile, CaseStartHook, CaseEndHook, CASE_SECONDS_COL, slowest_regions, \
+    _profile_stage
+from sensitivity.refine import _Refinement
+from sensitivity.sampling import _range_bins
+from sensitivity.stream import read_sensitivity_file
+from sensitivity.surrogate import SurrogateValidation, surrogate_df, PREDICTED_COL, ERROR_COL
+from sensitivity.tensor import _result_tensor, _tensor_reducer, _tensor_pairwise_df, _reduce_tensor, _tensor_sel
+
+if TYPE_CHECKING:
+    # Plotting and display libraries are imported when they are used, so that the package imports quickly
+    # and can run analyses without them installed
+    import matplotlib.pyplot as plt
+    from pandas.io.formats.style import Styler
+
+# Options of the analyzer which arun can't honor
+_ARUN_UNSUPPORTED_OPTIONS = ('n_jobs', 'executor', 'vectorized', 'checkpoint_path', 'surrogate_samples')
 
 
 @dataclass
@@ -24,7 +50,9 @@ class SensitivityAnalyzer:
     :param sensitivity_values: Dictionary where keys are func's argument names and values are lists of possible
         values to use for that argument.
     :param func: Function that accepts arguments with names matching the keys of sensitivity_values, and outputs a
-        scalar value.
+        scalar value. It may instead return multiple outputs as a dict, tuple or 1-D NumPy array, to analyze them all
+        from one run, see :func:`.sensitivity_df`. Pick the output to show with the result argument of
+        :meth:`styled_dfs` and :meth:`plot`
     :param result_name: Name for result shown in graph color bar label
     :param agg_func: If there are multiple results within the hex parameter area, function to aggregate those results to
         get a single value for the hex area. The function should accept a sequence of values and return a scalar.
@@ -38,6 +66,62 @@ class SensitivityAnalyzer:
         https://matplotlib.org/3.3.2/tutorials/colors/colormaps.html
     :param labels: Optional dictionary where keys are arguments of the function and values are the displayed names
         for these arguments in the styled DataFrames and plots
+    :param n_jobs: Number of worker processes to run func in. Default is to run in the current process,
+        -1 uses all the CPUs. func and its arguments must be picklable to use multiple processes
+    :param executor: Optional :class:`concurrent.futures.Executor` to run func on, takes precedence over n_jobs
+    :param chunk_size: Number of cases to send to a worker at once when using n_jobs or executor
+    :param vectorized: Set to True if func accepts arrays of values for each argument and returns an array of
+        results, one for each case, so that it can be called once per batch rather than once per case
+    :param batch_size: Maximum number of cases to pass to func at once when vectorized. Default is all at once
+    :param async_mode: Set to True if func returns awaitables, to run the cases concurrently on an event loop.
+        This is automatically enabled when func is an ``async def`` function. Use :meth:`arun` to create
+        the analyzer when already inside a running event loop
+    :param max_concurrency: Maximum number of cases awaited at once in async mode, None for no limit
+    :param cache: Optional :class:`.ResultCache` to look up results from previous runs, so that func is only
+        called for cases which are not already cached. Not used when vectorized
+    :param errors: 'raise' to stop when func raises, or 'record' to leave the result missing for that case and
+        continue, see :attr:`failed_cases`. Must be 'raise' when vectorized
+    :param checkpoint_path: Optional file to save the completed cases to every checkpoint_every cases, so that
+        an interrupted run can be continued by passing resume=True. The cases added by :meth:`extend` are saved
+        to their own file next to it. Not used when vectorized
+    :param checkpoint_every: Number of cases to run between saving checkpoints
+    :param resume: Set to True to continue from the cases already completed in the file at checkpoint_path
+    :param compact: Set to True to store the parameter columns of df as Categorical columns and the result column
+        as float64, to use much less memory for large analyses. func must return numbers
+    :param sampling: 'grid' to run the full cartesian product of the values, or 'random', 'lhs', 'halton' or 'sobol'
+        to run num_samples cases drawn from the values, see :func:`.sensitivity_df`. Values may then be a
+        :class:`.ValueRange`, which are split into grid_size bins in the styled DataFrames
+    :param num_samples: Number of cases to run when sampling
+    :param seed: Seed for drawing the samples, or for picking the cases to evaluate with a surrogate
+    :param constraint: Optional function that accepts arrays of values for each argument and returns an array of
+        bools, True for the valid cases. Invalid cases are skipped without running func and left out of df,
+        see :func:`.sensitivity_df`
+    :param result_names: Names for the outputs when func returns a tuple or 1-D array of them, to store each output
+        in its own column. Without result_names, such results are kept whole in the result_name column, unless
+        vectorized, when the columns default to result_name followed by the number of the output. When func
+        returns a dict, its keys are used as the column names
+    :param surrogate_samples: Set to a number of cases to only run func for that many cases of the grid and predict
+        the rest with a surrogate model fit to their results, for when func is too slow to run every case. Predicted
+        results are flagged in the Predicted column of df along with their estimated error, see
+        :func:`.surrogate_df` and :attr:`surrogate_validation`
+    :param surrogate_holdout: Fraction of the evaluated cases to leave out of fitting the surrogate to estimate
+        the error of its predictions
+    :param isolate: Set to True if func mutates its arguments, to pass it deep copies of the values and
+        func_kwargs_dict for each case. Default passes the same objects to every case without copying, so func
+        must not modify them. Not used when vectorized
+    :param time_cases: Set to True to add a Case Seconds column to df with the wall time func took for each case,
+        see :meth:`slowest_regions`. Not used with a surrogate
+    :param on_case_start: Optional function called with a dict of the sensitivity values for each case just before
+        running func, e.g. to start a profiler, see :func:`.sensitivity_df`. Not used when vectorized or with a
+        surrogate
+    :param on_case_end: Optional function called with a dict of the sensitivity values, the result and the seconds
+        taken after running func for each case, see :func:`.sensitivity_df`. Not used when vectorized or with a
+        surrogate
+    :param profile: Set to True to record the time taken by each stage, from running func to styling and
+        plotting, in :attr:`sweep_profile`
+    :param lazy: Set to True to skip running the sensitivity analysis when the analyzer is created. It is then
+        run the first time df is accessed or when calling :meth:`run`. Use :meth:`estimate` to check how long
+        it will take before running it
     :return: Sensitivity analysis hex bin sub plot figure
 
     Examples:
@@ -66,6 +150,10 @@ class SensitivityAnalyzer:
         >>>
         >>> # Hex-Bin Plot
         >>> sa.plot()
+        >>>
+        >>> # Check how long a larger analysis will take before running it
+        >>> sa = SensitivityAnalyzer(sensitivity_values, add_5_to_values, lazy=True)
+        >>> print(sa.estimate())
     """
     sensitivity_values: Dict[str, Any]
     func: Callable
@@ -78,25 +166,475 @@ class SensitivityAnalyzer:
     num_fmt: Optional[str] = None
     color_map: str = 'RdYlGn'
     labels: Optional[Dict[str, str]] = None
+    n_jobs: Optional[int] = None
+    executor: Optional[Executor] = None
+    chunk_size: Optional[int] = None
+    vectorized: bool = False
+    batch_size: Optional[int] = None
+    async_mode: bool = False
+    max_concurrency: Optional[int] = 10
+    cache: Optional[ResultCache] = None
+    errors: str = 'raise'
+    checkpoint_path: Optional[Union[str, Path]] = None
+    checkpoint_every: int = 1000
+    resume: bool = False
+    compact: bool = False
+    sampling: str = 'grid'
+    num_samples: Optional[int] = None
+    seed: Optional[int] = None
+    constraint: Optional[Callable] = None
+    result_names: Optional[Sequence[str]] = None
+    surrogate_samples: Optional[int] = None
+    surrogate_holdout: float = 0.2
+    isolate: bool = False
+    time_cases: bool = False
+    on_case_start: Optional[CaseStartHook] = None
+    on_case_end: Optional[CaseEndHook] = None
+    profile: bool = False
+    lazy: bool = False
 
     def __post_init__(self):
         if self.func_kwargs_dict is None:
             self.func_kwargs_dict = {}
-        self.df = sensitivity_df(
+        self._df: Optional[pd.DataFrame] = None
+        self._profile: Optional[SweepProfile] = SweepProfile() if self.profile else None
+        self._refinement: Optional[_Refinement] = None
+        self._clear_derived_results()
+        if not self.lazy:
+            self.run()
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """
+        DataFrame containing the results of the sensitivity analysis, running it first if needed
+        """
+        if self._df is None:
+            self.run()
+        return self._df  # type: ignore
+
+    @df.setter
+    def df(self, df: pd.DataFrame):
+        self._df = df
+        self._clear_derived_results()
+
+    @property
+    def is_computed(self) -> bool:
+        """
+        Whether the sensitivity analysis has been run to produce df
+        """
+        return self._df is not None
+
+    def estimate(self, sample_size: int = 10, seed: Optional[int] = None) -> SweepEstimate:
+        """
+        Estimates how long the sensitivity analysis will take by running func on a random
+        sample of the cases, without running the full analysis
+
+        :param sample_size: Number of cases to run
+        :param seed: Seed for picking the sampled cases
+        :return: Total number of cases and the expected time to run them
+        """
+        return _pilot_estimate(
             self.sensitivity_values,
             self.func,
+            self.func_kwargs_dict,  # type: ignore
+            sample_size=sample_size,
+            seed=seed,
+            vectorized=self.vectorized,
+            async_mode=self.async_mode,
+            max_concurrency=self.max_concurrency,
+            sampling=self.sampling,
+            num_samples=self.num_samples,
+            isolate=self.isolate,
+        )
+
+    def run(self) -> pd.DataFrame:
+        """
+        Runs func with the cartesian product of the sensitivity values, storing the results in df
+
+        :return: DataFrame containing the results of the sensitivity analysis
+        """
+        self.df = self._run_sensitivity_df(self.sensitivity_values, checkpoint_path=self.checkpoint_path)
+        self._refinement = None
+        return self.df
+
+    @classmethod
+    def from_df(cls, df: pd.DataFrame, result_name: str = 'Result', **kwargs) -> 'SensitivityAnalyzer':
+        """
+        Creates an analyzer from existing sensitivity analysis results, to produce the styled DataFrames
+        and plots without running func again
+
+        The sensitivity values are taken from the columns of df other than result_name, and result_names when
+        there are multiple result columns. The analyzer has no func, so it cannot be run again or extended.
+
+        :param df: Results of a sensitivity analysis, e.g. from :func:`.sensitivity_df`
+        :param result_name: Name of the result column in df
+        :param kwargs: Display options for :py:class:`.SensitivityAnalyzer`, e.g. num_fmt, color_map
+        :return: The analyzer with df populated
+        """
+        not_params = {result_name, PREDICTED_COL, ERROR_COL, CASE_SECONDS_COL, *(kwargs.get('result_names') or [])}
+        sensitivity_values = {
+            col: list(pd.unique(df[col])) for col in df.columns if col not in not_params
+        }
+        sa = cls(sensitivity_values, _no_func, result_name=result_name, lazy=True, **kwargs)
+        sa.df = df
+        return sa
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path], result_name: str = 'Result', file_format: Optional[str] = None,
+                  **kwargs) -> 'SensitivityAnalyzer':
+        """
+        Creates an analyzer from sensitivity analysis results written by :func:`.sensitivity_to_file`,
+        to produce the styled DataFrames and plots without running func again. Requires pyarrow.
+
+        :param path: File, or directory for partitioned results
+        :param result_name: Name of the result column in the file
+        :param file_format: 'parquet' or 'arrow'. Default is detected from the path
+        :param kwargs: Display options for :py:class:`.SensitivityAnalyzer`, e.g. num_fmt, color_map
+        :return: The analyzer with df populated
+        """
+        df = read_sensitivity_file(path, file_format=file_format)
+        return cls.from_df(df, result_name=result_name, **kwargs)
+
+    def extend(self, param: str, new_values: Sequence[Any]) -> pd.DataFrame:
+        """
+        Adds more possible values for one argument, running func only for the cases which
+        include the new values and merging them into df
+
+        :param param: Name of the argument of func, a key of sensitivity_values
+        :param new_values: Values to add to the existing values for param
+        :return: DataFrame containing the results of the sensitivity analysis over the extended values
+        """
+        if self.sampling != 'grid':
+            raise ValueError('extend adds values to the grid, it cannot be used when sampling')
+        if self.surrogate_samples is not None:
+            raise ValueError('extend runs every new case, it cannot be used with a surrogate')
+        if self._refinement is not None:
+            raise ValueError('extend adds values to the grid, it cannot be used after refine')
+        if param not in self.sensitivity_values:
+            raise ValueError(f'{param} is not in sensitivity_values, cannot extend it')
+        new_values = list(new_values)
+        extended_values = {
+            **self.sensitivity_values,
+            param: list(self.sensitivity_values[param]) + new_values
+        }
+        if not self.is_computed:
+            # Not run yet, will get all the values when it is
+            self.sensitivity_values = extended_values
+            return self.run()
+
+        # The checkpoint at checkpoint_path is for the full run, the new cases get their own
+        checkpoint_path = None
+        if self.checkpoint_path is not None:
+            checkpoint_path = _extend_checkpoint_path(self.checkpoint_path, param, new_values)
+        new_df = self._run_sensitivity_df({**self.sensitivity_values, param: new_values},
+                                          checkpoint_path=checkpoint_path)
+        self.df = _merge_extended_df(
+            self.df, new_df, self.sensitivity_values, param, new_values, constraint=self.constraint
+        )
+        self.sensitivity_values = extended_values
+        return self.df
+
+    def _grid_tensor(self, result_col: Optional[str] = None) -> Optional[np.ndarray]:
+        if self.sampling != 'grid':
+            # Sampled cases don't fill a grid
+            return None
+        result_col = self._result_col(result_col)
+        if result_col not in self._tensors:
+            axis_values = [list(values) for values in self.sensitivity_values.values()]
+            tensor = _result_tensor(self.df, self.sensitivity_cols, axis_values, result_col)
+            self._axis_positions = [
+                {value: i for i, value in enumerate(values)} for values in axis_values
+            ] if tensor is not None else []
+            self._tensors[result_col] = tensor
+        return self._tensors[result_col]
+
+    def _result_col(self, result: Optional[str] = None) -> str:
+        """
+        Name of the result column for result, default is the first output of func
+        """
+        result_cols = self.result_cols
+        if result is None:
+            return result_cols[0] if result_cols else self.result_name
+        if result not in result_cols:
+            raise ValueError(f'{result} is not a result, must be one of {result_cols}')
+        return result
+
+    def _stage(self, name: str) -> ContextManager:
+        """
+        Context manager timing the stage name when profiling
+        """
+        return _profile_stage(self._profile, name)
+
+    def _clear_derived_results(self):
+        """
+        Drop everything computed from df, so that it is recomputed from the new df
+        """
+        self._tensors: Dict[str, Optional[np.ndarray]] = {}
+        self._axis_positions: List[Dict[Any, int]] = []
+        self._pairwise_tables: Dict[Tuple[str, str, str, Callable], pd.DataFrame] = {}
+
+    def _pairwise_display_df(self, col1: str, col2: str, result_col: str, agg_func: Callable) -> pd.DataFrame:
+        """
+        Table of results aggregated for each combination of values of col1 and col2, from reducing the axes
+        of the tensor if possible, otherwise by grouping df
+
+        Tables are reused until df changes, so restyling or replotting does not aggregate again.
+        """
+        key = (col1, col2, result_col, agg_func)
+        try:
+            table = self._pairwise_tables.get(key)
+        except TypeError:
+            # Unhashable agg_func, can't look it up
+            with self._stage('aggregate'):
+                return self._aggregate_pairwise_df(col1, col2, result_col, agg_func)
+        if table is None:
+            with self._stage('aggregate'):
+                table = self._aggregate_pairwise_df(col1, col2, result_col, agg_func)
+            self._pairwise_tables[key] = table
+        # Small copy so that changes to the returned table do not affect the stored one
+        return table.copy()
+
+    def _aggregate_pairwise_df(self, col1: str, col2: str, result_col: str, agg_func: Callable) -> pd.DataFrame:
+        reducer = _tensor_reducer(agg_func)
+        tensor = self._grid_tensor(result_col) if reducer is not None else None
+        if reducer is None or tensor is None:
+            return _two_variable_sensitivity_display_df(
+                self._binned_df(),
+                col1,
+                col2,
+                result_col=result_col,
+                agg_func=agg_func
+            )
+        reduce_func, keeps_dtype = reducer
+        sensitivity_cols = self.sensitivity_cols
+        result_dtype = self.df[result_col].dtype
+        return _tensor_pairwise_df(
+            tensor,
+            list(self.sensitivity_values.values()),
+            sensitivity_cols.index(col1),
+            sensitivity_cols.index(col2),
+            col1,
+            reduce_func,
+            dtype=result_dtype if keeps_dtype else None,
+        )
+
+    def _binned_df(self) -> pd.DataFrame:
+        """
+        df with the columns of each :class:`.ValueRange` split into grid_size bins, so that results can be
+        aggregated over the continuous values
+        """
+        range_bins = _range_bins(self.sensitivity_values, self.grid_size)
+        if not range_bins:
+            return self.df
+        labels = self.labels or {}
+        return self.df.assign(**{
+            labels.get(col, col): pd.cut(self.df[labels.get(col, col)], bins, right=False, include_lowest=True)
+            for col, bins in range_bins.items()
+        })
+
+    def _hex_pairwise_tables(self, result_col: str,
+                             agg_func: Callable) -> Optional[Dict[Tuple[str, str], pd.DataFrame]]:
+        """
+        Tables of aggregated results for each pair of columns which give the same hex-bin plots as the full df,
+        or None if aggregating the tables in each hex would not give the same result as aggregating all the
+        results in the hex
+        """
+        reducer = _recognized_reducer(agg_func)
+        if reducer is None or reducer[0] not in DECOMPOSABLE_REDUCERS:
+            return None
+        tensor = self._grid_tensor(result_col)
+        # Aggregates of aggregates only match when every group has the same number of results
+        if tensor is None or np.isnan(tensor).any():
+            return None
+        return {
+            (col1, col2): self._pairwise_display_df(col1, col2, result_col, agg_func)
+            for col1, col2 in itertools.combinations(self.sensitivity_cols, 2)
+        }
+
+    def refine(self, tolerance: float, max_evaluations: int, max_rounds: int = 10) -> pd.DataFrame:
+        """
+        Runs func at more points where the result changes fastest, to resolve thresholds without running
+        a fine grid everywhere
+
+        The grid is made of cells between neighboring values of each numeric argument. Each round splits the cells
+        whose results differ by more than tolerance between their corners in half along each numeric argument,
+        largest differences first, and runs func only at the new corners. The next round looks at the halves.
+        Stops when no cell differs by more than tolerance, the next cell would take more than max_evaluations runs
+        of func in total, or after max_rounds rounds. Calling refine again continues from the last round.
+
+        Splitting a cell runs func for up to 3 ** n - 2 ** n new points with n numeric arguments, fewer where
+        neighboring cells share them. Arguments with non-numeric values are not split, and integer values are
+        only split into integers.
+
+        The new points are appended to df as extra rows. Like sampled results they are not on the grid of
+        sensitivity_values, so the styled DataFrames and plots aggregate them with the grid rows by value,
+        :attr:`tensor` is not available, and :meth:`extend` cannot be used until the analysis is run again.
+
+        :param tolerance: Largest acceptable difference in the result across a cell
+        :param max_evaluations: Maximum number of additional times to run func
+        :param max_rounds: Maximum number of rounds of splitting cells
+        :return: DataFrame containing the results of the sensitivity analysis with the refined points
+        """
+        if self.sampling != 'grid':
+            raise ValueError('refine splits the cells of the grid, it cannot be used when sampling')
+        if self.surrogate_samples is not None:
+            raise ValueError('refine runs every new case, it cannot be used with a surrogate')
+        if self._refinement is None:
+            self._refinement = _Refinement(self.tensor, self.sensitivity_values)
+        result_col = self._result_col()
+        remaining = max_evaluations
+        for _ in range(max_rounds):
+            points = self._refinement.split(self._refinement.changes(tolerance), remaining,
+                                            constraint=self.constraint)
+            if not points:
+                break
+            new_df = self._run_param_arrays_df(self._refinement.param_arrays(points))
+            self._refinement.results.update(zip(points, new_df[result_col].to_numpy(dtype=float, na_value=np.nan)))
+            self.df = _concat_results(self.df, new_df)
+            remaining -= len(points)
+        return self.df
+
+    def _run_param_arrays_df(self, param_arrays: List[np.ndarray]) -> pd.DataFrame:
+        """
+        Runs func for the cases given by the values at each position of param_arrays, rather than for the grid
+        """
+        sensitivity_values = dict(zip(self.sensitivity_values, param_arrays))
+        execution_kwargs: Dict[str, Any] = dict(
+            result_name=self.result_name,
+            labels=self.labels,
+            categories=_compact_categories(sensitivity_values) if self.compact else None,
+            errors=self.errors,
+            result_names=self.result_names,
+            time_cases=self.time_cases,
+            profile=self._profile,
+        )
+        if not self.vectorized:
+            execution_kwargs.update(
+                n_jobs=self.n_jobs,
+                executor=self.executor,
+                chunk_size=self.chunk_size,
+                async_mode=self.async_mode,
+                max_concurrency=self.max_concurrency,
+                cache=self.cache,
+                isolate=self.isolate,
+                on_case_start=self.on_case_start,
+                on_case_end=self.on_case_end,
+            )
+        func_kwargs: Dict[str, Any] = self.func_kwargs_dict or {}
+        return _param_arrays_df(self.func, list(self.sensitivity_values), param_arrays, func_kwargs,
+                                vectorized=self.vectorized, batch_size=self.batch_size, **execution_kwargs)
+
+    def _run_sensitivity_df(self, sensitivity_values: Dict[str, Any],
+                            checkpoint_path: Optional[Union[str, Path]] = None) -> pd.DataFrame:
+        func_kwargs: Dict[str, Any] = self.func_kwargs_dict or {}
+        if self.surrogate_samples is not None:
+            if self.sampling != 'grid':
+                raise ValueError('surrogate predicts the grid of values, it cannot be used when sampling')
+            if self.constraint is not None:
+                raise ValueError('surrogate predicts the full grid of values, it cannot be used with a constraint')
+            with self._stage('surrogate'):
+                return surrogate_df(
+                    sensitivity_values,
+                    self.func,
+                    self.surrogate_samples,
+                    holdout_fraction=self.surrogate_holdout,
+                    seed=self.seed,
+                    result_name=self.result_name,
+                    labels=self.labels,
+                    n_jobs=self.n_jobs,
+                    executor=self.executor,
+                    chunk_size=self.chunk_size,
+                    vectorized=self.vectorized,
+                    batch_size=self.batch_size,
+                    async_mode=self.async_mode,
+                    max_concurrency=self.max_concurrency,
+                    cache=self.cache,
+                    errors=self.errors,
+                    compact=self.compact,
+                    **func_kwargs
+                )
+        return sensitivity_df(
+            sensitivity_values,
+            self.func,
             result_name=self.result_name,
             labels=self.labels,
-            **self.func_kwargs_dict
+            n_jobs=self.n_jobs,
+            executor=self.executor,
+            chunk_size=self.chunk_size,
+            vectorized=self.vectorized,
+            batch_size=self.batch_size,
+            async_mode=self.async_mode,
+            max_concurrency=self.max_concurrency,
+            cache=self.cache,
+            errors=self.errors,
+            checkpoint_path=checkpoint_path,
+            checkpoint_every=self.checkpoint_every,
+            resume=self.resume,
+            compact=self.compact,
+            sampling=self.sampling,
+            num_samples=self.num_samples,
+            seed=self.seed,
+            constraint=self.constraint,
+            result_names=self.result_names,
+            isolate=self.isolate,
+            time_cases=self.time_cases,
+            on_case_start=self.on_case_start,
+            on_case_end=self.on_case_end,
+            profile=self._profile,
+            **func_kwargs
         )
 
-    def plot(self, **kwargs) -> plt.Figure:
+    @classmethod
+    async def arun(cls, *args, **kwargs) -> 'SensitivityAnalyzer':
+        """
+        Creates the analyzer, awaiting func for each case on the running event loop
+
+        Use in place of creating the analyzer directly when func is async and the caller is
+        already inside a running event loop, e.g. ``sa = await SensitivityAnalyzer.arun(sensitivity_values, func)``
+
+        :param args: Positional arguments for :py:class:`.SensitivityAnalyzer`
+        :param kwargs: Keyword arguments for :py:class:`.SensitivityAnalyzer`. The options for running func in
+            processes, vectorized, with a checkpoint or with a surrogate cannot be used
+        :return: The analyzer with df populated
+        """
+        kwargs['lazy'] = True
+        sa = cls(*args, **kwargs)
+        unsupported = [option for option in _ARUN_UNSUPPORTED_OPTIONS if getattr(sa, option) not in (None, False)]
+        if unsupported:
+            raise ValueError(f'arun awaits func on the running event loop, it cannot be used with {unsupported}')
+        func_kwargs: Dict[str, Any] = sa.func_kwargs_dict or {}
+        sa.df = await asensitivity_df(
+            sa.sensitivity_values,
+            sa.func,
+            result_name=sa.result_name,
+            labels=sa.labels,
+            max_concurrency=sa.max_concurrency,
+            cache=sa.cache,
+            errors=sa.errors,
+            compact=sa.compact,
+            sampling=sa.sampling,
+            num_samples=sa.num_samples,
+            seed=sa.seed,
+            constraint=sa.constraint,
+            result_names=sa.result_names,
+            isolate=sa.isolate,
+            time_cases=sa.time_cases,
+            on_case_start=sa.on_case_start,
+            on_case_end=sa.on_case_end,
+            profile=sa._profile,
+            **func_kwargs
+        )
+        return sa
+
+    def plot(self, result: Optional[str] = None, **kwargs) -> 'plt.Figure':
         """
         Creates hex-bin plots of the sensitivity analysis results
 
+        :param result: Name of the result column to plot when func has multiple outputs, default is the first
         :param kwargs: agg_func, reverse_colors, grid_size, color_map (see :py:class:`.SensitivityAnalyzer`)
         :return: Matplotlib Figure containing one or more plots of sensitivity analysis results
         """
+        result_col = self._result_col(result)
         config_dict: Dict[str, Any] = dict(
             agg_func=self.agg_func,
             reverse_colors=self.reverse_colors,
@@ -105,21 +643,27 @@ class SensitivityAnalyzer:
         )
         config_dict.update(**kwargs)
         sensitivity_cols = self.sensitivity_cols
-        return _hex_figure_from_sensitivity_df(
-            self.df,
-            sensitivity_cols,
-            result_name=self.result_name,
-            **config_dict
-        )
+        pairwise_tables = self._hex_pairwise_tables(result_col, config_dict['agg_func'])
+        with self._stage('plot'):
+            return _hex_figure_from_sensitivity_df(
+                self.df,
+                sensitivity_cols,
+                result_name=result_col,
+                pairwise_tables=pairwise_tables,
+                **config_dict
+            )
 
-    def styled_dfs(self, disp: bool = True, **kwargs) -> Union[Styler, Dict[Sequence[str], Styler]]:
+    def styled_dfs(self, disp: bool = True, result: Optional[str] = None,
+                   **kwargs) -> Union['Styler', Dict[Sequence[str], 'Styler']]:
         """
         Creates Pandas Styler objects showing a gradient over the sensitivity results
 
         :param disp: Whether to display the Styler objects before returning
+        :param result: Name of the result column to show when func has multiple outputs, default is the first
         :param kwargs: reverse_colors, agg_func, num_fmt, color_map (see :py:class:`.SensitivityAnalyzer`)
         :return:
         """
+        result_col = self._result_col(result)
         output = {}
         config_dict: Dict[str, Any] = dict(
             reverse_colors=self.reverse_colors,
@@ -128,62 +672,54 @@ class SensitivityAnalyzer:
             color_map=self.color_map,
         )
         config_dict.update(**kwargs)
-        # Output a single Styler if only one or two variables
-        sensitivity_cols = self.sensitivity_cols
-        if len(sensitivity_cols) == 1:
-            output[tuple(sensitivity_cols)] = _style_sensitivity_df(
-                self.df,
-                sensitivity_cols[0],
-                reverse_colors=config_dict['reverse_colors'],
-                col_subset=[self.result_name],
-                result_col=self.result_name,
-                num_fmt=config_dict['num_fmt'],
-                color_map=config_dict['color_map'],
-            )
-        elif len(sensitivity_cols) == 2:
-            col1 = sensitivity_cols[0]
-            col2 = sensitivity_cols[1]
-            df = _two_variable_sensitivity_display_df(
-                self.df,
-                col1,
-                col2,
-                result_col=self.result_name,
-                agg_func=config_dict['agg_func']
-            )
-            output[(col1, col2)] = _style_sensitivity_df(
-                df,
-                col1,
-                col2=col2,
-                reverse_colors=config_dict['reverse_colors'],
-                result_col=self.result_name,
-                num_fmt=config_dict['num_fmt'],
-                color_map=config_dict['color_map'],
-            )
-        elif len(sensitivity_cols) > 2:
-            # Need to output multiple, one for each pair of variables
-            for col1, col2 in itertools.combinations(sensitivity_cols, 2):
-                df = _two_variable_sensitivity_display_df(
+        with self._stage('style'):
+            # Output a single Styler if only one or two variables
+            sensitivity_cols = self.sensitivity_cols
+            if len(sensitivity_cols) == 1:
+                output[tuple(sensitivity_cols)] = _style_sensitivity_df(
                     self.df,
-                    col1,
-                    col2,
-                    result_col=self.result_name
+                    sensitivity_cols[0],
+                    reverse_colors=config_dict['reverse_colors'],
+                    col_subset=[result_col],
+                    result_col=result_col,
+                    num_fmt=config_dict['num_fmt'],
+                    color_map=config_dict['color_map'],
                 )
-                output[(col1, col2)] = (_style_sensitivity_df(
+            elif len(sensitivity_cols) == 2:
+                col1 = sensitivity_cols[0]
+                col2 = sensitivity_cols[1]
+                df = self._pairwise_display_df(col1, col2, result_col, config_dict['agg_func'])
+                output[(col1, col2)] = _style_sensitivity_df(
                     df,
                     col1,
                     col2=col2,
                     reverse_colors=config_dict['reverse_colors'],
-                    result_col=self.result_name,
+                    result_col=result_col,
                     num_fmt=config_dict['num_fmt'],
                     color_map=config_dict['color_map'],
-                ))
-        elif len(sensitivity_cols) == 0:
-            raise ValueError('must pass sensitivity columns')
+                )
+            elif len(sensitivity_cols) > 2:
+                # Need to output multiple, one for each pair of variables
+                for col1, col2 in itertools.combinations(sensitivity_cols, 2):
+                    df = self._pairwise_display_df(col1, col2, result_col, config_dict['agg_func'])
+                    output[(col1, col2)] = (_style_sensitivity_df(
+                        df,
+                        col1,
+                        col2=col2,
+                        reverse_colors=config_dict['reverse_colors'],
+                        result_col=result_col,
+                        num_fmt=config_dict['num_fmt'],
+                        color_map=config_dict['color_map'],
+                    ))
+            elif len(sensitivity_cols) == 0:
+                raise ValueError('must pass sensitivity columns')
 
         if disp:
+            from IPython.display import display, HTML
+
             for var_tup, sens_df in output.items():
                 var_str = ' vs. '.join(var_tup)
-                title_str = f'{self.result_name} by {var_str}'
+                title_str = f'{result_col} by {var_str}'
                 _display_header(title_str)
                 display(HTML(sens_df.to_html()))
 
@@ -192,6 +728,184 @@ class SensitivityAnalyzer:
 
         return output
 
+    def one_at_a_time(self, base_case: Optional[Dict[str, Any]] = None) -> OneAtATimeResult:
+        """
+        Varies each argument on its own through its sensitivity values, keeping the other arguments at the
+        base case, for a quick look at which arguments matter without running every combination. Uses the
+        same execution options as the analyzer
+
+        :param base_case: Values of the arguments for the base case. Default for each argument not passed is the
+            middle of its sensitivity values
+        :return: Results for each value and the ranked swing of each argument, call its plot method for a
+            tornado chart, see :func:`.one_at_a_time`
+
+        Examples:
+            >>> oat = sa.one_at_a_time()
+            >>> oat.ranked_df
+            >>> oat.plot()
+        """
+        return one_at_a_time(
+            self.sensitivity_values,
+            self.func,
+            base_case=base_case,
+            result_name=self.result_name,
+            labels=self.labels,
+            n_jobs=self.n_jobs,
+            executor=self.executor,
+            chunk_size=self.chunk_size,
+            vectorized=self.vectorized,
+            async_mode=self.async_mode,
+            max_concurrency=self.max_concurrency,
+            cache=self.cache,
+            errors=self.errors,
+            **self.func_kwargs_dict  # type: ignore
+        )
+
+    def sobol_indices(self, num_samples: int = 1024, sampling: str = 'halton', seed: Optional[int] = None,
+                      num_resamples: int = 1000, confidence_level: float = 0.95) -> pd.DataFrame:
+        """
+        Ranks the arguments by variance-based global sensitivity indices, running func on a Saltelli design
+        drawn from the sensitivity values rather than the grid. Uses the same execution options as the analyzer
+
+        :param num_samples: Number of base samples, func runs num_samples * (number of arguments + 2) times
+        :param sampling: How to draw the base samples, 'halton', 'sobol' (requires scipy), 'lhs' or 'random'
+        :param seed: Seed for drawing the samples and the bootstrap resamples
+        :param num_resamples: Number of bootstrap resamples for the confidence intervals
+        :param confidence_level: Probability that the confidence interval contains the index
+        :return: DataFrame with first order (S1) and total order (ST) indices and their confidence intervals for
+            each argument, see :func:`.sobol_indices`
+        """
+        return sobol_indices(
+            self.sensitivity_values,
+            self.func,
+            num_samples=num_samples,
+            sampling=sampling,
+            seed=seed,
+            num_resamples=num_resamples,
+            confidence_level=confidence_level,
+            labels=self.labels,
+            n_jobs=self.n_jobs,
+            executor=self.executor,
+            chunk_size=self.chunk_size,
+            vectorized=self.vectorized,
+            batch_size=self.batch_size,
+            async_mode=self.async_mode,
+            max_concurrency=self.max_concurrency,
+            cache=self.cache,
+            **self.func_kwargs_dict  # type: ignore
+        )
+
+    @property
+    def tensor(self) -> np.ndarray:
+        """
+        Results as a dense array with one axis for each argument in sensitivity_values, in the same order,
+        and positions along each axis in the order of that argument's values. Cases without a result are NaN.
+
+        Use :meth:`sel` to look up results by parameter values and :meth:`marginal` to aggregate over arguments.
+        """
+        tensor = self._grid_tensor()
+        if tensor is None:
+            raise ValueError(
+                'results cannot be arranged on the grid of sensitivity_values, they must be numeric with '
+                'at most one result for each case and the values of each argument must be unique'
+            )
+        return tensor
+
+    def sel(self, **params) -> Union[float, np.ndarray]:
+        """
+        Looks up results by the values of the arguments, without searching df
+
+        :param params: Values of arguments of func. Arguments which are not passed keep all their values
+        :return: The result if every argument is passed, otherwise an array of results with an axis for
+            each argument which was not passed, in the same order as sensitivity_values
+
+        Examples:
+            >>> sa.sel(value1=1, value2=5)
+            >>> sa.sel(value1=1)  # array over all the values of value2
+        """
+        tensor = self.tensor
+        return _tensor_sel(tensor, self._axis_positions, list(self.sensitivity_values), params)
+
+    def marginal(self, *params: str, agg_func: Optional[Callable] = None) -> np.ndarray:
+        """
+        Aggregates the results over every argument other than params
+
+        :param params: Arguments of func to keep
+        :param agg_func: Function to aggregate the results with, default is the agg_func of the analyzer. Must be
+            a recognized reducer such as np.mean, np.median, np.min, np.max, np.sum, np.std or a partial of
+            np.quantile with q
+        :return: Array with an axis for each of params, in the same order as params
+        """
+        agg_func = agg_func if agg_func is not None else self.agg_func
+        reducer = _tensor_reducer(agg_func)
+        if reducer is None:
+            raise ValueError(f'cannot compute marginal with {agg_func}, it is not a recognized reducer')
+        all_params = list(self.sensitivity_values)
+        unknown = [param for param in params if param not in all_params]
+        if unknown:
+            raise ValueError(f'{unknown} are not in sensitivity_values')
+        return _reduce_tensor(self.tensor, [all_params.index(param) for param in params], reducer[0])
+
+    @property
+    def failed_cases(self) -> List[CaseEvaluationError]:
+        """
+        Errors for the cases where func raised, when running with errors='record'. Each has the
+        parameters of the case in param_dict
+        """
+        return self.df.attrs.get('errors', [])
+
+    @property
+    def surrogate_validation(self) -> Optional[SurrogateValidation]:
+        """
+        Errors of the surrogate in predicting evaluated cases which were held out of fitting it, when running
+        with surrogate_samples, otherwise None
+        """
+        return self.df.attrs.get('surrogate')
+
+    @property
+    def sweep_profile(self) -> Optional[SweepProfile]:
+        """
+        Time taken by each stage so far, from running func to styling and plotting, when created with
+        profile=True, otherwise None
+        """
+        return self._profile
+
+    def slowest_regions(self, num_regions: int = 10) -> pd.DataFrame:
+        """
+        Ranks the combinations of values of each pair of arguments by the mean time func took for the cases
+        with them, to find which parts of the grid make func expensive. Requires time_cases=True
+
+        :param num_regions: Number of regions to return
+        :return: DataFrame with a row for each of the slowest regions, slowest first, see :func:`.slowest_regions`
+        """
+        return slowest_regions(self.df, self.sensitivity_cols, num_regions=num_regions)
+
+    @property
+    def cache_hits(self) -> int:
+        """
+        Number of cases whose results were found in the cache
+        """
+        if self.cache is None:
+            return 0
+        return self.cache.hits
+
+    @property
+    def cache_misses(self) -> int:
+        """
+        Number of cases which were not found in the cache and so had to be evaluated
+        """
+        if self.cache is None:
+            return 0
+        return self.cache.misses
+
+    @property
+    def result_cols(self) -> List[str]:
+        """
+        Names of the columns of df with the outputs of func, one for each output when it returns multiple
+        """
+        not_results = set(self.sensitivity_cols) | {PREDICTED_COL, ERROR_COL, CASE_SECONDS_COL}
+        return [col for col in self.df.columns if col not in not_results]
+
     @property
     def sensitivity_cols(self) -> List[str]:
         sensitivity_cols = list(self.sensitivity_values.keys())
@@ -206,6 +920,63 @@ class SensitivityAnalyzer:
         return sensitivity_cols
 
 
+def _no_func(**kwargs):
+    raise ValueError('analyzer was created from existing results, there is no func to run')
+
+
 def _display_header(text: str):
+    from IPython.display import display, HTML
+
     html_str = f'<h2>{text}</h2>'
-    display(HTML(html_str))
\ No newline at end of file
+    display(HTML(html_str))
+
+
+def _merge_extended_df(df: pd.DataFrame, new_df: pd.DataFrame, sensitivity_values: Dict[str, Any],
+                       param: str, new_values: Sequence[Any], constraint: Optional[Callable] = None) -> pd.DataFrame:
+    """
+    Combines the results for the original values with the results for the new values of param,
+    ordering the rows as the cartesian product of the extended values. With a constraint, only the
+    cases which satisfy it have rows
+    """
+    new_sensitivity_values = {**sensitivity_values, param: new_values}
+    axis = list(sensitivity_values).index(param)
+    positions = _grid_row_positions(sensitivity_values, 0, constraint)
+    new_positions = _grid_row_positions(new_sensitivity_values, len(df), constraint)
+    order = np.concatenate([positions, new_positions], axis=axis).ravel()
+    order = order[order >= 0]
+    combined = _concat_results(df, new_df)
+    attrs = combined.attrs
+    combined = combined.iloc[order].reset_index(drop=True)
+    combined.attrs = attrs
+    return combined
+
+
+def _concat_results(df: pd.DataFrame, new_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Appends the rows of new_df to df, keeping Categorical columns compact and combining the recorded errors
+    """
+    combined = pd.concat([df, new_df], ignore_index=True)
+    for col in combined.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype) and isinstance(new_df[col].dtype, pd.CategoricalDtype) \
+                and not isinstance(combined[col].dtype, pd.CategoricalDtype):
+            # Concatenating Categoricals with different categories gives plain values, keep them compact
+            combined[col] = union_categoricals([df[col], new_df[col]])
+    if 'errors' in df.attrs or 'errors' in new_df.attrs:
+        combined.attrs['errors'] = df.attrs.get('errors', []) + new_df.attrs.get('errors', [])
+    return combined
+
+
+def _grid_row_positions(sensitivity_values: Dict[str, Any], start: int,
+                        constraint: Optional[Callable] = None) -> np.ndarray:
+    """
+    Position of the row for each case of the grid in results which start at row start, with an axis for each
+    argument. -1 for cases which do not satisfy constraint, as they have no row
+    """
+    shape = [len(values) for values in sensitivity_values.values()]
+    num_cases = int(np.prod(shape, dtype=np.int64))
+    if constraint is None:
+        return np.arange(start, start + num_cases).reshape(shape)
+    valid = _constraint_mask(list(sensitivity_values), _grid_batches(sensitivity_values), num_cases, constraint)
+    positions = np.full(num_cases, -1, dtype=np.intp)
+    positions[valid] = np.arange(start, start + valid.sum())
+    return positions.reshape(shape)
@@ -0,0 +1,218 @@
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import Dict, Any, Callable, Optional, List, TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+from sensitivity.cache import ResultCache
+from sensitivity.colors import _get_color_map
+from sensitivity.df import _param_arrays_df
+from sensitivity.execution import Case, _values_array
+from sensitivity.sampling import ValueRange
+
+if TYPE_CHECKING:
+    import matplotlib.pyplot as plt
+
+RANKED_COLUMNS = ('Low', 'High', 'Swing', 'Value at Low', 'Value at High')
+
+
+@dataclass
+class OneAtATimeResult:
+    """
+    Results of varying each argument on its own around a base case
+
+    :param df: Result for each value of each argument, with columns Parameter, Value and the result
+    :param ranked_df: Lowest and highest result from varying each argument, the swing between them, and the
+        values giving them, with the arguments with the largest swing first
+    :param base_case: Value of each argument in the base case
+    :param base_result: Result of the base case
+    :param num_evaluations: Number of times func was run
+    :param result_name: Name of the result column in df
+    """
+    df: pd.DataFrame
+    ranked_df: pd.DataFrame
+    base_case: Dict[str, Any]
+    base_result: Any
+    num_evaluations: int
+    result_name: str = 'Result'
+
+    def plot(self, reverse_colors: bool = False, color_map: str = 'RdYlGn') -> 'plt.Figure':
+        """
+        Creates a tornado chart with a bar for each argument from the lowest to the highest result from
+        varying it, centered on the base result, with the arguments with the largest swing at the top
+
+        :param reverse_colors: Default is for the low end of the color map to show results below the base result.
+            Set reverse_colors=True to swap them.
+        :param color_map: matplotlib color map, the colors at the ends are used for the bars
+        :return: Matplotlib Figure containing the tornado chart
+        """
+        import matplotlib.pyplot as plt
+
+        cmap = plt.get_cmap(_get_color_map(reverse_colors=reverse_colors, color_map=color_map))
+        # Largest swing at the top
+        ranked_df = self.ranked_df.iloc[::-1]
+        base = float(self.base_result)
+        low = ranked_df['Low'].to_numpy(dtype=float, na_value=np.nan)
+        high = ranked_df['High'].to_numpy(dtype=float, na_value=np.nan)
+        positions = np.arange(len(ranked_df))
+
+        fig, ax = plt.subplots(figsize=(8, max(2, 0.5 * len(ranked_df) + 1)))
+        ax.barh(positions, low - base, left=base, color=cmap(0.1))
+        ax.barh(positions, high - base, left=base, color=cmap(0.9))
+        ax.axvline(base, color='black', linewidth=1)
+        ax.set_yticks(positions)
+        ax.set_yticklabels([str(label) for label in ranked_df.index])
+        ax.set_xlabel(self.result_name)
+        ax.set_title(f'{self.result_name} varying one at a time from {base:.4g}')
+        fig.tight_layout()
+        return fig
+
+
+def one_at_a_time(sensitivity_values: Dict[str, Any], func: Callable,
+                  base_case: Optional[Dict[str, Any]] = None,
+                  result_name: str = 'Result',
+                  labels: Optional[Dict[str, str]] = None,
+                  n_jobs: Optional[int] = None,
+                  executor: Optional[Executor] = None,
+                  chunk_size: Optional[int] = None,
+                  vectorized: bool = False,
+                  async_mode: bool = False,
+                  max_concurrency: Optional[int] = 10,
+                  cache: Optional[ResultCache] = None,
+                  errors: str = 'raise',
+                  **func_kwargs) -> OneAtATimeResult:
+    """
+    Runs func varying each argument on its own through its sensitivity values, keeping the other arguments
+    at the base case, to quickly see which arguments matter.
+
+    The base case is run once and shared by every argument, so func runs at most one more than the total number
+    of sensitivity values, rather than for every combination of them.
+
+    :param sensitivity_values: Dictionary where keys are func's argument names and values are lists of possible
+        values to use for that argument.
+    :param func: Function that accepts arguments with names matching the keys of sensitivity_values, and outputs a
+        scalar value.
+    :param base_case: Values of the arguments for the base case. Default for each argument not passed is the
+        middle of its sensitivity values
+    :param result_name: Name for result shown in the output
+    :param labels: Optional dictionary where keys are arguments of the function and values are the displayed names
+        for these arguments in the output
+    :param n_jobs: Number of worker processes to run func in, see :func:`.sensitivity_df`
+    :param executor: Optional :class:`concurrent.futures.Executor` to run func on, see :func:`.sensitivity_df`
+    :param chunk_size: Number of cases to send to a worker at once, see :func:`.sensitivity_df`
+    :param vectorized: Whether func accepts and returns arrays, see :func:`.sensitivity_df`
+    :param async_mode: Whether func returns awaitables, see :func:`.sensitivity_df`
+    :param max_concurrency: Maximum number of cases awaited at once in async mode
+    :param cache: Optional :class:`.ResultCache` to look up results from previous runs
+    :param errors: 'raise' to stop when func raises, or 'record' to continue, see :func:`.sensitivity_df`
+    :param func_kwargs: Additional arguments to pass to func, regardless of the sensitivity values picked
+    :return: Results for each value, ranked swing of each argument, and a tornado chart from its plot method
+    """
+    sensitivity_cols = list(sensitivity_values.keys())
+    base_case = _base_case(sensitivity_values, base_case)
+    base = tuple(base_case[col] for col in sensitivity_cols)
+
+    # Base case first, then the cases which differ from it in one argument
+    cases: List[Case] = [base]
+    # Position of the case for each value of each argument, including the base value
+    case_positions: Dict[str, List[int]] = {}
+    varied_values: Dict[str, List[Any]] = {}
+    for i, (col, values) in enumerate(sensitivity_values.items()):
+        values = list(values)
+        if not any(_is_equal(value, base[i]) for value in values):
+            values.append(base[i])
+        varied_values[col] = values
+        case_positions[col] = []
+        for value in values:
+            if _is_equal(value, base[i]):
+                case_positions[col].append(0)
+                continue
+            case_positions[col].append(len(cases))
+            cases.append(base[:i] + (value,) + base[i + 1:])
+
+    param_arrays = [_values_array([case[i] for case in cases]) for i in range(len(sensitivity_cols))]
+    execution_kwargs: Dict[str, Any] = dict(errors=errors) if vectorized else dict(
+        n_jobs=n_jobs,
+        executor=executor,
+        chunk_size=chunk_size,
+        async_mode=async_mode,
+        max_concurrency=max_concurrency,
+        cache=cache,
+        errors=errors,
+    )
+    cases_df = _param_arrays_df(func, sensitivity_cols, param_arrays, func_kwargs, vectorized=vectorized,
+                                **execution_kwargs)
+    if 'Result' not in cases_df:
+        raise ValueError('func must return a single result for each case for one at a time analysis')
+    results = cases_df['Result']
+
+    labels = labels or {}
+    rows = [
+        (labels.get(col, col), value, results.iloc[position])
+        for col in sensitivity_cols
+        for value, position in zip(varied_values[col], case_positions[col])
+    ]
+    df = pd.DataFrame(rows, columns=['Parameter', 'Value', result_name])
+    df[result_name] = df[result_name].astype(results.dtype)
+    if 'errors' in cases_df.attrs:
+        df.attrs['errors'] = cases_df.attrs['errors']
+
+    return OneAtATimeResult(
+        df=df,
+        ranked_df=_ranked_df(df, result_name),
+        base_case=base_case,
+        base_result=results.iloc[0],
+        num_evaluations=len(cases),
+        result_name=result_name,
+    )
+
+
+def _base_case(sensitivity_values: Dict[str, Any], base_case: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    passed_base_case = base_case or {}
+    unknown = set(passed_base_case) - set(sensitivity_values)
+    if unknown:
+        raise ValueError(f'base_case has {sorted(unknown)} which are not in sensitivity_values')
+    base_case = {}
+    for col, values in sensitivity_values.items():
+        if isinstance(values, ValueRange):
+            raise ValueError(f'one at a time analysis needs a list of values for {col}, not a range')
+        if col in passed_base_case:
+            base_case[col] = passed_base_case[col]
+            continue
+        values = list(values)
+        if not values:
+            raise ValueError(f'must pass values for {col}')
+        base_case[col] = values[(len(values) - 1) // 2]
+    return base_case
+
+
+def _ranked_df(df: pd.DataFrame, result_name: str) -> pd.DataFrame:
+    results = df[result_name].to_numpy(dtype=float, na_value=np.nan)
+    ranked_rows = []
+    for parameter, positions in df.groupby('Parameter', sort=False).indices.items():
+        param_results = results[positions]
+        if np.isnan(param_results).all():
+            ranked_rows.append((parameter, np.nan, np.nan, np.nan, None, None))
+            continue
+        low = np.nanargmin(param_results)
+        high = np.nanargmax(param_results)
+        values = df['Value'].iloc[positions]
+        ranked_rows.append((
+            parameter,
+            param_results[low],
+            param_results[high],
+            param_results[high] - param_results[low],
+            values.iloc[low],
+            values.iloc[high],
+        ))
+    ranked_df = pd.DataFrame(ranked_rows, columns=['Parameter', *RANKED_COLUMNS]).set_index('Parameter')
+    return ranked_df.sort_values('Swing', ascending=False, kind='stable')
+
+
+def _is_equal(value: Any, other: Any) -> bool:
+    try:
+        return bool(value == other)
+    except (TypeError, ValueError):
+        # Comparing arrays gives an array
+        return value is other
@@ -0,0 +1,125 @@
+from typing import Dict, Any, Optional, List, Sequence, Union, Callable
+
+import numpy as np
+
+# Key for the only output when func returns a single result
+SINGLE_OUTPUT = None
+OutputKey = Union[str, int, None]
+
+
+def _split_outputs(results: np.ndarray, split_sequences: bool = False,
+                   describe_case: Callable[[int], str] = lambda i: f'case {i}'
+                   ) -> Optional[Dict[OutputKey, np.ndarray]]:
+    """
+    Splits results from running func case by case into an array for each output, when func returns a dict of
+    outputs, or a tuple or 1-D array of them if split_sequences. None if func returns single results
+
+    Keys are the dict keys, or the positions of the outputs in the tuple or array. Cases without a result
+    are None in every output.
+
+    :param describe_case: Describes the case at a position of results, for the error when its outputs do not
+        match those of the other cases
+    """
+    if results.dtype != object:
+        return None
+    first_shape: Any = SINGLE_OUTPUT
+    first_position = None
+    for i, result in enumerate(results):
+        if result is None:
+            continue
+        shape = _output_shape(result, split_sequences)
+        if first_position is None:
+            first_shape, first_position = shape, i
+        elif shape != first_shape:
+            raise ValueError(f'func must return the same outputs for every case, got {_describe_shape(first_shape)} '
+                             f'for {describe_case(first_position)} and {_describe_shape(shape)} for '
+                             f'{describe_case(i)}')
+    if first_shape is SINGLE_OUTPUT:
+        return None
+    if isinstance(first_shape, int):
+        table = np.empty((len(results), first_shape), dtype=object)
+        for i, result in enumerate(results):
+            if result is not None:
+                table[i] = tuple(result)
+        return {i: table[:, i] for i in range(first_shape)}
+    outputs: Dict[OutputKey, np.ndarray] = {}
+    # Columns in the order of the keys of the first result
+    for key in results[first_position]:
+        values = np.empty(len(results), dtype=object)
+        values[:] = [result[key] if result is not None else None for result in results]
+        outputs[key] = values
+    return outputs
+
+
+def _output_shape(result: Any, split_sequences: bool) -> Any:
+    """
+    The keys of a dict result, the number of outputs in a tuple or 1-D array result if split_sequences,
+    otherwise SINGLE_OUTPUT
+    """
+    if isinstance(result, dict):
+        return frozenset(result)
+    if split_sequences and (isinstance(result, tuple) or (isinstance(result, np.ndarray) and result.ndim == 1)):
+        return len(result)
+    return SINGLE_OUTPUT
+
+
+def _describe_shape(shape: Any) -> str:
+    if shape is SINGLE_OUTPUT:
+        return 'a single result'
+    if isinstance(shape, int):
+        return f'{shape} outputs'
+    return f'outputs {sorted(shape, key=str)}'
+
+
+def _vectorized_outputs(result: Any, num_cases: int) -> Dict[OutputKey, np.ndarray]:
+    """
+    Converts the result of a vectorized func for num_cases cases into an array for each output. func may return
+    one array of results, a dict or tuple of arrays, or a 2-D array with a column for each output
+    """
+    if isinstance(result, dict):
+        outputs: Dict[OutputKey, Any] = dict(result)
+    elif isinstance(result, tuple):
+        outputs = dict(enumerate(result))
+    else:
+        result = np.asarray(result)
+        if result.ndim == 2:
+            outputs = {i: result[:, i] for i in range(result.shape[1])}
+        else:
+            outputs = {SINGLE_OUTPUT: result}
+
+    output_arrays: Dict[OutputKey, np.ndarray] = {}
+    for key, values in outputs.items():
+        values = np.asarray(values)
+        if values.ndim == 0:
+            # func did not depend on the parameters, the same result for each case
+            values = np.broadcast_to(values, (num_cases,))
+        if values.shape != (num_cases,):
+            raise ValueError(
+                f'vectorized func must return an array with one value for each of the {num_cases} '
+                f'cases passed, got shape {values.shape}'
+            )
+        output_arrays[key] = values
+    return output_arrays
+
+
+def _output_names(keys: Sequence[OutputKey], result_name: str = 'Result',
+                  result_names: Optional[Sequence[str]] = None) -> List[str]:
+    """
+    Column names for the outputs of func: result_name for a single output, the keys of a dict, otherwise
+    result_names or result_name followed by the number of the output
+    """
+    names: List[str] = []
+    for key in keys:
+        if key is SINGLE_OUTPUT:
+            names.append(result_name)
+        elif isinstance(key, int):
+            if result_names is not None:
+                if len(result_names) != len(keys):
+                    raise ValueError(f'func returned {len(keys)} outputs but {len(result_names)} result_names '
+                                     f'were passed')
+                names.append(result_names[key])
+            else:
+                names.append(f'{result_name} {key + 1}')
+        else:
+            names.append(str(key))
+    return names
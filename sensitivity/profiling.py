@@ -0,0 +1,160 @@
+import inspect
+import itertools
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import Dict, Any, Callable, Optional, List, Sequence, Iterator, NamedTuple, ContextManager
+
+import pandas as pd
+
+CASE_SECONDS_COL = 'Case Seconds'
+
+# Hooks called in the process running func, with the sensitivity values of the case
+CaseStartHook = Callable[[Dict[str, Any]], None]
+CaseEndHook = Callable[[Dict[str, Any], Any, float], None]
+
+
+@dataclass
+class SweepProfile:
+    """
+    Time taken by each stage of a sensitivity analysis, to find where the time goes when it is slow
+
+    The stages are 'grid' for working out which cases to run, 'evaluate' for running func on the cases,
+    'assemble' for building df from the results, and for :py:class:`.SensitivityAnalyzer` also 'aggregate'
+    for the pairwise tables of results, 'style' for the styled DataFrames and 'plot' for the hex-bin plots.
+    A stage run inside another is only counted in the inner stage, and running a stage again adds to its time.
+
+    :param stage_seconds: Seconds spent in each stage, in the order the stages first ran
+    """
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+    _nested_seconds: List[float] = field(default_factory=list, init=False, repr=False, compare=False)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Context manager adding the time taken inside it to the stage name
+        """
+        self._nested_seconds.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self._nested_seconds.pop()
+            self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + elapsed - nested
+            if self._nested_seconds:
+                self._nested_seconds[-1] += elapsed
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(self.stage_seconds.values())
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """
+        DataFrame with the seconds spent in each stage and its share of the total time, slowest first
+        """
+        df = pd.DataFrame({'Seconds': pd.Series(self.stage_seconds, dtype=float)})
+        df.index.name = 'Stage'
+        total = self.total_seconds
+        df['Share'] = df['Seconds'] / total if total > 0 else 0.0
+        return df.sort_values('Seconds', ascending=False, kind='mergesort')
+
+    def __str__(self) -> str:
+        stages = ', '.join(f'{name} {seconds:.3g}s' for name, seconds in self.stage_seconds.items())
+        return f'{self.total_seconds:.3g}s total: {stages}'
+
+
+def slowest_regions(df: pd.DataFrame, sensitivity_cols: Sequence[str], num_regions: int = 10,
+                    time_col: str = CASE_SECONDS_COL) -> pd.DataFrame:
+    """
+    Ranks the combinations of values of each pair of arguments by the mean time func took for the cases with
+    them, to find which parts of the grid make func expensive
+
+    :param df: Results of a sensitivity analysis run with time_cases=True, see :func:`.sensitivity_df`
+    :param sensitivity_cols: Names of the columns of df with the values of the arguments
+    :param num_regions: Number of regions to return
+    :param time_col: Name of the column of df with the seconds taken by each case
+    :return: DataFrame with a row for each of the slowest regions, slowest first, with the values of the pair of
+        arguments defining the region and missing values for the other arguments. With only one argument, the
+        regions are its values. Also has the number of timed cases in the region, their mean and total seconds and
+        the mean relative to the mean of all the cases
+    """
+    if time_col not in df:
+        raise ValueError(f'df has no {time_col} column, run the sensitivity analysis with time_cases=True')
+    sensitivity_cols = list(sensitivity_cols)
+    if len(sensitivity_cols) < 2:
+        groups: List[Sequence[str]] = [sensitivity_cols]
+    else:
+        groups = list(itertools.combinations(sensitivity_cols, 2))
+    seconds = df[time_col].astype(float)
+    tables = [
+        seconds.groupby([df[col] for col in cols], observed=True).agg(['count', 'mean', 'sum']).reset_index()
+        for cols in groups
+    ]
+    regions = pd.concat(tables, ignore_index=True).rename(
+        columns={'count': 'Cases', 'mean': 'Mean Seconds', 'sum': 'Total Seconds'}
+    )
+    overall_mean = seconds.mean()
+    regions['Relative Time'] = regions['Mean Seconds'] / overall_mean if overall_mean > 0 else float('nan')
+    regions = regions.sort_values('Mean Seconds', ascending=False, kind='mergesort').head(num_regions)
+    return regions[sensitivity_cols + ['Cases', 'Mean Seconds', 'Total Seconds', 'Relative Time']].reset_index(
+        drop=True
+    )
+
+
+class _TimedResult(NamedTuple):
+    result: Any
+    seconds: float
+
+
+class _TimedFunc:
+    """
+    Wraps func to time each case and call the hooks around it, returning the result along with the seconds
+    taken. Module level so that it can be sent to worker processes
+    """
+
+    def __init__(self, func: Callable, sensitivity_cols: Sequence[str], on_case_start: Optional[CaseStartHook] = None,
+                 on_case_end: Optional[CaseEndHook] = None):
+        self.func = func
+        self.sensitivity_cols = list(sensitivity_cols)
+        self.on_case_start = on_case_start
+        self.on_case_end = on_case_end
+
+    def __call__(self, **kwargs) -> Any:
+        params = {col: kwargs[col] for col in self.sensitivity_cols}
+        if self.on_case_start is not None:
+            self.on_case_start(params)
+        start = time.perf_counter()
+        try:
+            result = self.func(**kwargs)
+        except Exception:
+            self._end(params, None, start)
+            raise
+        if inspect.isawaitable(result):
+            return self._end_when_done(result, params, start)
+        return self._end(params, result, start)
+
+    async def _end_when_done(self, awaitable: Any, params: Dict[str, Any], start: float) -> _TimedResult:
+        try:
+            result = await awaitable
+        except Exception:
+            self._end(params, None, start)
+            raise
+        return self._end(params, result, start)
+
+    def _end(self, params: Dict[str, Any], result: Any, start: float) -> _TimedResult:
+        seconds = time.perf_counter() - start
+        if self.on_case_end is not None:
+            self.on_case_end(params, result, seconds)
+        return _TimedResult(result, seconds)
+
+
+def _untimed(result: Any) -> Any:
+    return result.result if isinstance(result, _TimedResult) else result
+
+
+def _profile_stage(profile: Optional[SweepProfile], name: str) -> ContextManager:
+    if profile is None:
+        return nullcontext()
+    return profile.stage(name)
@@ -0,0 +1,179 @@
+import itertools
+from typing import Dict, Any, List, Tuple, Sequence, Optional, Callable, Set
+
+import numpy as np
+
+from sensitivity.execution import Case, _values_array
+from sensitivity.grid import _constraint_mask
+
+# Values of each argument covered by a cell, a (low, high) range of a numeric argument or the (position,) of a
+# value of any other argument. Points are keyed the same way, by value for numeric arguments and position otherwise
+Cell = Tuple[Tuple[Any, ...], ...]
+
+
+class _Refinement:
+    """
+    Cells of a grid to split where the result changes by more than a tolerance across them, and the results at
+    the points run so far. Cells span neighboring values of each numeric argument, and one value of each other
+    argument. Missing results are ignored.
+
+    :param tensor: Results on the grid, see :attr:`.SensitivityAnalyzer.tensor`
+    :param sensitivity_values: Values of each argument on the grid, in the order of the axes of tensor
+    """
+
+    def __init__(self, tensor: np.ndarray, sensitivity_values: Dict[str, Sequence[Any]]):
+        self.tensor = tensor
+        self.sensitivity_values = {param: list(values) for param, values in sensitivity_values.items()}
+        self.numeric = [
+            _values_array(values).dtype.kind in 'iuf' and len(values) >= 2
+            for values in self.sensitivity_values.values()
+        ]
+        self.positions = [
+            {value: i for i, value in enumerate(values)} if numeric else {}
+            for values, numeric in zip(self.sensitivity_values.values(), self.numeric)
+        ]
+        self.results: Dict[Case, float] = {}
+        self.ruled_out: Set[Case] = set()
+        # Cells to look at in the next round, None for every cell of the grid
+        self.cells: Optional[List[Cell]] = None
+
+    def changes(self, tolerance: float) -> List[Tuple[float, Cell]]:
+        """
+        Cells to look at whose results differ by more than tolerance between their corners, with the difference
+        """
+        if self.cells is None:
+            return self._grid_changes(tolerance)
+        candidates: List[Tuple[float, Cell]] = []
+        for cell in self.cells:
+            corner_results = np.array([self.result(corner) for corner in _cell_points(cell)])
+            if np.isnan(corner_results).all():
+                continue
+            change = np.nanmax(corner_results) - np.nanmin(corner_results)
+            if change > tolerance:
+                candidates.append((float(change), cell))
+        return candidates
+
+    def split(self, candidates: List[Tuple[float, Cell]], max_evaluations: int,
+              constraint: Optional[Callable] = None) -> List[Case]:
+        """
+        Splits the cells in candidates in half along each numeric argument, largest differences first, skipping
+        cells whose new corners would take more than max_evaluations runs of func in total. The halves, and the
+        cells which were skipped, are looked at in the next round
+
+        :return: Points to run func for, the corners of the halves which have not been run
+        """
+        new_points: List[Case] = []
+        new_point_set: Set[Case] = set()
+        next_cells: List[Cell] = []
+        for _, cell in sorted(candidates, key=lambda candidate: -candidate[0]):
+            midpoints = [_midpoint(*bounds) if len(bounds) == 2 else None for bounds in cell]
+            if all(midpoint is None for midpoint in midpoints):
+                # Too small to split
+                continue
+            points = [
+                point for point in _cell_points(cell, midpoints)
+                if not self.has_run(point) and point not in new_point_set
+            ]
+            if constraint is not None and points:
+                valid = _constraint_mask(list(self.sensitivity_values), [self.param_arrays(points)], len(points),
+                                         constraint)
+                self.ruled_out.update(point for point, is_valid in zip(points, valid) if not is_valid)
+                points = [point for point, is_valid in zip(points, valid) if is_valid]
+            if len(new_points) + len(points) > max_evaluations:
+                next_cells.append(cell)
+                continue
+            new_points.extend(points)
+            new_point_set.update(points)
+            next_cells.extend(itertools.product(*[
+                [bounds] if midpoint is None else [(bounds[0], midpoint), (midpoint, bounds[1])]
+                for bounds, midpoint in zip(cell, midpoints)
+            ]))
+        self.cells = next_cells
+        return new_points
+
+    def result(self, point: Case) -> float:
+        grid_position = []
+        for value, positions, numeric in zip(point, self.positions, self.numeric):
+            position = positions.get(value) if numeric else value
+            if position is None:
+                return self.results.get(point, np.nan)
+            grid_position.append(position)
+        return float(self.tensor[tuple(grid_position)])
+
+    def has_run(self, point: Case) -> bool:
+        if point in self.results or point in self.ruled_out:
+            return True
+        return all(not numeric or value in positions
+                   for value, positions, numeric in zip(point, self.positions, self.numeric))
+
+    def param_arrays(self, points: Sequence[Case]) -> List[np.ndarray]:
+        """
+        Array of the values of each argument at points
+        """
+        return [
+            _values_array([point[axis] if numeric else values[point[axis]] for point in points])
+            for axis, (values, numeric) in enumerate(zip(self.sensitivity_values.values(), self.numeric))
+        ]
+
+    def _grid_changes(self, tolerance: float) -> List[Tuple[float, Cell]]:
+        tensor = self.tensor
+        axis_values: List[List[Any]] = []
+        for axis, (values, numeric) in enumerate(zip(self.sensitivity_values.values(), self.numeric)):
+            if numeric:
+                order = np.argsort(np.asarray(values), kind='stable')
+                tensor = np.take(tensor, order, axis=axis)
+                axis_values.append([values[i] for i in order])
+            else:
+                axis_values.append(list(range(len(values))))
+
+        # Largest and smallest result over the corners of each cell
+        highs = lows = tensor
+        for axis, numeric in enumerate(self.numeric):
+            if not numeric:
+                continue
+            lower = tuple(slice(None, -1) if i == axis else slice(None) for i in range(tensor.ndim))
+            upper = tuple(slice(1, None) if i == axis else slice(None) for i in range(tensor.ndim))
+            highs = np.fmax(highs[lower], highs[upper])
+            lows = np.fmin(lows[lower], lows[upper])
+        with np.errstate(invalid='ignore'):
+            # Cells without results give NaN, which is never over the tolerance
+            changes = highs - lows
+            flagged = np.argwhere(changes > tolerance)
+
+        return [
+            (float(changes[tuple(position)]), tuple(
+                (values[i], values[i + 1]) if numeric else (values[i],)
+                for i, values, numeric in zip(position, axis_values, self.numeric)
+            ))
+            for position in flagged
+        ]
+
+
+def _cell_points(cell: Cell, midpoints: Optional[Sequence[Any]] = None) -> List[Case]:
+    """
+    Corners of cell, or of the cells from splitting it at midpoints, which has a value or None for each argument
+    """
+    axis_points: List[List[Any]] = []
+    for i, bounds in enumerate(cell):
+        midpoint = midpoints[i] if midpoints is not None else None
+        if midpoint is None:
+            axis_points.append(list(bounds))
+        else:
+            axis_points.append([bounds[0], midpoint, bounds[1]])
+    return list(itertools.product(*axis_points))
+
+
+def _midpoint(low: Any, high: Any) -> Any:
+    """
+    Value halfway between low and high, keeping integers as integers. None if there is no value between them
+    """
+    if isinstance(low, (int, np.integer)) and isinstance(high, (int, np.integer)):
+        if high - low < 2:
+            return None
+        midpoint = (low + high) // 2
+    else:
+        midpoint = (low + high) / 2
+    if not low < midpoint < high:
+        # Too close together to split
+        return None
+    return midpoint.item() if isinstance(midpoint, np.generic) else midpoint
@@ -0,0 +1,154 @@
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, Iterator
+
+import numpy as np
+
+from sensitivity.execution import Case, _values_array
+
+SAMPLING_METHODS = ('grid', 'random', 'lhs', 'halton', 'sobol')
+
+
+@dataclass(frozen=True)
+class ValueRange:
+    """
+    Continuous range of values for an argument, for use in sensitivity_values when sampling
+    rather than running the full grid of values
+
+    :param low: Lowest value, included in the range
+    :param high: Highest value, excluded from the range
+
+    Examples:
+        >>> from sensitivity import SensitivityAnalyzer, ValueRange
+        >>>
+        >>> sensitivity_values = {'rate': ValueRange(0.01, 0.1), 'years': [5, 10, 20]}
+        >>> sa = SensitivityAnalyzer(sensitivity_values, my_model, sampling='lhs', num_samples=1000)
+    """
+    low: float
+    high: float
+
+    def __post_init__(self):
+        if not self.high > self.low:
+            raise ValueError(f'high must be greater than low, got low={self.low} and high={self.high}')
+
+    def bins(self, num_bins: int) -> np.ndarray:
+        """
+        Edges of num_bins equal width bins covering the range
+        """
+        return np.linspace(self.low, self.high, num_bins + 1)
+
+
+def _sample_params(sensitivity_values: Dict[str, Any], method: str, num_samples: int,
+                   seed: Optional[int] = None) -> List[np.ndarray]:
+    """
+    Draws num_samples cases, giving an array of values for each argument in the order of sensitivity_values.
+
+    Points in the unit hypercube from the sampling method are scaled to each ValueRange, or mapped to
+    one of the values in a list of values with equal probability for each value.
+    """
+    if method not in SAMPLING_METHODS or method == 'grid':
+        raise ValueError(f'sampling method must be one of {SAMPLING_METHODS[1:]}, got {method}')
+    if num_samples is None or num_samples < 1:
+        raise ValueError(f'must pass a positive number of samples when sampling, got {num_samples}')
+    unit = _unit_samples(method, num_samples, len(sensitivity_values), seed=seed)
+    return _scale_unit_samples(sensitivity_values, unit)
+
+
+def _scale_unit_samples(sensitivity_values: Dict[str, Any], unit: np.ndarray) -> List[np.ndarray]:
+    """
+    Maps points in the unit hypercube, with one column for each argument in sensitivity_values, to values
+    """
+    param_arrays: List[np.ndarray] = []
+    for i, values in enumerate(sensitivity_values.values()):
+        if isinstance(values, ValueRange):
+            param_arrays.append(values.low + unit[:, i] * (values.high - values.low))
+            continue
+        values_arr = _values_array(values)
+        if len(values_arr) == 0:
+            raise ValueError('cannot sample from an empty list of values')
+        positions = np.minimum((unit[:, i] * len(values_arr)).astype(np.intp), len(values_arr) - 1)
+        param_arrays.append(values_arr[positions])
+    return param_arrays
+
+
+def _sampled_cases(param_arrays: List[np.ndarray]) -> List[Case]:
+    """
+    Converts arrays of sampled values into cases, with Python rather than NumPy scalars
+    """
+    return list(zip(*[arr.tolist() for arr in param_arrays]))
+
+
+def _sample_batches(param_arrays: List[np.ndarray], batch_size: Optional[int] = None) -> Iterator[List[np.ndarray]]:
+    num_samples = len(param_arrays[0]) if param_arrays else 0
+    if batch_size is None:
+        batch_size = max(num_samples, 1)
+    for start in range(0, num_samples, batch_size):
+        yield [arr[start:start + batch_size] for arr in param_arrays]
+
+
+def _unit_samples(method: str, num_samples: int, num_dims: int, seed: Optional[int] = None) -> np.ndarray:
+    """
+    Points in the unit hypercube [0, 1) with shape (num_samples, num_dims)
+    """
+    rng = np.random.default_rng(seed)
+    if method == 'random':
+        return rng.random((num_samples, num_dims))
+    if method == 'lhs':
+        # One point in each of num_samples equal strata along every axis, with the strata paired randomly
+        strata = np.column_stack([rng.permutation(num_samples) for _ in range(num_dims)])
+        return (strata + rng.random((num_samples, num_dims))) / num_samples
+    if method == 'halton':
+        points = _halton(num_samples, num_dims)
+        # Random shift so that different seeds give different points with the same coverage
+        return (points + rng.random(num_dims)) % 1
+    if method == 'sobol':
+        qmc = _import_scipy_qmc()
+        return qmc.Sobol(num_dims, scramble=True, seed=rng).random(num_samples)
+    raise ValueError(f'sampling method must be one of {SAMPLING_METHODS[1:]}, got {method}')
+
+
+def _halton(num_samples: int, num_dims: int) -> np.ndarray:
+    """
+    First num_samples points of the Halton sequence, skipping the point at the origin
+    """
+    indices = np.arange(1, num_samples + 1)
+    points = np.empty((num_samples, num_dims))
+    for dim, base in enumerate(_first_primes(num_dims)):
+        remaining = indices.copy()
+        fraction = 1.0
+        result = np.zeros(num_samples)
+        while remaining.any():
+            fraction /= base
+            result += fraction * (remaining % base)
+            remaining //= base
+        points[:, dim] = result
+    return points
+
+
+def _first_primes(num: int) -> List[int]:
+    primes: List[int] = []
+    candidate = 2
+    while len(primes) < num:
+        if all(candidate % prime for prime in primes if prime * prime <= candidate):
+            primes.append(candidate)
+        candidate += 1
+    return primes
+
+
+def _range_bins(sensitivity_values: Dict[str, Any], num_bins: int) -> Dict[str, np.ndarray]:
+    return {
+        col: values.bins(num_bins) for col, values in sensitivity_values.items() if isinstance(values, ValueRange)
+    }
+
+
+def _has_ranges(sensitivity_values: Dict[str, Any]) -> bool:
+    return any(isinstance(values, ValueRange) for values in sensitivity_values.values())
+
+
+def _import_scipy_qmc():
+    try:
+        from scipy.stats import qmc
+    except ImportError as e:
+        raise ImportError('scipy>=1.7 is required for Sobol sampling, install it with pip install scipy, '
+                          'or use another sampling method such as halton') from e
+    return qmc
+
@@ -0,0 +1,294 @@
+import itertools
+import operator
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import reduce
+from pathlib import Path
+from typing import Dict, Any, Callable, Optional, Iterator, Union, List, Tuple, Iterable
+
+import numpy as np
+import pandas as pd
+
+from sensitivity.cache import ResultCache
+from sensitivity.df import _cases_df, _vectorized_df, _compact_categories, _sweep_param_arrays, _broadcast_rows
+from sensitivity.execution import Case, _chunked, _grid_batches, _max_workers
+from sensitivity.sampling import _sample_batches, _sampled_cases
+
+FILE_FORMAT_EXTENSIONS = {
+    'parquet': '.parquet',
+    'arrow': '.arrow',
+}
+_ARROW_SUFFIXES = ('.arrow', '.feather', '.ipc')
+
+
+def iter_sensitivity_df(sensitivity_values: Dict[str, Any], func: Callable,
+                        chunk_rows: int = 100_000,
+                        result_name: str = 'Result',
+                        labels: Optional[Dict[str, str]] = None,
+                        n_jobs: Optional[int] = None,
+                        executor: Optional[Executor] = None,
+                        chunk_size: Optional[int] = None,
+                        vectorized: bool = False,
+                        batch_size: Optional[int] = None,
+                        async_mode: bool = False,
+                        max_concurrency: Optional[int] = 10,
+                        cache: Optional[ResultCache] = None,
+                        errors: str = 'raise',
+                        compact: bool = False,
+                        isolate: bool = False,
+                        sampling: str = 'grid',
+                        num_samples: Optional[int] = None,
+                        seed: Optional[int] = None,
+                        constraint: Optional[Callable] = None,
+                        **func_kwargs) -> Iterator[pd.DataFrame]:
+    """
+    Runs the same sensitivity analysis as :func:`.sensitivity_df`, but yields the results in DataFrames of
+    at most chunk_rows rows as the analysis progresses, so that memory use is bounded by the chunk size
+    rather than the number of cases.
+
+    Concatenating the chunks gives the same rows as :func:`.sensitivity_df`, though each chunk infers
+    its own dtypes. Repeated values are only run once within each chunk rather than once for the whole analysis,
+    pass a cache to reuse their results across chunks.
+
+    :param sensitivity_values: Dictionary where keys are func's argument names and values are lists of possible
+        values to use for that argument.
+    :param func: Function that accepts arguments with names matching the keys of sensitivity_values, and outputs a
+        scalar value.
+    :param chunk_rows: Maximum number of rows in each yielded DataFrame
+    :param result_name: Name for result shown in graph color bar label
+    :param labels: Optional dictionary where keys are arguments of the function and values are the displayed names
+        for these arguments in the styled DataFrames and plots
+    :param n_jobs: Number of worker processes to run func in, see :func:`.sensitivity_df`
+    :param executor: Optional :class:`concurrent.futures.Executor` to run func on, see :func:`.sensitivity_df`
+    :param chunk_size: Number of cases to send to a worker at once, see :func:`.sensitivity_df`
+    :param vectorized: Whether func accepts and returns arrays, see :func:`.sensitivity_df`
+    :param batch_size: Maximum number of cases to pass to func at once when vectorized, default is chunk_rows
+    :param async_mode: Whether func returns awaitables, see :func:`.sensitivity_df`
+    :param max_concurrency: Maximum number of cases awaited at once in async mode
+    :param cache: Optional :class:`.ResultCache` to look up results from previous runs
+    :param errors: 'raise' to stop when func raises, or 'record' to continue, see :func:`.sensitivity_df`
+    :param compact: Set to True for Categorical parameter columns and a float64 result column, see
+        :func:`.sensitivity_df`. Every chunk has all the sensitivity values as categories
+    :param isolate: Set to True if func mutates its arguments, to pass it deep copies of them for each case, see
+        :func:`.sensitivity_df`
+    :param sampling: 'grid' to run the full cartesian product of the values, or how to draw num_samples cases,
+        see :func:`.sensitivity_df`
+    :param num_samples: Number of cases to run when sampling
+    :param seed: Seed for drawing the samples
+    :param constraint: Optional function which accepts arrays of values for each argument and returns an array
+        of bools, False for cases to skip, see :func:`.sensitivity_df`. Chunks have at most chunk_rows rows
+        after skipping cases
+    :param func_kwargs: Additional arguments to pass to func, regardless of the sensitivity values picked
+    :return: Generator of DataFrames containing the results from sensitivity analysis on func
+    """
+    sensitivity_cols = list(sensitivity_values.keys())
+    categories = _compact_categories(sensitivity_values) if compact else None
+    if vectorized and (batch_size is None or batch_size > chunk_rows):
+        batch_size = chunk_rows
+    param_arrays, row_cases = _sweep_param_arrays(
+        sensitivity_values, sampling=sampling, num_samples=num_samples, seed=seed, constraint=constraint,
+        batch_size=batch_size,
+    )
+    if vectorized:
+        for param_batches, num_cases, chunk_row_cases in _vectorized_chunks(sensitivity_values, param_arrays,
+                                                                             row_cases, chunk_rows, batch_size):
+            df = _vectorized_df(
+                func,
+                sensitivity_cols,
+                param_batches,
+                num_cases,
+                func_kwargs,
+                result_name=result_name,
+                labels=labels,
+                categories=categories,
+                errors=errors,
+            )
+            yield _broadcast_rows(df, chunk_row_cases) if chunk_row_cases is not None else df
+        return
+
+    own_executor: Optional[Executor] = None
+    if executor is None and n_jobs is not None and n_jobs != 1:
+        # Share one pool across the chunks rather than starting new processes for each
+        own_executor = executor = ProcessPoolExecutor(max_workers=_max_workers(n_jobs))
+    try:
+        for cases, chunk_row_cases in _case_chunks(sensitivity_values, param_arrays, row_cases, chunk_rows):
+            df = _cases_df(
+                func,
+                sensitivity_cols,
+                cases,
+                len(cases),
+                func_kwargs,
+                result_name=result_name,
+                labels=labels,
+                executor=executor,
+                chunk_size=chunk_size,
+                async_mode=async_mode,
+                max_concurrency=max_concurrency,
+                cache=cache,
+                errors=errors,
+                categories=categories,
+                isolate=isolate,
+            )
+            yield _broadcast_rows(df, chunk_row_cases) if chunk_row_cases is not None else df
+    finally:
+        if own_executor is not None:
+            own_executor.shutdown()
+
+
+def _param_array_chunks(param_arrays: List[np.ndarray], row_cases: Optional[np.ndarray],
+                        chunk_rows: int) -> Iterator[Tuple[List[np.ndarray], Optional[np.ndarray]]]:
+    """
+    Splits the cases to evaluate into chunks of at most chunk_rows output rows. Yields the values of the cases in
+    each chunk, and the position in them of the case for each row when rows share cases, otherwise None
+    """
+    num_cases = len(param_arrays[0]) if param_arrays else 0
+    num_rows = len(row_cases) if row_cases is not None else num_cases
+    for start in range(0, num_rows, chunk_rows):
+        stop = min(start + chunk_rows, num_rows)
+        if row_cases is None:
+            yield [arr[start:stop] for arr in param_arrays], None
+        else:
+            positions, chunk_row_cases = np.unique(row_cases[start:stop], return_inverse=True)
+            yield [arr[positions] for arr in param_arrays], chunk_row_cases
+
+
+def _vectorized_chunks(sensitivity_values: Dict[str, Any], param_arrays: Optional[List[np.ndarray]],
+                       row_cases: Optional[np.ndarray], chunk_rows: int, batch_size: Optional[int]
+                       ) -> Iterator[Tuple[Iterable[List[np.ndarray]], int, Optional[np.ndarray]]]:
+    """
+    Batches of parameter arrays to pass to a vectorized func for each chunk, with the number of cases in the
+    chunk and the position of the case for each row, see :func:`_param_array_chunks`
+    """
+    if param_arrays is None:
+        num_cases = reduce(operator.mul, [len(values) for values in sensitivity_values.values()], 1)
+        for start in range(0, num_cases, chunk_rows):
+            stop = min(start + chunk_rows, num_cases)
+            yield _grid_batches(sensitivity_values, batch_size, start=start, stop=stop), stop - start, None
+        return
+    for chunk_arrays, chunk_row_cases in _param_array_chunks(param_arrays, row_cases, chunk_rows):
+        num_cases = len(chunk_arrays[0]) if chunk_arrays else 0
+        yield _sample_batches(chunk_arrays, batch_size), num_cases, chunk_row_cases
+
+
+def _case_chunks(sensitivity_values: Dict[str, Any], param_arrays: Optional[List[np.ndarray]],
+                 row_cases: Optional[np.ndarray], chunk_rows: int) -> Iterator[Tuple[List[Case], Optional[np.ndarray]]]:
+    """
+    Cases to run for each chunk, with the position of the case for each row, see :func:`_param_array_chunks`
+    """
+    if param_arrays is None:
+        for cases in _chunked(itertools.product(*sensitivity_values.values()), chunk_rows):
+            yield cases, None
+        return
+    for chunk_arrays, chunk_row_cases in _param_array_chunks(param_arrays, row_cases, chunk_rows):
+        yield _sampled_cases(chunk_arrays), chunk_row_cases
+
+
+def sensitivity_to_file(path: Union[str, Path], sensitivity_values: Dict[str, Any], func: Callable,
+                        chunk_rows: int = 100_000, file_format: Optional[str] = None, partitioned: bool = False,
+                        **kwargs) -> int:
+    """
+    Runs the sensitivity analysis, writing each chunk of results to a Parquet or Arrow IPC file as
+    the analysis progresses rather than holding all the results in memory. Requires pyarrow.
+
+    Load the results with :func:`read_sensitivity_file` or :meth:`.SensitivityAnalyzer.from_file`.
+
+    :param path: File to write, or directory if partitioned
+    :param sensitivity_values: Dictionary where keys are func's argument names and values are lists of possible
+        values to use for that argument.
+    :param func: Function that accepts arguments with names matching the keys of sensitivity_values, and outputs a
+        scalar value.
+    :param chunk_rows: Maximum number of rows to hold in memory before writing them
+    :param file_format: 'parquet' or 'arrow'. Default is 'arrow' if the path ends with .arrow, .feather or .ipc,
+        otherwise 'parquet'
+    :param partitioned: Set to True to write each chunk to a separate file within the path directory, forming
+        a dataset which can be read back in parts
+    :param kwargs: result_name, labels, execution and sampling options and func_kwargs, see
+        :func:`iter_sensitivity_df`
+    :return: Number of rows written
+    """
+    pa = _import_pyarrow()
+    path = Path(path)
+    file_format = file_format or _file_format_from_path(path)
+    if file_format not in FILE_FORMAT_EXTENSIONS:
+        raise ValueError(f'file_format must be one of {list(FILE_FORMAT_EXTENSIONS)}, got {file_format}')
+    chunks = iter_sensitivity_df(sensitivity_values, func, chunk_rows=chunk_rows, **kwargs)
+
+    num_rows = 0
+    if partitioned:
+        path.mkdir(parents=True, exist_ok=True)
+        extension = FILE_FORMAT_EXTENSIONS[file_format]
+        for i, chunk in enumerate(chunks):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            with _table_writer(path / f'part-{i:05d}{extension}', table.schema, file_format) as writer:
+                writer.write_table(table)
+            num_rows += len(chunk)
+        return num_rows
+
+    writer = None
+    schema = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                schema = table.schema
+                writer = _table_writer(path, schema, file_format)
+            else:
+                # Chunks infer their own types, make them consistent with the first one
+                table = table.cast(schema)
+            writer.write_table(table)
+            num_rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return num_rows
+
+
+def read_sensitivity_file(path: Union[str, Path], file_format: Optional[str] = None) -> pd.DataFrame:
+    """
+    Loads sensitivity analysis results written by :func:`sensitivity_to_file`. Requires pyarrow.
+
+    :param path: File, or directory for partitioned results
+    :param file_format: 'parquet' or 'arrow'. Default is detected from the path
+    :return: DataFrame containing the results of the sensitivity analysis
+    """
+    pa = _import_pyarrow()
+    path = Path(path)
+    if path.is_dir():
+        paths = sorted(p for p in path.iterdir() if p.is_file())
+        if not paths:
+            raise ValueError(f'no result files found in {path}')
+    else:
+        paths = [path]
+    file_format = file_format or _file_format_from_path(paths[0])
+
+    if file_format == 'parquet':
+        import pyarrow.parquet as pq
+        tables = [pq.read_table(p) for p in paths]
+    else:
+        tables = [pa.ipc.open_file(p).read_all() for p in paths]
+    if len(tables) == 1:
+        return tables[0].to_pandas()
+    # Partitions may have inferred different types, let pandas reconcile them
+    return pd.concat([table.to_pandas() for table in tables], ignore_index=True)
+
+
+def _table_writer(path: Path, schema, file_format: str):
+    pa = _import_pyarrow()
+    if file_format == 'parquet':
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(path, schema)
+    return pa.ipc.new_file(path, schema)
+
+
+def _file_format_from_path(path: Path) -> str:
+    if path.suffix.lower() in _ARROW_SUFFIXES:
+        return 'arrow'
+    return 'parquet'
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError('pyarrow is required to write and read sensitivity result files, '
+                          'install it with pip install pyarrow') from e
+    return pyarrow
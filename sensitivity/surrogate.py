@@ -0,0 +1,287 @@
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, Tuple, Callable
+
+import numpy as np
+import pandas as pd
+
+from sensitivity.accumulate import ColumnAccumulator
+from sensitivity.cache import ResultCache
+from sensitivity.df import _param_arrays_df, _finalize_df, _compact_categories
+from sensitivity.execution import _values_array, _grid_batches
+from sensitivity.sampling import _unit_samples, _has_ranges
+
+PREDICTED_COL = 'Predicted'
+ERROR_COL = 'Prediction Error'
+# Number of grid cells to predict at once, to bound the memory of the distance matrix
+_PREDICT_BATCH_SIZE = 10_000
+
+
+@dataclass
+class SurrogateValidation:
+    """
+    Accuracy of the surrogate model on evaluated cases which were held out of fitting it
+
+    :param num_evaluated: Number of cases where func was run
+    :param num_holdout: Number of evaluated cases held out to validate the model
+    :param rmse: Root mean squared error of the predictions for the held out cases
+    :param max_error: Largest absolute error of the predictions for the held out cases
+    """
+    num_evaluated: int
+    num_holdout: int
+    rmse: float
+    max_error: float
+
+
+class _ThinPlateSpline:
+    """
+    Radial basis function interpolator with the thin plate spline kernel and a linear polynomial term,
+    which passes exactly through the fitted results
+    """
+
+    def __init__(self, points: np.ndarray, values: np.ndarray):
+        num_points = len(points)
+        polynomial = _polynomial_terms(points)
+        num_terms = polynomial.shape[1]
+        system = np.zeros((num_points + num_terms, num_points + num_terms))
+        system[:num_points, :num_points] = _kernel(_squared_distances(points, points))
+        system[:num_points, num_points:] = polynomial
+        system[num_points:, :num_points] = polynomial.T
+        rhs = np.concatenate([values, np.zeros(num_terms)])
+        try:
+            coefficients = np.linalg.solve(system, rhs)
+        except np.linalg.LinAlgError:
+            # Points which don't determine the linear term, e.g. all on a line
+            coefficients = np.linalg.lstsq(system, rhs, rcond=None)[0]
+        self.points = points
+        self.weights = coefficients[:num_points]
+        self.polynomial_coefficients = coefficients[num_points:]
+
+    def predict(self, points: np.ndarray) -> np.ndarray:
+        predictions = np.empty(len(points))
+        for start in range(0, len(points), _PREDICT_BATCH_SIZE):
+            batch = points[start:start + _PREDICT_BATCH_SIZE]
+            predictions[start:start + len(batch)] = (
+                _kernel(_squared_distances(batch, self.points)) @ self.weights
+                + _polynomial_terms(batch) @ self.polynomial_coefficients
+            )
+        return predictions
+
+
+def surrogate_df(sensitivity_values: Dict[str, Any], func: Callable, num_evaluations: int,
+                 holdout_fraction: float = 0.2,
+                 seed: Optional[int] = None,
+                 result_name: str = 'Result',
+                 labels: Optional[Dict[str, str]] = None,
+                 n_jobs: Optional[int] = None,
+                 executor: Optional[Executor] = None,
+                 chunk_size: Optional[int] = None,
+                 vectorized: bool = False,
+                 batch_size: Optional[int] = None,
+                 async_mode: bool = False,
+                 max_concurrency: Optional[int] = 10,
+                 cache: Optional[ResultCache] = None,
+                 errors: str = 'raise',
+                 compact: bool = False,
+                 **func_kwargs) -> pd.DataFrame:
+    """
+    Creates a DataFrame covering the cartesian product of the sensitivity values, like :func:`.sensitivity_df`,
+    while only running func for num_evaluations of the cases, for when func is too slow to run the full grid.
+
+    func is run on a space-filling subset of the grid, including its corners when there are enough evaluations.
+    A thin plate spline radial basis function surrogate, which passes through every evaluated result, is fit to
+    those results to predict the rest of the grid. Before that, the surrogate is fit without a random
+    holdout_fraction of the evaluated cases, and its errors in predicting them estimate the errors of the
+    predictions. The values of every argument must be numbers.
+
+    :param sensitivity_values: Dictionary where keys are func's argument names and values are lists of possible
+        values to use for that argument.
+    :param func: Function that accepts arguments with names matching the keys of sensitivity_values, and outputs a
+        scalar number.
+    :param num_evaluations: Number of cases to run func for
+    :param holdout_fraction: Fraction of the evaluated cases to leave out of fitting to validate the surrogate
+    :param seed: Seed for picking the evaluated and held out cases
+    :param result_name: Name for result shown in graph color bar label
+    :param labels: Optional dictionary where keys are arguments of the function and values are the displayed names
+        for these arguments in the output
+    :param n_jobs: Number of worker processes to run func in, see :func:`.sensitivity_df`
+    :param executor: Optional :class:`concurrent.futures.Executor` to run func on, see :func:`.sensitivity_df`
+    :param chunk_size: Number of cases to send to a worker at once, see :func:`.sensitivity_df`
+    :param vectorized: Whether func accepts and returns arrays, see :func:`.sensitivity_df`
+    :param batch_size: Maximum number of cases to pass to func at once when vectorized
+    :param async_mode: Whether func returns awaitables, see :func:`.sensitivity_df`
+    :param max_concurrency: Maximum number of cases awaited at once in async mode
+    :param cache: Optional :class:`.ResultCache` to look up results from previous runs
+    :param errors: 'raise' to stop when func raises, or 'record' to predict the result for that case instead,
+        see :func:`.sensitivity_df`
+    :param compact: Set to True to store the parameter columns as Categorical columns, see :func:`.sensitivity_df`
+    :param func_kwargs: Additional arguments to pass to func, regardless of the sensitivity values picked
+    :return: DataFrame with a row for every case, with a Predicted column which is True for the results from the
+        surrogate, and a Prediction Error column with the root mean squared error of the surrogate on the held out
+        cases for predicted results and 0 for evaluated results. The :class:`.SurrogateValidation` is in
+        ``df.attrs['surrogate']``
+    """
+    if _has_ranges(sensitivity_values):
+        raise ValueError('surrogate predicts the grid of values, pass lists of values rather than ValueRange')
+    if num_evaluations < 1:
+        raise ValueError(f'must pass a positive number of evaluations, got {num_evaluations}')
+    if not 0 <= holdout_fraction < 1:
+        raise ValueError(f'holdout_fraction must be at least 0 and less than 1, got {holdout_fraction}')
+    sensitivity_cols = list(sensitivity_values.keys())
+    shape = tuple(len(_values_array(values)) for values in sensitivity_values.values())
+    num_cases = int(np.prod(shape, dtype=np.int64))
+
+    positions = _surrogate_positions(shape, num_evaluations, seed=seed)
+    all_points = _unit_grid_points(sensitivity_values, np.arange(num_cases))
+    param_arrays = next(_grid_batches(sensitivity_values))
+    execution_kwargs: Dict[str, Any] = dict(errors=errors) if vectorized else dict(
+        n_jobs=n_jobs,
+        executor=executor,
+        chunk_size=chunk_size,
+        async_mode=async_mode,
+        max_concurrency=max_concurrency,
+        cache=cache,
+        errors=errors,
+    )
+    evaluated_df = _param_arrays_df(
+        func, sensitivity_cols, [arr[positions] for arr in param_arrays], func_kwargs, vectorized=vectorized,
+        batch_size=batch_size, **execution_kwargs
+    )
+    if 'Result' not in evaluated_df:
+        raise ValueError('func must return a single number for each case to fit a surrogate')
+    try:
+        evaluated_results = evaluated_df['Result'].to_numpy(dtype=float, na_value=np.nan)
+    except (TypeError, ValueError) as e:
+        raise ValueError('func must return numbers to fit a surrogate') from e
+    # Cases where func failed are predicted along with the rest
+    succeeded = ~np.isnan(evaluated_results)
+    positions = positions[succeeded]
+    evaluated_results = evaluated_results[succeeded]
+    if len(positions) == 0:
+        raise ValueError('func did not return a result for any evaluated case, cannot fit a surrogate')
+
+    predicted = np.ones(num_cases, dtype=bool)
+    predicted[positions] = False
+    results = np.empty(num_cases)
+    results[positions] = evaluated_results
+    predictions, validation = _fit_and_predict(
+        all_points[positions], evaluated_results, all_points[predicted], holdout_fraction=holdout_fraction, seed=seed
+    )
+    results[predicted] = predictions
+    prediction_errors = np.where(predicted, validation.rmse, 0.0)
+
+    accumulator = ColumnAccumulator(sensitivity_cols + [result_name], num_cases)
+    accumulator.add_columns(param_arrays + [results])
+    categories = _compact_categories(sensitivity_values) if compact else None
+    df = _finalize_df(accumulator, labels, categories=categories)
+    # Added after building so that the flags stay bool rather than being converted
+    df[PREDICTED_COL] = predicted
+    df[ERROR_COL] = prediction_errors
+    df.attrs['surrogate'] = validation
+    if 'errors' in evaluated_df.attrs:
+        df.attrs['errors'] = evaluated_df.attrs['errors']
+    return df
+
+
+def _surrogate_positions(shape: Tuple[int, ...], num_samples: int, seed: Optional[int] = None) -> np.ndarray:
+    """
+    Flat positions in the grid of a space-filling subset of num_samples cases, including the corners of the grid
+    when there are enough samples so that the surrogate interpolates rather than extrapolates
+    """
+    num_cases = int(np.prod(shape, dtype=np.int64))
+    if num_samples >= num_cases:
+        return np.arange(num_cases)
+
+    chosen: List[np.ndarray] = []
+    num_dims = len(shape)
+    if 2 ** num_dims <= num_samples // 2:
+        corners = np.array(np.meshgrid(*[[0, length - 1] for length in shape], indexing='ij')).reshape(num_dims, -1)
+        chosen.append(np.ravel_multi_index(tuple(corners), shape))
+    unit = _unit_samples('lhs', num_samples, num_dims, seed=seed)
+    grid_positions = tuple(
+        np.minimum((unit[:, i] * length).astype(np.intp), length - 1) for i, length in enumerate(shape)
+    )
+    chosen.append(np.ravel_multi_index(grid_positions, shape))
+    # Keep the corners, then the space-filling cells
+    positions = pd.unique(np.concatenate(chosen))[:num_samples]
+
+    # Cells picked more than once, fill up with random other cells
+    rng = np.random.default_rng(seed)
+    while len(positions) < num_samples:
+        extra = rng.integers(0, num_cases, size=num_samples - len(positions))
+        positions = pd.unique(np.concatenate([positions, extra]))[:num_samples]
+    return np.sort(positions)
+
+
+def _fit_and_predict(points: np.ndarray, results: np.ndarray, predict_points: np.ndarray,
+                     holdout_fraction: float = 0.2,
+                     seed: Optional[int] = None) -> Tuple[np.ndarray, SurrogateValidation]:
+    """
+    Validates the surrogate by fitting it without a random holdout_fraction of the evaluated cases and predicting
+    them, then predicts the results at predict_points from a surrogate fit on all the evaluated cases
+    """
+    num_evaluated = len(points)
+    num_holdout = int(round(num_evaluated * holdout_fraction))
+    # Need enough points left to fit the linear term
+    if num_evaluated - num_holdout < points.shape[1] + 1:
+        num_holdout = 0
+    if num_holdout > 0:
+        rng = np.random.default_rng(seed)
+        holdout = rng.choice(num_evaluated, size=num_holdout, replace=False)
+        fit = np.setdiff1d(np.arange(num_evaluated), holdout)
+        errors = _ThinPlateSpline(points[fit], results[fit]).predict(points[holdout]) - results[holdout]
+        validation = SurrogateValidation(
+            num_evaluated=num_evaluated,
+            num_holdout=num_holdout,
+            rmse=float(np.sqrt(np.mean(errors ** 2))),
+            max_error=float(np.max(np.abs(errors))),
+        )
+    else:
+        validation = SurrogateValidation(
+            num_evaluated=num_evaluated, num_holdout=0, rmse=float('nan'), max_error=float('nan')
+        )
+    predictions = _ThinPlateSpline(points, results).predict(predict_points)
+    return predictions, validation
+
+
+def _unit_grid_points(sensitivity_values: Dict[str, Any], positions: np.ndarray) -> np.ndarray:
+    """
+    Coordinates of the cases at flat positions in the grid, with each argument's values scaled to [0, 1]
+    so that every argument counts equally in distances
+    """
+    value_arrays = [_values_array(values) for values in sensitivity_values.values()]
+    shape = tuple(len(values) for values in value_arrays)
+    grid_positions = np.unravel_index(positions, shape)
+    columns = []
+    for col, values, position in zip(sensitivity_values, value_arrays, grid_positions):
+        if values.dtype.kind not in 'iuf':
+            raise ValueError(f'surrogate needs numeric values, got {values.dtype} values for {col}')
+        values = values.astype(float)
+        span = values.max() - values.min()
+        scaled = (values - values.min()) / span if span > 0 else np.zeros(len(values))
+        columns.append(scaled[position])
+    return np.column_stack(columns) if columns else np.empty((len(positions), 0))
+
+
+def _squared_distances(points: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    squared = -2 * points @ centers.T
+    squared += np.sum(points ** 2, axis=1)[:, np.newaxis]
+    squared += np.sum(centers ** 2, axis=1)[np.newaxis, :]
+    return np.maximum(squared, 0, out=squared)
+
+
+def _kernel(squared_distances: np.ndarray) -> np.ndarray:
+    """
+    Thin plate spline r^2 log(r), computed from r^2 to skip the square roots
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        kernel = np.log(squared_distances)
+        kernel *= squared_distances
+    kernel *= 0.5
+    # Limit at zero distance
+    kernel[squared_distances == 0] = 0
+    return kernel
+
+
+def _polynomial_terms(points: np.ndarray) -> np.ndarray:
+    return np.column_stack([np.ones(len(points)), points])
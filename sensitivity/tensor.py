@@ -0,0 +1,134 @@
+import functools
+import warnings
+from typing import Dict, Any, Callable, Sequence, Optional, Tuple, List
+
+import numpy as np
+import pandas as pd
+
+from sensitivity.agg import _recognized_reducer, DTYPE_PRESERVING_REDUCERS
+
+# NumPy reducers which skip missing results, so that reducing over axes gives the same result as
+# aggregating the long DataFrame
+_NAN_REDUCERS: Dict[str, Callable] = {
+    'mean': np.nanmean,
+    'median': np.nanmedian,
+    'min': np.nanmin,
+    'max': np.nanmax,
+    'sum': np.nansum,
+    'std': np.nanstd,
+    'var': np.nanvar,
+    'quantile': np.nanquantile,
+}
+
+
+def _result_tensor(df: pd.DataFrame, sensitivity_cols: Sequence[str], axis_values: Sequence[Sequence[Any]],
+                   result_col: str) -> Optional[np.ndarray]:
+    """
+    Arranges the results in df in a dense array with one axis for each sensitivity column, with positions
+    along each axis in the order of axis_values. Cases which are not in df are NaN.
+
+    :return: The array, or None if the results are not numeric, a sensitivity column has repeated values,
+        or df has parameter values or cases which are not in axis_values
+    """
+    try:
+        results = df[result_col].to_numpy(dtype=float, na_value=np.nan)
+    except (TypeError, ValueError):
+        return None
+
+    shape = tuple(len(values) for values in axis_values)
+    positions: List[np.ndarray] = []
+    for col, values in zip(sensitivity_cols, axis_values):
+        index = pd.Index(values)
+        if not index.is_unique:
+            return None
+        column = df[col]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            # Look up each category once rather than every row
+            codes = column.cat.codes.to_numpy()
+            if (codes == -1).any():
+                return None
+            col_positions = index.get_indexer(column.cat.categories)[codes]
+        else:
+            col_positions = index.get_indexer(column)
+        if (col_positions == -1).any():
+            return None
+        positions.append(col_positions)
+    flat_positions = np.ravel_multi_index(positions, shape)
+
+    size = int(np.prod(shape, dtype=np.int64))
+    if len(flat_positions) == size and (flat_positions == np.arange(size)).all():
+        # Rows are already the cartesian product in order, as they are after running the analysis
+        return results.reshape(shape)
+    if len(np.unique(flat_positions)) != len(flat_positions):
+        # Multiple results for the same case
+        return None
+    tensor = np.full(shape, np.nan)
+    tensor.flat[flat_positions] = results
+    return tensor
+
+
+def _tensor_reducer(agg_func: Any) -> Optional[Tuple[Callable, bool]]:
+    """
+    Gets the NumPy reducer, taking an array and axis, which gives the same result as agg_func
+    while skipping missing results, and whether its result has the same type as the values
+
+    :return: The reducer and whether it keeps the type, or None if agg_func is not a recognized reducer
+    """
+    reducer = _recognized_reducer(agg_func)
+    if reducer is None:
+        return None
+    name, kwargs = reducer
+    return functools.partial(_NAN_REDUCERS[name], **kwargs), name in DTYPE_PRESERVING_REDUCERS
+
+
+def _reduce_tensor(tensor: np.ndarray, keep_axes: Sequence[int], reducer: Callable) -> np.ndarray:
+    """
+    Reduces tensor over every axis other than keep_axes, giving an array with the kept axes in order
+    """
+    kept = np.moveaxis(tensor, list(keep_axes), list(range(len(keep_axes))))
+    if len(keep_axes) == tensor.ndim:
+        return kept
+    # Reduce over a single flattened axis as not every NumPy reducer accepts multiple axes
+    flat = kept.reshape(kept.shape[:len(keep_axes)] + (-1,))
+    with warnings.catch_warnings():
+        # Cases where every result is missing are NaN, as they are when aggregating the DataFrame
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        return reducer(flat, axis=-1)
+
+
+def _tensor_pairwise_df(tensor: np.ndarray, axis_values: Sequence[Sequence[Any]], axis1: int, axis2: int,
+                        col1: str, reducer: Callable, dtype: Any = None) -> pd.DataFrame:
+    """
+    Creates the same table as :func:`sensitivity.df._two_variable_sensitivity_display_df` by reducing
+    over the axes other than axis1 and axis2
+
+    :param dtype: Type to convert the table to if it has no missing values, to keep integer results as integers
+    """
+    table = _reduce_tensor(tensor, (axis1, axis2), reducer)
+    # Order the rows and columns by value, as grouping does
+    index, index_order = pd.Index(axis_values[axis1], name=col1).sort_values(return_indexer=True)
+    columns, columns_order = pd.Index(axis_values[axis2]).sort_values(return_indexer=True)
+    wide_df = pd.DataFrame(table[np.ix_(index_order, columns_order)], index=index, columns=columns)
+    if dtype is not None and not np.isnan(table).any():
+        wide_df = wide_df.astype(dtype)
+    return wide_df
+
+
+def _tensor_sel(tensor: np.ndarray, axis_positions: Sequence[Dict[Any, int]], params: Sequence[str],
+                selected: Dict[str, Any]):
+    """
+    Indexes tensor at the selected values of params, keeping the full axes of params which are not selected
+    """
+    unknown = set(selected) - set(params)
+    if unknown:
+        raise ValueError(f'{sorted(unknown)} are not in sensitivity_values')
+    key: List[Any] = []
+    for param, positions in zip(params, axis_positions):
+        if param not in selected:
+            key.append(slice(None))
+            continue
+        value = selected[param]
+        if value not in positions:
+            raise KeyError(f'{value} is not one of the sensitivity values of {param}')
+        key.append(positions[value])
+    return tensor[tuple(key)]
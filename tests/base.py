@@ -1,3 +1,4 @@
+import asyncio
 import os
 from copy import deepcopy
 from io import BytesIO
@@ -65,6 +66,18 @@ def add_10_to_values(value1, value2, value3=5):
     return value1 + value2 + value3 + 10
 
 
+async def async_add_5_to_values(value1, value2):
+    # Later cases finish first, to check that results are still put in order
+    await asyncio.sleep(0.01 / (value1 * value2))
+    return add_5_to_values(value1, value2)
+
+
+def fail_on_value2_5(value1, value2):
+    if value2 == 5:
+        raise ValueError('bad value2')
+    return add_5_to_values(value1, value2)
+
+
 def assert_styled_matches(styler: Styler, file_path: str = DF_STYLED_PATH, generate: bool = False):
     compare_html = styler.set_uuid(DF_STYLE_UUID).to_html()
 
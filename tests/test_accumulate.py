@@ -0,0 +1,24 @@
+import numpy as np
+
+from sensitivity.accumulate import ColumnAccumulator
+
+
+def test_add_row_stores_objects():
+    accumulator = ColumnAccumulator(['value', 'Result'], 3)
+    accumulator.add_row((1, 1.5))
+    accumulator.add_row(('a', [1, 2]))
+    accumulator.add_row((True, None))
+
+    assert accumulator.column_values('value').dtype == object
+    assert accumulator.column_values('value').tolist() == [1, 'a', True]
+    assert accumulator.column_values('Result').tolist() == [1.5, [1, 2], None]
+
+
+def test_add_row_after_add_columns_widens_dtype():
+    accumulator = ColumnAccumulator(['value', 'Result'], 3)
+    accumulator.add_columns([np.array([1, 2]), np.array([1.5, 2.5])])
+    accumulator.add_row(('a', 3.5))
+
+    assert accumulator.column_values('value').tolist() == [1, 2, 'a']
+    assert accumulator.column_values('Result').tolist() == [1.5, 2.5, 3.5]
+    assert accumulator.to_df()['Result'].tolist() == [1.5, 2.5, 3.5]
@@ -0,0 +1,116 @@
+import warnings
+from copy import deepcopy
+from functools import partial
+
+from pandas.testing import assert_frame_equal
+
+from sensitivity import SensitivityAnalyzer, ResultCache
+from sensitivity.cache import _func_fingerprint, _func_name
+from tests.base import EXPECT_DF_TWO_VALUE, SENSITIVITY_VALUES_TWO_VALUE, add_5_to_values, RESULT_NAME
+
+CALLS = []
+
+
+def counted_add_5_to_values(value1, value2):
+    CALLS.append((value1, value2))
+    return add_5_to_values(value1, value2)
+
+
+def create_sa(cache: ResultCache, **kwargs) -> SensitivityAnalyzer:
+    sa_config = dict(
+        sensitivity_values=SENSITIVITY_VALUES_TWO_VALUE,
+        func=counted_add_5_to_values,
+        result_name=RESULT_NAME,
+        cache=cache,
+    )
+    sa_config.update(**kwargs)
+    return SensitivityAnalyzer(**sa_config)
+
+
+def test_cache_reuses_results(tmp_path):
+    CALLS.clear()
+    cache_path = tmp_path / 'cache.sqlite'
+    create_sa(ResultCache(cache_path))
+    sa = create_sa(ResultCache(cache_path))
+
+    assert_frame_equal(sa.df, EXPECT_DF_TWO_VALUE, check_dtype=False)
+    assert len(CALLS) == 4
+    assert sa.cache_hits == 4
+    assert sa.cache_misses == 0
+
+
+def test_cache_only_evaluates_new_values():
+    CALLS.clear()
+    cache = ResultCache()
+    create_sa(cache)
+    sensitivity_values = deepcopy(SENSITIVITY_VALUES_TWO_VALUE)
+    sensitivity_values['value2'].append(6)
+    sa = create_sa(cache, sensitivity_values=sensitivity_values)
+
+    assert CALLS[4:] == [(1, 6), (2, 6)]
+    assert sa.cache_hits == 4
+    assert sa.cache_misses == 6
+    assert sa.df[RESULT_NAME].tolist() == [10, 11, 12, 11, 12, 13]
+
+
+def test_cache_func_kwargs_in_key():
+    cache = ResultCache()
+    sa = create_sa(cache, func=add_5_to_values, sensitivity_values={'value1': [1, 2]}, func_kwargs_dict={'value2': 4})
+    sa2 = create_sa(cache, func=add_5_to_values, sensitivity_values={'value1': [1, 2]}, func_kwargs_dict={'value2': 5})
+
+    assert sa.df[RESULT_NAME].tolist() == [10, 11]
+    assert sa2.df[RESULT_NAME].tolist() == [11, 12]
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ResultCache(max_entries=3)
+    create_sa(cache)
+
+    assert len(cache) == 3
+
+
+def test_cache_invalidate():
+    CALLS.clear()
+    cache = ResultCache()
+    create_sa(cache)
+    cache.invalidate(add_5_to_values)
+    assert len(cache) == 4
+    cache.invalidate(counted_add_5_to_values)
+    assert len(cache) == 0
+    create_sa(cache)
+    assert len(CALLS) == 8
+
+
+class AddToValues:
+    def __init__(self, amount):
+        self.amount = amount
+
+    def __call__(self, value1, value2):
+        return value1 + value2 + self.amount
+
+
+def add_to_values(value1, value2, amount):
+    return value1 + value2 + amount
+
+
+def make_adder(amount):
+    def add(value1, value2):
+        return value1 + value2 + amount
+    return add
+
+
+def test_cache_fingerprints_partials_instances_and_closures():
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        for make_func in (lambda amount: partial(add_to_values, amount=amount), AddToValues, make_adder):
+            # Stable for equal funcs, which are different objects, and changes with the values they use
+            assert _func_fingerprint(make_func(5)) == _func_fingerprint(make_func(5))
+            assert _func_fingerprint(make_func(5)) != _func_fingerprint(make_func(6))
+
+    assert _func_name(partial(add_to_values, amount=5)) == _func_name(add_to_values)
+    cache = ResultCache()
+    create_sa(cache, func=partial(add_to_values, amount=5))
+    create_sa(cache, func=partial(add_to_values, amount=6))
+    assert len(cache) == 8
+    cache.invalidate(partial(add_to_values, amount=5))
+    assert len(cache) == 0
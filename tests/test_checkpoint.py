@@ -0,0 +1,123 @@
+import pytest
+from pandas.testing import assert_frame_equal
+
+from sensitivity import SensitivityAnalyzer
+from sensitivity.df import sensitivity_df
+from tests.base import EXPECT_DF_THREE_VALUE, SENSITIVITY_VALUES_THREE_VALUE, add_10_to_values, RESULT_NAME, \
+    SENSITIVITY_VALUES_TWO_VALUE, fail_on_value2_5
+
+
+class Preempted(Exception):
+    pass
+
+
+def test_record_errors():
+    sa = SensitivityAnalyzer(
+        SENSITIVITY_VALUES_TWO_VALUE,
+        fail_on_value2_5,
+        result_name=RESULT_NAME,
+        errors='record',
+    )
+
+    assert sa.df[RESULT_NAME].isna().tolist() == [False, True, False, True]
+    assert [error.param_dict for error in sa.failed_cases] == [
+        {'value1': 1, 'value2': 5},
+        {'value1': 2, 'value2': 5},
+    ]
+    assert 'bad value2' in sa.failed_cases[0].message
+
+
+def test_resume_from_checkpoint(tmp_path):
+    checkpoint_path = tmp_path / 'checkpoint.pkl'
+    calls = []
+    preempt_after = [5]
+
+    def preemptible_add_10_to_values(**kwargs):
+        if len(calls) == preempt_after[0]:
+            raise Preempted
+        calls.append(kwargs)
+        return add_10_to_values(**kwargs)
+
+    with pytest.raises(Preempted):
+        sensitivity_df(
+            SENSITIVITY_VALUES_THREE_VALUE,
+            preemptible_add_10_to_values,
+            result_name=RESULT_NAME,
+            checkpoint_path=checkpoint_path,
+            checkpoint_every=2,
+        )
+    calls.clear()
+    preempt_after[0] = None
+
+    df = sensitivity_df(
+        SENSITIVITY_VALUES_THREE_VALUE,
+        preemptible_add_10_to_values,
+        result_name=RESULT_NAME,
+        checkpoint_path=checkpoint_path,
+        checkpoint_every=2,
+        resume=True,
+    )
+
+    assert len(calls) == 3
+    assert_frame_equal(df, EXPECT_DF_THREE_VALUE, check_dtype=False)
+
+
+def test_resume_different_analysis_raises(tmp_path):
+    checkpoint_path = tmp_path / 'checkpoint.pkl'
+    sensitivity_df(SENSITIVITY_VALUES_THREE_VALUE, add_10_to_values, checkpoint_path=checkpoint_path)
+
+    with pytest.raises(ValueError):
+        sensitivity_df(
+            {**SENSITIVITY_VALUES_THREE_VALUE, 'value3': [6, 7, 8]},
+            add_10_to_values,
+            checkpoint_path=checkpoint_path,
+            resume=True,
+        )
+
+
+def test_resume_different_values_same_length_raises(tmp_path):
+    checkpoint_path = tmp_path / 'checkpoint.pkl'
+    sensitivity_df(SENSITIVITY_VALUES_THREE_VALUE, add_10_to_values, checkpoint_path=checkpoint_path)
+
+    with pytest.raises(ValueError):
+        sensitivity_df(
+            {**SENSITIVITY_VALUES_THREE_VALUE, 'value3': [60, 70]},
+            add_10_to_values,
+            checkpoint_path=checkpoint_path,
+            resume=True,
+        )
+
+
+def test_resume_different_func_kwargs_raises(tmp_path):
+    checkpoint_path = tmp_path / 'checkpoint.pkl'
+    sensitivity_df(SENSITIVITY_VALUES_TWO_VALUE, add_10_to_values, checkpoint_path=checkpoint_path, value3=1)
+
+    with pytest.raises(ValueError):
+        sensitivity_df(
+            SENSITIVITY_VALUES_TWO_VALUE, add_10_to_values, checkpoint_path=checkpoint_path, resume=True, value3=2
+        )
+
+
+@pytest.mark.parametrize('resume', [False, True])
+def test_extend_with_checkpoint(tmp_path, resume):
+    checkpoint_path = tmp_path / 'checkpoint.pkl'
+    sa = SensitivityAnalyzer(
+        SENSITIVITY_VALUES_TWO_VALUE,
+        add_10_to_values,
+        result_name=RESULT_NAME,
+        checkpoint_path=checkpoint_path,
+        resume=resume,
+    )
+    sa.extend('value2', [6, 7])
+    sa.extend('value1', [3])
+
+    expect = sensitivity_df(
+        {'value1': [1, 2, 3], 'value2': [4, 5, 6, 7]}, add_10_to_values, result_name=RESULT_NAME
+    )
+    assert_frame_equal(sa.df, expect)
+    # The checkpoint of the full run is still there to resume from
+    resumed = sensitivity_df(
+        SENSITIVITY_VALUES_TWO_VALUE, add_10_to_values, result_name=RESULT_NAME, checkpoint_path=checkpoint_path,
+        resume=True,
+    )
+    assert_frame_equal(resumed, expect.iloc[[0, 1, 4, 5]].reset_index(drop=True), check_dtype=False)
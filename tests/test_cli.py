@@ -0,0 +1,110 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pandas as pd
+import pytest
+import yaml
+from pandas.testing import assert_frame_equal
+
+from sensitivity.cli import main, run_config
+from tests.base import EXPECT_DF_TWO_VALUE, SENSITIVITY_VALUES_TWO_VALUE, RESULT_NAME
+
+ROOT = Path(__file__).parent.parent
+
+
+def test_cli_run(tmp_path, capsys, monkeypatch):
+    monkeypatch.delenv('MPLBACKEND', raising=False)
+    config_path = tmp_path / 'config.yaml'
+    config_path.write_text(yaml.safe_dump({
+        'func': 'tests.base:add_5_to_values',
+        'sensitivity_values': SENSITIVITY_VALUES_TWO_VALUE,
+        'result_name': RESULT_NAME,
+        'backend': 'threads',
+        'chunk_size': 2,
+        'output_dir': str(tmp_path / 'out'),
+    }))
+
+    assert main(['run', str(config_path)]) == 0
+
+    assert 'cases/sec' in capsys.readouterr().out
+    assert_frame_equal(pd.read_csv(tmp_path / 'out' / 'results.csv'), EXPECT_DF_TWO_VALUE, check_dtype=False)
+    assert (tmp_path / 'out' / f'{RESULT_NAME} by value1 vs value2.html').exists()
+    assert (tmp_path / 'out' / f'{RESULT_NAME}.png').exists()
+    assert 'MPLBACKEND' not in os.environ
+
+
+def test_run_config_options(tmp_path):
+    summary = run_config({
+        'func': 'tests.base.add_5_to_values',
+        'sensitivity_values': {'value1': [1, 2], 'value2': {'low': 4, 'high': 5}},
+        'sampling': 'halton',
+        'num_samples': 10,
+        'agg_func': 'median',
+        'results_format': 'parquet',
+        'plots': False,
+        'time_cases': True,
+        'profile': True,
+        'output_dir': str(tmp_path),
+    })
+
+    assert summary.num_cases == 10
+    assert summary.cases_per_second > 0
+    assert [path.name for path in summary.files] == [
+        'results.parquet', 'Result by value1 vs value2.html', 'slowest_regions.csv'
+    ]
+    assert 'evaluate' in summary.profile.stage_seconds
+
+    with pytest.raises(ValueError):
+        run_config({'func': 'tests.base.add_5_to_values', 'sensitivity_values': {}, 'not_an_option': 1})
+
+
+def test_python_m_sensitivity(tmp_path):
+    config_path = tmp_path / 'config.json'
+    config_path.write_text(json.dumps({
+        'func': 'tests.base:add_5_to_values',
+        'sensitivity_values': SENSITIVITY_VALUES_TWO_VALUE,
+        'backend': 'vectorized',
+    }))
+
+    completed = subprocess.run(
+        [sys.executable, '-m', 'sensitivity', 'run', str(config_path), '--output-dir', str(tmp_path / 'out')],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+
+    assert completed.returncode == 0, completed.stderr
+    assert 'Ran 4 cases' in completed.stdout
+    assert (tmp_path / 'out' / 'results.csv').exists()
+
+
+def test_cli_results_only_without_matplotlib(tmp_path):
+    # tests.base imports matplotlib, use a model next to the config
+    (tmp_path / 'model.py').write_text('def add_5_to_values(value1, value2):\n    return value1 + value2 + 5\n')
+    config_path = tmp_path / 'config.json'
+    config_path.write_text(json.dumps({
+        'func': 'model:add_5_to_values',
+        'sensitivity_values': SENSITIVITY_VALUES_TWO_VALUE,
+        'tables': False,
+        'plots': False,
+        'output_dir': str(tmp_path / 'out'),
+    }))
+    code = textwrap.dedent(f'''
+        import sys
+
+        class BlockMatplotlib:
+            def find_spec(self, name, path=None, target=None):
+                if name.split('.')[0] == 'matplotlib':
+                    raise ImportError(f'{{name}} is not installed')
+
+        sys.meta_path.insert(0, BlockMatplotlib())
+        from sensitivity.cli import main
+        sys.exit(main(['run', {str(config_path)!r}]))
+    ''')
+
+    completed = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True)
+
+    assert completed.returncode == 0, completed.stderr
+    assert (tmp_path / 'out' / 'results.csv').exists()
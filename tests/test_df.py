@@ -1,9 +1,18 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
+import pytest
 from pandas.testing import assert_frame_equal
 
-from sensitivity.df import sensitivity_df
+from sensitivity import CaseEvaluationError
+from sensitivity.agg import _recognized_reducer
+from sensitivity.df import sensitivity_df, asensitivity_df, _two_variable_sensitivity_display_df
+from sensitivity.execution import _evaluate_vectorized, _grid_batches
 from tests.base import EXPECT_DF_TWO_VALUE, SENSITIVITY_VALUES_TWO_VALUE, add_5_to_values, RESULT_NAME, \
-    TWO_VALUE_LABELS, EXPECT_DF_TWO_VALUE_LABELS
+    TWO_VALUE_LABELS, EXPECT_DF_TWO_VALUE_LABELS, fail_on_value2_5, async_add_5_to_values
 
 
 def test_create_sensitivity_df():
@@ -24,4 +33,326 @@ def test_labeled_sensitivity_df():
         labels=TWO_VALUE_LABELS
     )
 
-    assert_frame_equal(df, EXPECT_DF_TWO_VALUE_LABELS, check_dtype=False)
\ No newline at end of file
+    assert_frame_equal(df, EXPECT_DF_TWO_VALUE_LABELS, check_dtype=False)
+
+
+def test_sensitivity_df_dtypes():
+    df = sensitivity_df(
+        SENSITIVITY_VALUES_TWO_VALUE,
+        lambda value1, value2: value1 / value2,
+        result_name=RESULT_NAME
+    )
+
+    assert list(df.dtypes) == [pd.Int64Dtype(), pd.Int64Dtype(), pd.Float64Dtype()]
+    assert len(df) == 4
+
+
+def test_sensitivity_df_n_jobs():
+    df = sensitivity_df(
+        SENSITIVITY_VALUES_TWO_VALUE,
+        add_5_to_values,
+        result_name=RESULT_NAME,
+        n_jobs=2,
+        chunk_size=1,
+    )
+
+    assert_frame_equal(df, EXPECT_DF_TWO_VALUE, check_dtype=False)
+
+
+def test_sensitivity_df_executor():
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        df = sensitivity_df(
+            SENSITIVITY_VALUES_TWO_VALUE,
+            add_5_to_values,
+            result_name=RESULT_NAME,
+            executor=executor,
+            chunk_size=3,
+        )
+
+    assert_frame_equal(df, EXPECT_DF_TWO_VALUE, check_dtype=False)
+
+
+def test_sensitivity_df_n_jobs_error_has_params():
+    with pytest.raises(CaseEvaluationError) as exc_info:
+        sensitivity_df(
+            SENSITIVITY_VALUES_TWO_VALUE,
+            fail_on_value2_5,
+            n_jobs=2,
+            chunk_size=1,
+        )
+
+    assert exc_info.value.param_dict['value2'] == 5
+
+
+@pytest.mark.parametrize('batch_size', [None, 1, 3])
+def test_sensitivity_df_vectorized(batch_size):
+    df = sensitivity_df(
+        SENSITIVITY_VALUES_TWO_VALUE,
+        add_5_to_values,
+        result_name=RESULT_NAME,
+        vectorized=True,
+        batch_size=batch_size,
+    )
+    row_df = sensitivity_df(
+        SENSITIVITY_VALUES_TWO_VALUE,
+        add_5_to_values,
+        result_name=RESULT_NAME,
+    )
+
+    assert_frame_equal(df, row_df)
+    assert_frame_equal(df, EXPECT_DF_TWO_VALUE, check_dtype=False)
+
+
+@pytest.mark.parametrize('errors', ['record', 'not_an_option'])
+def test_sensitivity_df_vectorized_errors_raises(errors):
+    with pytest.raises(ValueError):
+        sensitivity_df(SENSITIVITY_VALUES_TWO_VALUE, add_5_to_values, vectorized=True, errors=errors)
+
+
+def test_vectorized_progress_disabled(capsys):
+    batches = _evaluate_vectorized(
+        add_5_to_values, list(SENSITIVITY_VALUES_TWO_VALUE), _grid_batches(SENSITIVITY_VALUES_TWO_VALUE), 4, {},
+        progress=False,
+    )
+    assert len(list(batches)) == 1
+    assert capsys.readouterr().err == ''
+
+
+def test_sensitivity_df_async():
+    df = sensitivity_df(
+        SENSITIVITY_VALUES_TWO_VALUE,
+        async_add_5_to_values,
+        result_name=RESULT_NAME,
+    )
+
+    assert_frame_equal(df, EXPECT_DF_TWO_VALUE, check_dtype=False)
+
+
+def test_asensitivity_df_max_concurrency():
+    in_flight = 0
+    max_in_flight = 0
+
+    async def tracked_add_5_to_values(value1, value2):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        result = await async_add_5_to_values(value1, value2)
+        in_flight -= 1
+        return result
+
+    df = asyncio.run(asensitivity_df(
+        SENSITIVITY_VALUES_TWO_VALUE,
+        tracked_add_5_to_values,
+        result_name=RESULT_NAME,
+        max_concurrency=2,
+    ))
+
+    assert_frame_equal(df, EXPECT_DF_TWO_VALUE, check_dtype=False)
+    assert max_in_flight == 2
+
+
+def test_recognized_reducer_quantile():
+    assert _recognized_reducer(functools.partial(np.percentile, q=np.int64(25))) == ('quantile', {'q': 0.25})
+    # Only a single real q has a fast path
+    assert _recognized_reducer(functools.partial(np.quantile, q='0.25')) is None
+    assert _recognized_reducer(functools.partial(np.quantile, q=np.array([0.25, 0.75]))) is None
+
+
+@pytest.mark.parametrize('agg_func', [
+    np.mean, np.median, np.min, np.max, np.sum, np.std, 'mean', functools.partial(np.quantile, q=0.25),
+])
+def test_two_variable_display_df_matches_apply(agg_func):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'value1': rng.integers(0, 3, 50),
+        'value2': rng.integers(0, 4, 50),
+        RESULT_NAME: rng.normal(size=50),
+    })
+    display_df = _two_variable_sensitivity_display_df(df, 'value1', 'value2', result_col=RESULT_NAME,
+                                                      agg_func=agg_func)
+    expect_df = df.groupby(['value1', 'value2'])[RESULT_NAME].apply(
+        lambda values: values.agg(agg_func) if isinstance(agg_func, str) else agg_func(values)
+    ).unstack()
+    np.testing.assert_allclose(display_df.to_numpy(dtype=float), expect_df.to_numpy(dtype=float))
+
+
+@pytest.mark.parametrize('vectorized', [False, True])
+def test_sensitivity_df_compact(vectorized):
+    df = sensitivity_df(
+        SENSITIVITY_VALUES_TWO_VALUE,
+        add_5_to_values,
+        result_name=RESULT_NAME,
+        vectorized=vectorized,
+        compact=True,
+    )
+    assert isinstance(df['value1'].dtype, pd.CategoricalDtype)
+    assert df['value2'].cat.categories.tolist() == SENSITIVITY_VALUES_TWO_VALUE['value2']
+    assert df[RESULT_NAME].dtype == np.float64
+    assert_frame_equal(df.astype({'value1': int, 'value2': int}), EXPECT_DF_TWO_VALUE, check_dtype=False)
+
+
+@pytest.mark.parametrize('vectorized', [False, True])
+def test_sensitivity_df_duplicate_values_run_once(vectorized):
+    calls = []
+
+    def counted_add_5_to_values(value1, value2):
+        calls.append((value1, value2))
+        return add_5_to_values(value1, value2)
+
+    df = sensitivity_df(
+        {'value1': [1, 2, 1], 'value2': [4, 5, 4]},
+        counted_add_5_to_values,
+        result_name=RESULT_NAME,
+        vectorized=vectorized,
+    )
+
+    if not vectorized:
+        assert len(calls) == 4
+    # Every row of the grid is still in the output, in the same order
+    assert len(df) == 9
+    assert df['value1'].tolist() == [1, 1, 1, 2, 2, 2, 1, 1, 1]
+    assert df['value2'].tolist() == [4, 5, 4] * 3
+    assert df[RESULT_NAME].tolist() == [10, 11, 10, 11, 12, 11, 10, 11, 10]
+
+
+def test_sensitivity_df_duplicates_keep_original_values():
+    calls = []
+    key = ('a', 1)
+
+    def record_value(value1, value2):
+        calls.append((value1, value2))
+        return 0
+
+    df = sensitivity_df({'value1': [1, True, 1.0, 1], 'value2': [key, 'b', key]}, record_value)
+
+    # Equal values of different types are distinct, and func gets the original objects
+    assert len(calls) == 6
+    assert [type(value1) for value1, _ in calls[::2]] == [int, bool, float]
+    assert all(value2 is key for _, value2 in calls[::2])
+    assert df['value1'].tolist() == [1, 1, 1, True, True, True, 1.0, 1.0, 1.0, 1, 1, 1]
+    assert [type(value) for value in df['value1'][::3]] == [int, bool, float, int]
+
+    with pytest.raises(ValueError):
+        # pandas can't hold 1 and True as separate categories
+        sensitivity_df({'value1': [1, True], 'value2': [4]}, add_5_to_values, compact=True)
+
+
+@pytest.mark.parametrize('vectorized', [False, True])
+def test_sensitivity_df_constraint(vectorized):
+    calls = []
+
+    def counted_add_5_to_values(value1, value2):
+        calls.append((value1, value2))
+        return add_5_to_values(value1, value2)
+
+    df = sensitivity_df(
+        {'value1': [1, 2, 3], 'value2': [1, 2, 3, 2]},
+        counted_add_5_to_values,
+        result_name=RESULT_NAME,
+        vectorized=vectorized,
+        constraint=lambda value1, value2: value1 <= value2,
+    )
+
+    if not vectorized:
+        assert len(calls) == 6
+    assert df[['value1', 'value2']].values.tolist() == [
+        [1, 1], [1, 2], [1, 3], [1, 2], [2, 2], [2, 3], [2, 2], [3, 3]
+    ]
+    assert (df[RESULT_NAME] == df['value1'] + df['value2'] + 5).all()
+
+
+def test_sensitivity_df_constraint_sampled():
+    df = sensitivity_df(
+        {'value1': [1, 2, 3], 'value2': [1, 2, 3]},
+        add_5_to_values,
+        sampling='lhs',
+        num_samples=50,
+        seed=0,
+        constraint=lambda value1, value2: value1 < value2,
+    )
+
+    assert 0 < len(df) < 50
+    assert (df['value1'] < df['value2']).all()
+
+
+def add_and_multiply(value1, value2):
+    return {'sum': value1 + value2, 'product': value1 * value2}
+
+
+@pytest.mark.parametrize('vectorized', [False, True])
+def test_sensitivity_df_dict_outputs(vectorized):
+    df = sensitivity_df(SENSITIVITY_VALUES_TWO_VALUE, add_and_multiply, vectorized=vectorized)
+
+    assert df.columns.tolist() == ['value1', 'value2', 'sum', 'product']
+    assert df['sum'].tolist() == [5, 6, 6, 7]
+    assert df['product'].tolist() == [4, 5, 8, 10]
+
+
+@pytest.mark.parametrize('vectorized', [False, True])
+def test_sensitivity_df_tuple_outputs(vectorized):
+    if vectorized:
+        def func(value1, value2):
+            return np.column_stack([value1 + value2, value1 * value2])
+    else:
+        def func(value1, value2):
+            return value1 + value2, value1 * value2
+
+    df = sensitivity_df(SENSITIVITY_VALUES_TWO_VALUE, func, result_name=RESULT_NAME, vectorized=vectorized)
+    if vectorized:
+        assert df.columns.tolist() == ['value1', 'value2', f'{RESULT_NAME} 1', f'{RESULT_NAME} 2']
+    else:
+        # Tuples are only split into columns when result_names are passed
+        assert df.columns.tolist() == ['value1', 'value2', RESULT_NAME]
+        assert df[RESULT_NAME].tolist() == [(5, 4), (6, 5), (6, 8), (7, 10)]
+
+    named_df = sensitivity_df(
+        SENSITIVITY_VALUES_TWO_VALUE, func, result_names=['sum', 'product'], vectorized=vectorized, compact=True
+    )
+    assert named_df['sum'].tolist() == [5, 6, 6, 7]
+    assert named_df['product'].tolist() == [4, 5, 8, 10]
+
+
+def test_sensitivity_df_mismatched_outputs():
+    def func(value1, value2):
+        if value2 == 5:
+            return {'sum': value1 + value2}
+        return {'sum': value1 + value2, 'product': value1 * value2}
+
+    with pytest.raises(ValueError, match='case value1=1, value2=5'):
+        sensitivity_df(SENSITIVITY_VALUES_TWO_VALUE, func)
+
+    def fails_or_adds_and_multiplies(value1, value2):
+        if value2 == 5:
+            raise ValueError('fail')
+        return value1 + value2, value1 * value2
+
+    df = sensitivity_df(
+        SENSITIVITY_VALUES_TWO_VALUE, fails_or_adds_and_multiplies, result_names=['sum', 'product'], errors='record'
+    )
+    # Recorded errors are missing in every output
+    assert df['sum'].isna().tolist() == [False, True, False, True]
+    assert df['product'].isna().tolist() == [False, True, False, True]
+
+
+@pytest.mark.parametrize('isolate', [False, True])
+def test_sensitivity_df_isolate(isolate):
+    def append_value2(value1, value2, history):
+        value1.append(value2)
+        history.append(value2)
+        return len(value1) + len(history)
+
+    value1 = [0]
+    history = []
+    df = sensitivity_df(
+        {'value1': [value1], 'value2': [4, 5]}, append_value2, result_name=RESULT_NAME, isolate=isolate,
+        history=history,
+    )
+
+    if isolate:
+        # Every case gets fresh copies, so the values passed in are unchanged
+        assert df[RESULT_NAME].tolist() == [3, 3]
+        assert value1 == [0] and history == []
+    else:
+        # Passed by reference, so func sees the changes from earlier cases
+        assert df[RESULT_NAME].tolist() == [3, 5]
+        assert value1 == [0, 4, 5] and history == [4, 5]
@@ -0,0 +1,47 @@
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+
+def run_python(code: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, '-c', textwrap.dedent(code)], cwd=ROOT, capture_output=True, text=True
+    )
+
+
+def test_import_does_not_load_plotting_or_display():
+    completed = run_python('''
+        import sys
+        import sensitivity
+        loaded = [m for m in ('matplotlib', 'IPython', 'pandas.io.formats.style') if m in sys.modules]
+        assert not loaded, loaded
+    ''')
+    assert completed.returncode == 0, completed.stderr
+
+
+def test_compute_without_plotting_or_display_installed():
+    completed = run_python('''
+        import sys
+
+        class BlockPlotting:
+            def find_spec(self, name, path=None, target=None):
+                if name.split('.')[0] in ('matplotlib', 'IPython'):
+                    raise ImportError(f'{name} is not installed')
+
+        sys.meta_path.insert(0, BlockPlotting())
+        from sensitivity import SensitivityAnalyzer
+        from sensitivity.df import sensitivity_df
+
+        def add_5_to_values(value1, value2):
+            return value1 + value2 + 5
+
+        sensitivity_values = {'value1': [1, 2], 'value2': [4, 5]}
+        df = sensitivity_df(sensitivity_values, add_5_to_values)
+        assert df['Result'].tolist() == [10, 11, 11, 12]
+        sa = SensitivityAnalyzer(sensitivity_values, add_5_to_values, vectorized=True)
+        assert len(sa.df) == 4
+    ''')
+    assert completed.returncode == 0, completed.stderr
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from sensitivity import SensitivityAnalyzer, ValueRange, sobol_indices
+from sensitivity.indices import _saltelli_param_arrays
+from tests.base import SENSITIVITY_VALUES_THREE_VALUE, add_10_to_values, RESULT_NAME
+
+
+def weighted_sum(value1, value2, value3):
+    return value1 + 2 * value2 + 0 * value3
+
+
+def test_saltelli_design():
+    values = {'value1': ValueRange(0, 1), 'value2': ValueRange(0, 1)}
+    value1, value2 = _saltelli_param_arrays(values, 4, 'halton', seed=0)
+    assert len(value1) == 4 * (2 + 2)
+    # Each AB matrix is A with one column from B
+    np.testing.assert_array_equal(value1[8:12], value1[4:8])
+    np.testing.assert_array_equal(value2[8:12], value2[:4])
+    np.testing.assert_array_equal(value1[12:], value1[:4])
+    np.testing.assert_array_equal(value2[12:], value2[4:8])
+
+
+def test_sobol_indices():
+    values = {name: ValueRange(0, 1) for name in ['value1', 'value2', 'value3']}
+    indices = sobol_indices(values, weighted_sum, num_samples=4096, seed=0, vectorized=True)
+
+    # Variance of value1 is 1 / 12 and 2 * value2 is 4 / 12, with no interactions
+    np.testing.assert_allclose(indices['S1'], [0.2, 0.8, 0], atol=0.03)
+    np.testing.assert_allclose(indices['ST'], [0.2, 0.8, 0], atol=0.03)
+    assert (indices['S1 Low'] <= indices['S1']).all()
+    assert (indices['S1'] <= indices['S1 High']).all()
+    assert indices.index.tolist() == ['value1', 'value2', 'value3']
+
+
+def test_analyzer_sobol_indices():
+    sa = SensitivityAnalyzer(
+        SENSITIVITY_VALUES_THREE_VALUE, add_10_to_values, result_name=RESULT_NAME,
+        labels={'value1': 'Value 1'}, lazy=True,
+    )
+    indices = sa.sobol_indices(num_samples=256, seed=0, num_resamples=100)
+
+    assert not sa.is_computed
+    assert indices.index.tolist() == ['Value 1', 'value2', 'value3']
+    np.testing.assert_allclose(indices['ST'], [1 / 3] * 3, atol=0.1)
+
+
+def test_sobol_indices_confidence_level():
+    with pytest.raises(ValueError):
+        sobol_indices(SENSITIVITY_VALUES_THREE_VALUE, add_10_to_values, confidence_level=95)
@@ -0,0 +1,61 @@
+import pytest
+
+from sensitivity import SensitivityAnalyzer, one_at_a_time
+from tests.base import RESULT_NAME, add_10_to_values
+
+OAT_VALUES = {
+    'value1': [1, 2, 3],
+    'value2': [4, 5, 6, 7],
+    'value3': [0, 10],
+}
+
+
+def weighted_add(value1, value2, value3):
+    return value1 + 2 * value2 + value3 / 10
+
+
+@pytest.mark.parametrize('vectorized', [False, True])
+def test_one_at_a_time(vectorized):
+    calls = []
+
+    def counted_weighted_add(**kwargs):
+        calls.append(kwargs)
+        return weighted_add(**kwargs)
+
+    result = one_at_a_time(
+        OAT_VALUES, weighted_add if vectorized else counted_weighted_add, result_name=RESULT_NAME,
+        vectorized=vectorized,
+    )
+
+    assert result.base_case == {'value1': 2, 'value2': 5, 'value3': 0}
+    assert result.base_result == 12
+    # Base case shared rather than once per argument
+    assert result.num_evaluations == 1 + 2 + 3 + 1
+    if not vectorized:
+        assert len(calls) == result.num_evaluations
+    assert len(result.df) == 9
+    assert result.ranked_df.index.tolist() == ['value2', 'value1', 'value3']
+    assert result.ranked_df['Swing'].tolist() == [6, 2, 1]
+    assert result.ranked_df.loc['value2', 'Value at Low'] == 4
+    assert result.ranked_df.loc['value2', 'Value at High'] == 7
+    result.plot()
+
+
+def test_one_at_a_time_base_case_not_in_values():
+    result = one_at_a_time(OAT_VALUES, weighted_add, base_case={'value3': 5})
+    assert result.num_evaluations == 1 + 2 + 3 + 2
+    assert result.df[result.df['Parameter'] == 'value3']['Value'].tolist() == [0, 10, 5]
+
+    with pytest.raises(ValueError):
+        one_at_a_time(OAT_VALUES, weighted_add, base_case={'value4': 5})
+
+
+def test_analyzer_one_at_a_time():
+    sa = SensitivityAnalyzer(
+        OAT_VALUES, add_10_to_values, result_name=RESULT_NAME, labels={'value1': 'Value 1'}, lazy=True
+    )
+    result = sa.one_at_a_time()
+
+    assert not sa.is_computed
+    assert set(result.ranked_df.index) == {'Value 1', 'value2', 'value3'}
+    assert result.result_name == RESULT_NAME
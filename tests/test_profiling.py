@@ -0,0 +1,86 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from sensitivity import SensitivityAnalyzer, ResultCache, SweepProfile, slowest_regions
+from sensitivity.df import sensitivity_df
+from tests.base import EXPECT_DF_TWO_VALUE, SENSITIVITY_VALUES_TWO_VALUE, add_5_to_values, RESULT_NAME, \
+    SENSITIVITY_VALUES_THREE_VALUE, add_10_to_values, fail_on_value2_5
+
+
+def test_time_cases_and_hooks():
+    started = []
+    ended = []
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        df = sensitivity_df(
+            SENSITIVITY_VALUES_TWO_VALUE, fail_on_value2_5, result_name=RESULT_NAME, time_cases=True,
+            executor=executor, errors='record', on_case_start=started.append,
+            on_case_end=lambda params, result, seconds: ended.append((params, result)),
+        )
+
+    assert df.columns.tolist() == ['value1', 'value2', RESULT_NAME, 'Case Seconds']
+    assert (df['Case Seconds'] >= 0).all()
+    assert sorted(params['value2'] for params in started) == [4, 4, 5, 5]
+    # Called for failing cases too, without a result
+    assert sorted((params['value1'], params['value2'], result) for params, result in ended) == [
+        (1, 4, 10), (1, 5, None), (2, 4, 11), (2, 5, None)
+    ]
+
+
+def test_time_cases_with_cache(tmp_path):
+    cache = ResultCache(tmp_path / 'cache.sqlite')
+    sensitivity_df(SENSITIVITY_VALUES_TWO_VALUE, add_5_to_values, result_name=RESULT_NAME, cache=cache)
+    df = sensitivity_df(
+        {'value1': [1, 2, 3], 'value2': [4, 5]}, add_5_to_values, result_name=RESULT_NAME, cache=cache,
+        time_cases=True,
+    )
+
+    # Only the cases which were run have a time, and the cache holds the plain results
+    assert df['Case Seconds'].isna().tolist() == [True, True, True, True, False, False]
+    cached_df = sensitivity_df(SENSITIVITY_VALUES_TWO_VALUE, add_5_to_values, result_name=RESULT_NAME, cache=cache)
+    assert_frame_equal(cached_df, EXPECT_DF_TWO_VALUE, check_dtype=False)
+
+
+def test_slowest_regions():
+    df = pd.DataFrame({
+        'value1': [1, 1, 2, 2],
+        'value2': [4, 5, 4, 5],
+        'value3': [6, 6, 6, 7],
+        'Case Seconds': [1.0, 1.0, 1.0, 5.0],
+    })
+
+    regions = slowest_regions(df, ['value1', 'value2', 'value3'], num_regions=2)
+
+    assert regions.columns.tolist() == [
+        'value1', 'value2', 'value3', 'Cases', 'Mean Seconds', 'Total Seconds', 'Relative Time'
+    ]
+    assert regions['Mean Seconds'].tolist() == [5.0, 5.0]
+    assert regions['Relative Time'].tolist() == [2.5, 2.5]
+    assert regions[['value1', 'value2']].iloc[0].tolist() == [2, 5]
+    assert pd.isna(regions['value3'].iloc[0])
+
+
+def test_sweep_profile_nested_stages():
+    profile = SweepProfile()
+    with profile.stage('outer'):
+        with profile.stage('inner'):
+            np.linalg.norm(np.arange(1_000_000))
+
+    assert list(profile.stage_seconds) == ['inner', 'outer']
+    assert profile.stage_seconds['inner'] > profile.stage_seconds['outer']
+    assert profile.df['Share'].sum() == 1
+
+
+def test_analyzer_profile():
+    sa = SensitivityAnalyzer(
+        SENSITIVITY_VALUES_THREE_VALUE, add_10_to_values, result_name=RESULT_NAME, time_cases=True, profile=True,
+    )
+    sa.styled_dfs(disp=False)
+    sa.plot()
+
+    assert sa.result_cols == [RESULT_NAME]
+    assert set(sa.sweep_profile.stage_seconds) == {'grid', 'evaluate', 'assemble', 'aggregate', 'style', 'plot'}
+    assert len(sa.slowest_regions(num_regions=3)) == 3
+    assert SensitivityAnalyzer(SENSITIVITY_VALUES_TWO_VALUE, add_5_to_values).sweep_profile is None
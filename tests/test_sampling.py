@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from sensitivity import SensitivityAnalyzer, ValueRange
+from sensitivity.df import sensitivity_df
+from sensitivity.sampling import _unit_samples
+from tests.base import SENSITIVITY_VALUES_THREE_VALUE, add_10_to_values, RESULT_NAME
+
+SAMPLED_VALUES = {
+    'value1': ValueRange(0, 10),
+    'value2': [4, 5],
+    'value3': ValueRange(-1, 1),
+}
+
+
+@pytest.mark.parametrize('sampling', ['random', 'lhs', 'halton', 'sobol'])
+def test_sampled_sensitivity_df(sampling):
+    if sampling == 'sobol':
+        pytest.importorskip('scipy.stats.qmc')
+    df = sensitivity_df(
+        SAMPLED_VALUES, add_10_to_values, result_name=RESULT_NAME, sampling=sampling, num_samples=64, seed=0
+    )
+    assert len(df) == 64
+    assert df['value1'].between(0, 10, inclusive='left').all()
+    assert df['value3'].between(-1, 1, inclusive='left').all()
+    assert set(df['value2']) == {4, 5}
+    expect = df['value1'] + df['value2'] + df['value3'] + 10
+    np.testing.assert_allclose(df[RESULT_NAME].to_numpy(dtype=float), expect.to_numpy(dtype=float))
+
+    repeated = sensitivity_df(
+        SAMPLED_VALUES, add_10_to_values, result_name=RESULT_NAME, sampling=sampling, num_samples=64, seed=0
+    )
+    np.testing.assert_array_equal(repeated.to_numpy(dtype=float), df.to_numpy(dtype=float))
+
+
+def test_latin_hypercube_covers_every_stratum():
+    samples = _unit_samples('lhs', 20, 3, seed=0)
+    for dim in range(3):
+        assert sorted((samples[:, dim] * 20).astype(int)) == list(range(20))
+
+
+def test_value_range_requires_sampling():
+    with pytest.raises(ValueError):
+        sensitivity_df(SAMPLED_VALUES, add_10_to_values)
+
+
+def test_sampled_analyzer_styled_dfs_and_plot():
+    sa = SensitivityAnalyzer(
+        SAMPLED_VALUES,
+        add_10_to_values,
+        result_name=RESULT_NAME,
+        sampling='lhs',
+        num_samples=200,
+        seed=0,
+        grid_size=4,
+        vectorized=True,
+    )
+    styled = sa.styled_dfs(disp=False)
+    table = styled[('value1', 'value2')].data
+    assert table.shape == (4, 2)
+    assert len(styled[('value2', 'value3')].data.columns) == 4
+    sa.plot()
+    assert sa.estimate(sample_size=5).num_cases == 200
+
+
+def test_sampling_from_lists_matches_grid_values():
+    df = sensitivity_df(
+        SENSITIVITY_VALUES_THREE_VALUE, add_10_to_values, result_name=RESULT_NAME, sampling='random',
+        num_samples=30, seed=0,
+    )
+    for col, values in SENSITIVITY_VALUES_THREE_VALUE.items():
+        assert set(df[col]) <= set(values)
+
+
+def test_sampled_styled_dfs_with_empty_bins():
+    sa = SensitivityAnalyzer(
+        SAMPLED_VALUES, add_10_to_values, result_name=RESULT_NAME, sampling='halton', num_samples=6, seed=0,
+        grid_size=4,
+    )
+    for styler in sa.styled_dfs(disp=False).values():
+        # Pairs of bins without any samples are missing, which must still render
+        styler.to_html()
+    assert sa.styled_dfs(disp=False)[('value1', 'value3')].data.isna().to_numpy().any()
@@ -1,11 +1,16 @@
+import asyncio
 import uuid
 
+import numpy as np
+import pytest
+
 from pandas.testing import assert_frame_equal
 
-from sensitivity import SensitivityAnalyzer
+from sensitivity import SensitivityAnalyzer, ResultCache
 from tests.base import EXPECT_DF_TWO_VALUE, SENSITIVITY_VALUES_TWO_VALUE, add_5_to_values, RESULT_NAME, \
     SENSITIVITY_VALUES_THREE_VALUE, add_10_to_values, EXPECT_DF_THREE_VALUE, assert_styled_matches, \
-    DF_STYLED_NUM_FMT_PATH, assert_graph_matches, PLOT_THREE_PATH, PLOT_OPTIONS_PATH, TWO_VALUE_LABELS, DF_LABELED_PATH
+    DF_STYLED_NUM_FMT_PATH, assert_graph_matches, PLOT_THREE_PATH, PLOT_OPTIONS_PATH, TWO_VALUE_LABELS, DF_LABELED_PATH, \
+    async_add_5_to_values, fail_on_value2_5
 
 
 class TestSensitivityAnalyzer:
@@ -34,6 +39,245 @@ class TestSensitivityAnalyzer:
         )
         assert_frame_equal(sa.df, EXPECT_DF_THREE_VALUE, check_dtype=False)
 
+    def test_create_lazy(self):
+        sa = self.create_sa(lazy=True)
+        assert not sa.is_computed
+        df = sa.run()
+        assert sa.is_computed
+        assert_frame_equal(df, EXPECT_DF_TWO_VALUE, check_dtype=False)
+        assert sa.df is df
+
+    def test_lazy_df_computed_on_access(self):
+        sa = self.create_sa(lazy=True)
+        assert_frame_equal(sa.df, EXPECT_DF_TWO_VALUE, check_dtype=False)
+        assert sa.is_computed
+
+    def test_estimate(self):
+        calls = []
+
+        def counted_add_10_to_values(**kwargs):
+            calls.append(kwargs)
+            return add_10_to_values(**kwargs)
+
+        sa = self.create_sa(
+            sensitivity_values=SENSITIVITY_VALUES_THREE_VALUE,
+            func=counted_add_10_to_values,
+            lazy=True,
+        )
+        estimate = sa.estimate(sample_size=3, seed=0)
+
+        assert len(calls) == 3
+        assert estimate.num_cases == 8
+        assert estimate.num_sampled == 3
+        assert estimate.expected_seconds == estimate.seconds_per_case * 8
+        assert not sa.is_computed
+
+    def test_arun(self):
+        async def create_in_loop():
+            return await SensitivityAnalyzer.arun(
+                SENSITIVITY_VALUES_TWO_VALUE,
+                async_add_5_to_values,
+                result_name=RESULT_NAME,
+            )
+
+        sa = asyncio.run(create_in_loop())
+        assert_frame_equal(sa.df, EXPECT_DF_TWO_VALUE, check_dtype=False)
+
+    def test_arun_cache(self):
+        cache = ResultCache()
+        asyncio.run(SensitivityAnalyzer.arun(SENSITIVITY_VALUES_TWO_VALUE, async_add_5_to_values, cache=cache))
+        sa = asyncio.run(SensitivityAnalyzer.arun(
+            SENSITIVITY_VALUES_TWO_VALUE, async_add_5_to_values, result_name=RESULT_NAME, cache=cache
+        ))
+
+        assert_frame_equal(sa.df, EXPECT_DF_TWO_VALUE, check_dtype=False)
+        assert (sa.cache_hits, sa.cache_misses) == (4, 4)
+
+    def test_arun_record_errors(self):
+        async def async_fail_on_value2_5(value1, value2):
+            return fail_on_value2_5(value1, value2)
+
+        sa = asyncio.run(SensitivityAnalyzer.arun(
+            SENSITIVITY_VALUES_TWO_VALUE, async_fail_on_value2_5, result_name=RESULT_NAME, errors='record'
+        ))
+
+        assert sa.df[RESULT_NAME].isna().tolist() == [False, True, False, True]
+        assert [error.param_dict for error in sa.failed_cases] == [
+            {'value1': 1, 'value2': 5},
+            {'value1': 2, 'value2': 5},
+        ]
+
+    def test_arun_sampling(self):
+        kwargs = dict(result_name=RESULT_NAME, sampling='random', num_samples=10, seed=0, profile=True)
+        sa = asyncio.run(SensitivityAnalyzer.arun(SENSITIVITY_VALUES_TWO_VALUE, async_add_5_to_values, **kwargs))
+        sync_sa = SensitivityAnalyzer(SENSITIVITY_VALUES_TWO_VALUE, add_5_to_values, **kwargs)
+
+        assert_frame_equal(sa.df, sync_sa.df)
+        assert list(sa.sweep_profile.stage_seconds) == ['grid', 'evaluate', 'assemble']
+
+    @pytest.mark.parametrize('option', [dict(surrogate_samples=2), dict(vectorized=True), dict(n_jobs=2)])
+    def test_arun_unsupported_option_raises(self, option):
+        with pytest.raises(ValueError):
+            asyncio.run(SensitivityAnalyzer.arun(SENSITIVITY_VALUES_TWO_VALUE, async_add_5_to_values, **option))
+
+    def test_extend(self):
+        calls = []
+
+        def counted_add_10_to_values(**kwargs):
+            calls.append(kwargs)
+            return add_10_to_values(**kwargs)
+
+        sa = self.create_sa(
+            sensitivity_values=SENSITIVITY_VALUES_THREE_VALUE,
+            func=counted_add_10_to_values,
+        )
+        sa.extend('value2', [6, 7])
+        expect_sa = self.create_sa(
+            sensitivity_values={**SENSITIVITY_VALUES_THREE_VALUE, 'value2': [4, 5, 6, 7]},
+            func=add_10_to_values,
+        )
+
+        assert len(calls) == 16
+        assert sa.sensitivity_values['value2'] == [4, 5, 6, 7]
+        assert SENSITIVITY_VALUES_THREE_VALUE['value2'] == [4, 5]
+        assert_frame_equal(sa.df, expect_sa.df)
+
+    def test_extend_with_constraint(self):
+        def constraint(value1, value2, value3):
+            return value1 + value2 < value3
+
+        sa = self.create_sa(
+            sensitivity_values=SENSITIVITY_VALUES_THREE_VALUE,
+            func=add_10_to_values,
+            constraint=constraint,
+        )
+        assert len(sa.df) == 4
+        sa.extend('value3', [8, 9])
+        expect_sa = self.create_sa(
+            sensitivity_values={**SENSITIVITY_VALUES_THREE_VALUE, 'value3': [6, 7, 8, 9]},
+            func=add_10_to_values,
+            constraint=constraint,
+        )
+
+        assert len(sa.df) == 12
+        assert_frame_equal(sa.df, expect_sa.df)
+
+    def test_multiple_outputs(self):
+        calls = []
+
+        def add_and_multiply(value1, value2, value3):
+            calls.append((value1, value2, value3))
+            return {'sum': value1 + value2 + value3, 'product': value1 * value2 * value3}
+
+        sa = self.create_sa(sensitivity_values=SENSITIVITY_VALUES_THREE_VALUE, func=add_and_multiply)
+        assert sa.result_cols == ['sum', 'product']
+        sum_styled = sa.styled_dfs(disp=False)
+        product_styled = sa.styled_dfs(disp=False, result='product')
+        sa.plot(result='product')
+
+        assert len(calls) == 8
+        np.testing.assert_allclose(
+            sum_styled[('value1', 'value2')].data.to_numpy(dtype=float), [[11.5, 12.5], [12.5, 13.5]]
+        )
+        np.testing.assert_allclose(
+            product_styled[('value1', 'value2')].data.to_numpy(dtype=float), [[26, 32.5], [52, 65]]
+        )
+        with pytest.raises(ValueError):
+            sa.styled_dfs(disp=False, result='npv')
+
+    def test_tensor(self):
+        sa = self.create_sa(
+            sensitivity_values=SENSITIVITY_VALUES_THREE_VALUE,
+            func=add_10_to_values,
+        )
+        expect_tensor = EXPECT_DF_THREE_VALUE[RESULT_NAME].to_numpy(dtype=float).reshape(2, 2, 2)
+        np.testing.assert_array_equal(sa.tensor, expect_tensor)
+        assert sa.sel(value1=2, value2=4, value3=7) == 23
+        np.testing.assert_array_equal(sa.sel(value2=5), expect_tensor[:, 1, :])
+        np.testing.assert_array_equal(sa.marginal('value3', 'value1'), expect_tensor.mean(axis=1).T)
+
+        sa.extend('value1', [3])
+        assert sa.tensor.shape == (3, 2, 2)
+        assert sa.sel(value1=3, value2=4, value3=6) == 23
+
+    def test_tensor_from_partial_df(self):
+        df = EXPECT_DF_TWO_VALUE.iloc[[3, 0, 1]]
+        sa = SensitivityAnalyzer.from_df(df, result_name=RESULT_NAME)
+        assert sa.sel(value1=2, value2=5) == 12
+        assert np.isnan(sa.sel(value1=2, value2=4))
+
+    def test_compact_styled_dfs_match(self):
+        sa_config = dict(sensitivity_values=SENSITIVITY_VALUES_THREE_VALUE, func=add_10_to_values)
+        styled = self.create_sa(**sa_config).styled_dfs(disp=False)
+        compact_styled = self.create_sa(compact=True, **sa_config).styled_dfs(disp=False)
+        for cols, styler in styled.items():
+            np.testing.assert_allclose(
+                compact_styled[cols].data.to_numpy(dtype=float), styler.data.to_numpy(dtype=float)
+            )
+
+    def test_compact_extend_stays_compact(self):
+        sa = self.create_sa(sensitivity_values=SENSITIVITY_VALUES_THREE_VALUE, func=add_10_to_values, compact=True)
+        sa.extend('value2', [6, 7])
+        expect_sa = self.create_sa(
+            sensitivity_values={**SENSITIVITY_VALUES_THREE_VALUE, 'value2': [4, 5, 6, 7]},
+            func=add_10_to_values,
+            compact=True,
+        )
+
+        assert sa.df.dtypes.to_dict() == expect_sa.df.dtypes.to_dict()
+        assert_frame_equal(sa.df, expect_sa.df)
+
+    def test_pairwise_tables_reused_until_df_changes(self):
+        sa = self.create_sa(
+            sensitivity_values=SENSITIVITY_VALUES_THREE_VALUE,
+            func=add_10_to_values,
+        )
+        sa.styled_dfs(disp=False)
+        tables = dict(sa._pairwise_tables)
+        assert len(tables) == 3
+        sa.styled_dfs(disp=False, num_fmt='{:.1f}')
+        sa.plot()
+        assert all(sa._pairwise_tables[key] is table for key, table in tables.items())
+
+        sa.df = sa.df.assign(**{RESULT_NAME: sa.df[RESULT_NAME] * 2})
+        assert not sa._pairwise_tables
+        doubled = sa.styled_dfs(disp=False)
+        for (col1, col2, _, _), table in tables.items():
+            np.testing.assert_allclose(
+                doubled[(col1, col2)].data.to_numpy(dtype=float), table.to_numpy(dtype=float) * 2
+            )
+
+    def test_refine(self):
+        calls = []
+
+        def step(value1, value2):
+            calls.append((value1, value2))
+            return 10 * (value1 > 3.3) + value2 / 100
+
+        sa = self.create_sa(sensitivity_values={'value1': [0.0, 5.0, 10.0], 'value2': [0, 1, 2]}, func=step)
+        calls.clear()
+        df = sa.refine(tolerance=1, max_evaluations=20)
+
+        # Only the cells across the threshold are split, running func once for each new row
+        assert 0 < len(calls) <= 20
+        assert len(df) == 9 + len(calls)
+        assert all(0 < value1 < 5 for value1, _ in calls)
+        assert set(df['value2']) == {0, 1, 2}
+        # Brackets the threshold more tightly than the original grid
+        value1s = set(df['value1'])
+        below = max(value for value in value1s if value <= 3.3)
+        above = min(value for value in value1s if value > 3.3)
+        assert above - below < 1
+        assert sa.sensitivity_values == {'value1': [0.0, 5.0, 10.0], 'value2': [0, 1, 2]}
+        sa.plot()
+        with pytest.raises(ValueError):
+            sa.extend('value1', [20.0])
+
+        # Continues from the last round with a new budget
+        num_calls = len(calls)
+        sa.refine(tolerance=1, max_evaluations=20)
+        assert num_calls < len(calls) <= num_calls + 20
+
     def test_create_styled_dfs(self):
         sa = self.create_sa()
         result = sa.styled_dfs()
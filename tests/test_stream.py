@@ -0,0 +1,73 @@
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from sensitivity import SensitivityAnalyzer, iter_sensitivity_df, sensitivity_to_file
+from sensitivity.df import sensitivity_df
+from tests.base import EXPECT_DF_TWO_VALUE, SENSITIVITY_VALUES_TWO_VALUE, add_5_to_values, RESULT_NAME, \
+    EXPECT_DF_THREE_VALUE, SENSITIVITY_VALUES_THREE_VALUE, add_10_to_values, assert_styled_matches
+
+
+@pytest.mark.parametrize('vectorized', [False, True])
+def test_iter_sensitivity_df(vectorized):
+    chunks = list(iter_sensitivity_df(
+        SENSITIVITY_VALUES_THREE_VALUE,
+        add_10_to_values,
+        chunk_rows=3,
+        result_name=RESULT_NAME,
+        vectorized=vectorized,
+    ))
+
+    assert [len(chunk) for chunk in chunks] == [3, 3, 2]
+    assert_frame_equal(pd.concat(chunks, ignore_index=True), EXPECT_DF_THREE_VALUE, check_dtype=False)
+
+
+@pytest.mark.parametrize('vectorized', [False, True])
+@pytest.mark.parametrize('options', [
+    {'sampling': 'random', 'num_samples': 10, 'seed': 0},
+    {'sampling': 'random', 'num_samples': 10, 'seed': 0, 'constraint': lambda value1, value2: value1 < value2 + 0.5},
+    {'constraint': lambda value1, value2: value1 <= value2},
+])
+def test_iter_sensitivity_df_options(vectorized, options):
+    calls = []
+
+    def func(value1, value2):
+        calls.append(1)
+        return value1 + value2
+
+    sensitivity_values = {'value1': [1, 2, 1, 3], 'value2': [1, 2, 2]}
+    expect_df = sensitivity_df(sensitivity_values, func, vectorized=vectorized, **options)
+    calls.clear()
+    chunks = list(iter_sensitivity_df(sensitivity_values, func, chunk_rows=3, vectorized=vectorized, **options))
+
+    assert all(len(chunk) <= 3 for chunk in chunks)
+    assert_frame_equal(pd.concat(chunks, ignore_index=True), expect_df, check_dtype=False)
+    if not vectorized and 'sampling' not in options:
+        # Repeated values are only run once within each chunk, 5 cases for the 8 rows
+        assert len(calls) == 5
+
+
+@pytest.mark.parametrize('file_name, partitioned', [
+    ('results.parquet', False),
+    ('results.arrow', False),
+    ('results', True),
+])
+def test_sensitivity_to_file_round_trip(tmp_path, file_name, partitioned):
+    pytest.importorskip('pyarrow')
+    path = tmp_path / file_name
+    num_rows = sensitivity_to_file(
+        path,
+        SENSITIVITY_VALUES_TWO_VALUE,
+        add_5_to_values,
+        chunk_rows=3,
+        partitioned=partitioned,
+        result_name=RESULT_NAME,
+    )
+    sa = SensitivityAnalyzer.from_file(path, result_name=RESULT_NAME)
+
+    assert num_rows == 4
+    assert sa.sensitivity_values == SENSITIVITY_VALUES_TWO_VALUE
+    assert_frame_equal(sa.df, EXPECT_DF_TWO_VALUE, check_dtype=False)
+    assert_styled_matches(sa.styled_dfs())
+    with pytest.raises(ValueError):
+        sa.run()
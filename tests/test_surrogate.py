@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from sensitivity import SensitivityAnalyzer, SurrogateValidation
+from sensitivity.surrogate import surrogate_df, _surrogate_positions
+from tests.base import RESULT_NAME
+
+SURROGATE_VALUES = {
+    'x': np.linspace(0, 1, 20).tolist(),
+    'y': np.linspace(0, 2, 15).tolist(),
+    'z': [1, 2, 3, 4],
+}
+
+
+def smooth_func(x, y, z):
+    return np.sin(2 * x) + y ** 2 / 4 + 0.5 * z
+
+
+def test_surrogate_df():
+    calls = []
+
+    def counted_smooth_func(**kwargs):
+        calls.append(kwargs)
+        return smooth_func(**kwargs)
+
+    df = surrogate_df(SURROGATE_VALUES, counted_smooth_func, 150, seed=0, result_name=RESULT_NAME)
+
+    assert len(calls) == 150
+    assert len(df) == 20 * 15 * 4
+    assert (~df['Predicted']).sum() == 150
+    # Rows in the same order as the full grid
+    assert df['x'].iloc[0] == 0 and df['z'].iloc[:4].tolist() == [1, 2, 3, 4]
+
+    actual = smooth_func(df['x'].to_numpy(float), df['y'].to_numpy(float), df['z'].to_numpy(float))
+    results = df[RESULT_NAME].to_numpy(float)
+    np.testing.assert_allclose(results[~df['Predicted']], actual[~df['Predicted']])
+    assert np.abs(results - actual).max() < 0.05
+
+    validation = df.attrs['surrogate']
+    assert isinstance(validation, SurrogateValidation)
+    assert validation.num_evaluated == 150
+    assert validation.num_holdout == 30
+    assert 0 < validation.rmse < 0.05
+    assert (df.loc[df['Predicted'], 'Prediction Error'] == validation.rmse).all()
+    assert (df.loc[~df['Predicted'], 'Prediction Error'] == 0).all()
+
+
+def test_surrogate_positions():
+    positions = _surrogate_positions((20, 15, 4), 100, seed=1)
+    assert len(np.unique(positions)) == 100
+    # Corners are included
+    assert {0, 20 * 15 * 4 - 1} <= set(positions.tolist())
+
+    assert _surrogate_positions((3, 3), 100).tolist() == list(range(9))
+
+
+def test_surrogate_needs_numbers():
+    with pytest.raises(ValueError):
+        surrogate_df({'x': ['a', 'b', 'c'], 'y': [1, 2]}, lambda x, y: y, 3)
+
+
+def test_analyzer_surrogate():
+    sa = SensitivityAnalyzer(
+        SURROGATE_VALUES, smooth_func, result_name=RESULT_NAME, surrogate_samples=150, seed=0,
+        labels={'x': 'X'},
+    )
+
+    assert sa.surrogate_validation.num_evaluated == 150
+    assert sa.df['Predicted'].sum() == len(sa.df) - 150
+    assert sa.tensor.shape == (20, 15, 4)
+    sa.styled_dfs(disp=False)
+    sa.plot()
+    with pytest.raises(ValueError):
+        sa.extend('z', [5])